@@ -1,14 +1,23 @@
 import asyncio
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .models import SearchResponse, Keyword, KeywordSearch, SearchResult
-from .storage import Storage
+from .models import SearchResponse, Keyword, KeywordImport, KeywordSearch, SearchResult, ArchiveSearchResponse
+from .storage import create_storage, keyword_quota
+from .async_storage import AsyncStorage
 from .scheduler import SearchScheduler
-from .brave_search import search_brave
-from config import BACKEND_HOST, BACKEND_PORT
+from .brave_search import search_brave, brave_client
+from .search_cache import SearchCache
+from .clustering import ClusteringService
+from .word_cloud import WordCloudService
+from .enrichment import EnrichmentService
+from .projection import parse_fields, encode_searches, encode_ndjson
+from .responses import CodecJSONResponse, ResponseCache
+from config import BACKEND_HOST, BACKEND_PORT, ENRICH_ENABLED, DEFAULT_KEYWORD_GROUP
 import uvicorn
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List, Optional, Union
 
 # Configure logging
 logging.basicConfig(
@@ -17,8 +26,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Intentionly API")
-storage = Storage()
+app = FastAPI(title="Intentionly API", default_response_class=CodecJSONResponse)
+storage = AsyncStorage(create_storage())
+search_cache = SearchCache(storage)
+clustering = ClusteringService(storage)
+word_clouds = WordCloudService(storage)
+responses = ResponseCache(storage)
+enrichment = EnrichmentService(storage) if ENRICH_ENABLED else None
 
 # CORS middleware
 app.add_middleware(
@@ -37,7 +51,7 @@ async def root():
 
 try:
     # Initialize scheduler after storage
-    scheduler = SearchScheduler(storage)
+    scheduler = SearchScheduler(storage, search_cache, enrichment)
     logger.info("Scheduler initialized successfully")
 except Exception as e:
     logger.error(f"Failed to initialize scheduler: {str(e)}")
@@ -45,6 +59,19 @@ except Exception as e:
 
 @app.on_event("startup")
 async def startup_event():
+    try:
+        await brave_client.start()
+    except Exception as e:
+        logger.error(f"Failed to start Brave client: {str(e)}")
+
+    await search_cache.warm()
+
+    if enrichment:
+        try:
+            await enrichment.start()
+        except Exception as e:
+            logger.error(f"Failed to start enrichment: {str(e)}")
+
     try:
         if scheduler:
             scheduler.start()
@@ -61,33 +88,81 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"Failed to shutdown scheduler: {str(e)}")
 
+    try:
+        await brave_client.close()
+    except Exception as e:
+        logger.error(f"Failed to close Brave client: {str(e)}")
+
+    if enrichment:
+        try:
+            await enrichment.close()
+        except Exception as e:
+            logger.error(f"Failed to stop enrichment: {str(e)}")
+
+    storage.shutdown()
+
 @app.get("/keywords")
-async def get_keywords():
+async def get_keywords(request: Request, group: Optional[str] = None):
     try:
-        return storage.get_keywords()
+        return await responses.respond(request, lambda: storage.get_keywords(group))
     except Exception as e:
         logger.error(f"Error getting keywords: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/keywords")
-async def add_keyword(keyword: str):
+async def add_keyword(keyword: str, group: str = DEFAULT_KEYWORD_GROUP):
     try:
         if not keyword or keyword.strip() == "":
             raise HTTPException(status_code=400, detail="Keyword cannot be empty")
 
-        if storage.add_keyword(keyword):
+        if await storage.add_keyword(keyword, group):
             return {"message": "Keyword added successfully"}
-        raise HTTPException(status_code=400, detail="Maximum keywords limit reached")
+        raise HTTPException(
+            status_code=400, detail=f"Keyword limit of group '{group}' reached ({keyword_quota(group)})"
+        )
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error adding keyword: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/keywords/import")
+async def import_keywords(keywords: List[Union[str, KeywordImport]], group: str = DEFAULT_KEYWORD_GROUP):
+    """
+    Track many keywords at once, given as strings or objects with value,
+    group and is_active; entries without a group go into ``group``.
+    Accepts the output of /keywords/export.
+    """
+    try:
+        entries = []
+        for k in keywords:
+            k = KeywordImport(value=k) if isinstance(k, str) else k
+            if k.value.strip():
+                entries.append({"value": k.value.strip(), "group": k.group or group, "is_active": k.is_active})
+        summary = await storage.add_keywords(entries)
+        logger.info(f"Imported keywords: {summary}")
+        return {**summary, "invalid": len(keywords) - len(entries)}
+    except Exception as e:
+        logger.error(f"Error importing keywords: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/keywords/export")
+async def export_keywords(request: Request, group: Optional[str] = None):
+    """All tracked keywords, or those of one group, as a JSON file /keywords/import accepts"""
+    async def build():
+        keywords = await storage.get_keywords(group)
+        return keywords, {"Content-Disposition": 'attachment; filename="keywords.json"'}
+
+    try:
+        return await responses.respond(request, build)
+    except Exception as e:
+        logger.error(f"Error exporting keywords: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.delete("/keywords/{keyword}")
 async def remove_keyword(keyword: str):
     try:
-        storage.remove_keyword(keyword)
+        await storage.remove_keyword(keyword)
         return {"message": "Keyword removed successfully"}
     except Exception as e:
         logger.error(f"Error removing keyword: {str(e)}")
@@ -96,11 +171,12 @@ async def remove_keyword(keyword: str):
 @app.get("/search/{keyword}")
 async def search(keyword: str) -> SearchResponse:
     try:
-        results = await search_brave(keyword)
+        results, cache_status = await search_cache.get(keyword)
         return SearchResponse(
             success=True,
             message="Search completed successfully",
-            results=results
+            results=results,
+            cache=cache_status
         )
     except Exception as e:
         logger.error(f"Error performing search: {str(e)}")
@@ -110,53 +186,210 @@ async def search(keyword: str) -> SearchResponse:
         )
 
 @app.get("/results")
-async def get_results(days: int = 7):
+async def get_results(
+    request: Request,
+    days: int = 7,
+    keyword: Optional[List[str]] = Query(None),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    dedup: bool = False,
+    new_only: bool = False,
+    aggregate: Optional[str] = None
+):
+    """
+    Stored searches, oldest first.
+
+    Filter by one or more keyword values and by start/end (start defaults to
+    the last N days). With limit, the next page's cursor is returned in the
+    X-Next-Cursor header. fields projects the output, e.g.
+    keyword,timestamp,results.title,results.url. dedup drops results whose
+    canonical URL appeared earlier in the response. new_only keeps only results whose
+    URL the keyword had not returned in an earlier run. aggregate=daily
+    returns searches and result counts per keyword per day instead.
+    Responses carry an ETag and are served from cache until the next write.
+    """
     try:
-        return storage.get_search_results(days)
+        since = start or datetime.now() - timedelta(days=days)
+        if aggregate is not None:
+            if aggregate != "daily":
+                raise HTTPException(status_code=400, detail=f"Unknown aggregate: {aggregate}")
+            return await responses.respond(request, lambda: storage.count_results_by_day(since, end, keyword))
+
+        projection = parse_fields(fields)
+
+        async def build():
+            searches, next_cursor = await storage.query_search_records(since, end, keyword, limit, cursor, new_only)
+            # Encode off the event loop too; a month of results is a large body
+            body = await storage.run(encode_searches, searches, projection, dedup)
+            return body, {"X-Next-Cursor": next_cursor} if next_cursor else None
+
+        return await responses.respond(request, build)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting search results: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/run-search")
+@app.get("/results/stream")
+async def stream_results(
+    days: int = 7,
+    keyword: Optional[List[str]] = Query(None),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    dedup: bool = False,
+    new_only: bool = False,
+    per: str = "search"
+):
+    """
+    Stored searches as newline-delimited JSON, oldest first, written as
+    they are read from storage. Takes the same filters as /results;
+    per=result emits one line per result instead of one per search.
+    """
+    if per not in ("search", "result"):
+        raise HTTPException(status_code=400, detail=f"Unknown per: {per}")
+    try:
+        projection = parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    since = start or datetime.now() - timedelta(days=days)
+    seen_urls = set() if dedup else None
+
+    async def lines():
+        try:
+            async for page in storage.iter_search_pages(since, end, keyword, new_only):
+                yield await storage.run(encode_ndjson, page, projection, seen_urls, per == "result")
+        except Exception as e:
+            # Headers are already sent, so the client sees a truncated stream
+            logger.error(f"Error streaming search results: {str(e)}")
+            raise
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.get("/archive/search", response_model=ArchiveSearchResponse)
+async def search_archive(
+    q: str,
+    days: int = 30,
+    keyword: Optional[List[str]] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """
+    Full-text search over stored result titles and descriptions, best
+    match first. Matches are wrapped in <mark>; pass next_cursor back as
+    cursor for the next page.
+    """
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    try:
+        since = datetime.now() - timedelta(days=days)
+        hits, next_cursor = await storage.search_archive(q, since, keyword, limit, cursor)
+        return ArchiveSearchResponse(query=q, hits=hits, next_cursor=next_cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error searching archive: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/trends")
+async def get_trends(request: Request, days: int = 30, keyword: Optional[List[str]] = Query(None)):
+    """Per keyword, per day rollups: result counts, new vs seen URLs, domains and top terms"""
+    try:
+        since = (datetime.now() - timedelta(days=days)).date()
+        return await responses.respond(request, lambda: storage.get_trends(since, keyword))
+    except Exception as e:
+        logger.error(f"Error getting trends: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/terms")
+async def get_terms(request: Request, days: int = 7, keyword: Optional[List[str]] = Query(None),
+                    limit: int = Query(100, ge=1, le=1000)):
+    """Most frequent terms in result titles and descriptions"""
+    async def build():
+        terms = await storage.get_term_frequencies(since, keyword, limit)
+        return [{"term": term, "count": count} for term, count in terms]
+
+    try:
+        since = (datetime.now() - timedelta(days=days)).date()
+        return await responses.respond(request, build)
+    except Exception as e:
+        logger.error(f"Error getting term frequencies: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/wordcloud")
+async def get_word_cloud(days: int = 7, keyword: Optional[List[str]] = Query(None)):
+    """Word cloud PNG for the last N days; 204 when there are no terms yet"""
+    try:
+        image = await word_clouds.get_png(days, keyword)
+        if image is None:
+            return Response(status_code=204)
+        return Response(content=image, media_type="image/png")
+    except Exception as e:
+        logger.error(f"Error rendering word cloud: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/content")
+async def get_content(url: str):
+    """Main text extracted from a result page, once enrichment has fetched it"""
+    if enrichment is None:
+        raise HTTPException(status_code=404, detail="Enrichment is disabled")
+    try:
+        text = await enrichment.get_text(url)
+    except Exception as e:
+        logger.error(f"Error reading page content: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    if text is None:
+        raise HTTPException(status_code=404, detail="No content stored for this URL")
+    return {"url": url, "text": text}
+
+@app.get("/clusters")
+async def get_clusters(days: int = 7):
+    """Topic cluster graph (nodes and links) for results seen in the last N days"""
+    try:
+        return await clustering.get_graph(days)
+    except Exception as e:
+        logger.error(f"Error building cluster graph: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/run-search", status_code=202)
 async def run_manual_search():
-    """Manually trigger a search for all keywords"""
-    try:
-        keywords = storage.get_keywords()
-        results = []
-
-        if not keywords:
-            return {"message": "No keywords found to search"}
-
-        for keyword in keywords:
-            if keyword.is_active:
-                try:
-                    await asyncio.sleep(1)  # Add a small delay between searches
-                    logger.info(f"Searching for keyword: {keyword.value}")
-                    search_results = await search_brave(keyword.value)
-
-                    search = KeywordSearch(
-                        keyword=keyword.value,
-                        results=search_results,
-                        timestamp=datetime.now()
-                    )
-                    storage.save_search_results(search)
-                    results.append({
-                        "keyword": keyword.value,
-                        "count": len(search_results)
-                    })
-                    logger.info(f"Successfully saved results for keyword: {keyword.value}")
-                except Exception as e:
-                    logger.error(f"Error searching for keyword {keyword.value}: {str(e)}")
-                    results.append({
-                        "keyword": keyword.value,
-                        "error": str(e)
-                    })
-
-        return {"message": "Manual search completed", "results": results}
+    """
+    Start a search for all keywords in the background and return its job.
+    A trigger while a search is already running returns that job instead.
+    """
+    if scheduler is None:
+        raise HTTPException(status_code=503, detail="Scheduler is not available")
+    try:
+        job = await scheduler.trigger_search()
+        return {"message": "Manual search started", "job": job.dict(exclude_none=True)}
     except Exception as e:
         logger.error(f"Error in manual search: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/run-search/{job_id}")
+async def get_search_job(job_id: str):
+    """Progress of a search job: status, keywords completed and per keyword results"""
+    job = await scheduler.get_job(job_id) if scheduler is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.dict(exclude_none=True)
+
+@app.get("/schedule")
+async def get_schedule():
+    """Each active keyword's current interval in seconds with its last and next run"""
+    if scheduler is None:
+        raise HTTPException(status_code=503, detail="Scheduler is not available")
+    try:
+        return await scheduler.get_schedule()
+    except Exception as e:
+        logger.error(f"Error getting schedule: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 def start():
     """Start the FastAPI server"""
     try:
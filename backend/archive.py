@@ -0,0 +1,88 @@
+import html
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Set
+from .text import strip_html, tokenize
+
+QUERY_TERM_RE = re.compile(r"\w+", re.UNICODE)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Match delimiters that cannot occur in stored text, swapped for <mark> after escaping
+MARK_START = "\x02"
+MARK_END = "\x03"
+
+
+def fts_query(query: str) -> str:
+    """
+    Turn free text into an FTS5 query that matches documents containing
+    every word, so user input never hits FTS5 syntax errors.
+    """
+    return " ".join(f'"{term}"' for term in QUERY_TERM_RE.findall(query))
+
+
+def render_marks(text: str) -> str:
+    """
+    HTML-escape text delimited with MARK_START/MARK_END and turn the
+    delimiters into <mark> tags, so only the highlights are markup
+    """
+    return html.escape(text).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def highlight(text: str, terms: Set[str]) -> str:
+    """HTML-escape text and wrap the words whose token is one of terms in <mark>"""
+    text = text.replace(MARK_START, "").replace(MARK_END, "")
+    return render_marks(re.sub(
+        r"[A-Za-z][A-Za-z0-9'-]+",
+        lambda m: f"{MARK_START}{m.group(0)}{MARK_END}" if m.group(0).lower() in terms else m.group(0),
+        text
+    ))
+
+
+def snippet(text: str, terms: Set[str], width: int = 32) -> str:
+    """Window of about width words around the first match, escaped and highlighted"""
+    words = text.split()
+    first = next((i for i, w in enumerate(words) if tokenize(w) and tokenize(w)[0] in terms), 0)
+    start = max(0, first - width // 4)
+    window = " ".join(words[start:start + width])
+    prefix = "…" if start > 0 else ""
+    suffix = "…" if start + width < len(words) else ""
+    return f"{prefix}{highlight(window, terms)}{suffix}"
+
+
+def rank_documents(documents: List[Dict], query: str) -> List[Dict]:
+    """
+    Rank documents with title and description by BM25, title weighted
+    twice, keeping only those that contain every query term. Used by the
+    file backends, which have no full-text index.
+    """
+    terms = set(tokenize(query))
+    if not terms:
+        return []
+    tokenized = [
+        Counter(tokenize(strip_html(d["title"])) * 2 + tokenize(strip_html(d["description"])))
+        for d in documents
+    ]
+    lengths = [sum(counts.values()) for counts in tokenized]
+    average_length = sum(lengths) / len(lengths) if lengths else 0
+    frequencies = Counter(term for counts in tokenized for term in terms if term in counts)
+
+    ranked = []
+    for document, counts, length in zip(documents, tokenized, lengths):
+        if not all(term in counts for term in terms):
+            continue
+        score = 0.0
+        for term in terms:
+            idf = math.log(1 + (len(documents) - frequencies[term] + 0.5) / (frequencies[term] + 0.5))
+            tf = counts[term]
+            score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / average_length))
+        title = strip_html(document["title"])
+        description = strip_html(document["description"])
+        ranked.append({
+            **document,
+            "title": highlight(title, terms),
+            "snippet": snippet(description, terms),
+            "score": round(score, 6)
+        })
+    ranked.sort(key=lambda hit: -hit["score"])
+    return ranked
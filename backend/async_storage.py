@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from .models import KeywordSearch, Keyword
+from .records import SearchRecord
+from config import STORAGE_THREADS, STREAM_BATCH_SIZE, DEFAULT_KEYWORD_GROUP
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class AsyncStorage:
+    """
+    Async facade over a blocking storage engine.
+
+    Every call runs in a small thread pool so file reads, JSON parsing and
+    SQLite queries never block the event loop. Writes additionally hold a
+    lock, so concurrent saves are applied one at a time. ``version`` grows
+    with every saved search and keyword change so callers can tell when
+    derived data is stale.
+    """
+
+    def __init__(self, storage, max_workers: int = STORAGE_THREADS):
+        self.storage = storage
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage")
+        self._write_lock = threading.Lock()
+        self.version = 0
+        self._change_token = None
+
+    async def run(self, fn, *args, **kwargs):
+        """Run a blocking callable on the storage threads, e.g. to encode a large response"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def _write(self, fn, *args, **kwargs):
+        def locked():
+            with self._write_lock:
+                return fn(*args, **kwargs)
+        return await self.run(locked)
+
+    async def sync_version(self):
+        """
+        Bump version when storage changed since the last sync, so caches in
+        this process also notice writes made by other API workers
+        """
+        token = await self.run(self.storage.change_token)
+        if self._change_token is not None and token != self._change_token:
+            self.version += 1
+        self._change_token = token
+
+    async def get_keywords(self, group: Optional[str] = None) -> List[Keyword]:
+        return await self.run(self.storage.get_keywords, group)
+
+    async def add_keyword(self, keyword: str, group: str = DEFAULT_KEYWORD_GROUP) -> bool:
+        try:
+            return await self._write(self.storage.add_keyword, keyword, group)
+        finally:
+            self.version += 1
+
+    async def add_keywords(self, keywords: List[Dict]) -> Dict[str, int]:
+        try:
+            return await self._write(self.storage.add_keywords, keywords)
+        finally:
+            self.version += 1
+
+    async def remove_keyword(self, keyword: str):
+        try:
+            return await self._write(self.storage.remove_keyword, keyword)
+        finally:
+            self.version += 1
+
+    async def save_search_results(self, keyword_search: KeywordSearch) -> Optional[bool]:
+        try:
+            return await self._write(self.storage.save_search_results, keyword_search)
+        finally:
+            self.version += 1
+
+    async def get_search_results(self, days: int = 7, keyword: Optional[str] = None) -> List[KeywordSearch]:
+        return await self.run(self.storage.get_search_results, days, keyword)
+
+    async def get_searches_since(self, since: datetime, keyword: Optional[str] = None) -> List[KeywordSearch]:
+        return await self.run(self.storage.get_searches_since, since, keyword)
+
+    async def get_searches_after(self, position: Optional[Any] = None) -> Tuple[List[KeywordSearch], Any]:
+        return await self.run(self.storage.get_searches_after, position)
+
+    async def query_searches(self, since: datetime, until: Optional[datetime] = None,
+                             keywords: Optional[List[str]] = None, limit: Optional[int] = None,
+                             cursor: Optional[str] = None,
+                             new_only: bool = False) -> Tuple[List[KeywordSearch], Optional[str]]:
+        return await self.run(self.storage.query_searches, since, until, keywords, limit, cursor, new_only)
+
+    async def query_search_records(self, since: datetime, until: Optional[datetime] = None,
+                                   keywords: Optional[List[str]] = None, limit: Optional[int] = None,
+                                   cursor: Optional[str] = None,
+                                   new_only: bool = False) -> Tuple[List[SearchRecord], Optional[str]]:
+        return await self.run(self.storage.query_search_records, since, until, keywords, limit, cursor, new_only)
+
+    async def iter_search_pages(self, since: datetime, until: Optional[datetime] = None,
+                                keywords: Optional[List[str]] = None, new_only: bool = False,
+                                batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[List[SearchRecord]]:
+        """Yield the searches in (since, until] a page at a time, so a long window is never held at once"""
+        pages = self.storage.iter_search_pages(since, until, keywords, new_only, batch_size)
+        while True:
+            # Each batch is read on the storage threads; None marks the end
+            page = await self.run(next, pages, None)
+            if page is None:
+                break
+            yield page
+
+    async def count_results_by_day(self, since: datetime, until: Optional[datetime] = None,
+                                   keywords: Optional[List[str]] = None) -> List[Dict]:
+        return await self.run(self.storage.count_results_by_day, since, until, keywords)
+
+    async def get_trends(self, since: date, keywords: Optional[List[str]] = None) -> List[Dict]:
+        return await self.run(self.storage.get_trends, since, keywords)
+
+    async def get_term_frequencies(self, since: date, keywords: Optional[List[str]] = None,
+                                   limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        return await self.run(self.storage.get_term_frequencies, since, keywords, limit)
+
+    async def search_archive(self, query: str, since: datetime, keywords: Optional[List[str]] = None,
+                             limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        return await self.run(self.storage.search_archive, query, since, keywords, limit, cursor)
+
+    async def get_pages(self, urls: List[str]) -> Dict[str, Dict]:
+        return await self.run(self.storage.get_pages, urls)
+
+    async def save_pages(self, outcomes: Dict[str, Dict]):
+        return await self._write(self.storage.save_pages, outcomes)
+
+    async def get_schedule(self) -> Dict[str, Dict]:
+        return await self.run(self.storage.get_schedule)
+
+    async def save_schedule(self, entries: Dict[str, Dict]):
+        return await self._write(self.storage.save_schedule, entries)
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        return await self.run(self.storage.get_job, job_id)
+
+    async def get_active_jobs(self) -> List[Dict]:
+        return await self.run(self.storage.get_active_jobs)
+
+    async def save_job(self, job: Dict):
+        return await self._write(self.storage.save_job, job)
+
+    async def queue_job(self, job: Dict) -> Dict:
+        return await self._write(self.storage.queue_job, job)
+
+    async def load_cached_searches(self, since: float, limit: int) -> List[Dict]:
+        return await self.run(self.storage.load_cached_searches, since, limit)
+
+    async def save_cached_search(self, key: str, results: List[Dict], fetched_at: float, max_age: float):
+        return await self._write(self.storage.save_cached_search, key, results, fetched_at, max_age)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+        logger.info("Storage executor shut down")
@@ -1,23 +1,79 @@
 import aiohttp
 import asyncio
+import math
 from datetime import datetime
-from typing import List
+from typing import List, Optional, Set, Tuple
 import logging
 from .models import SearchResult
-from config import BRAVE_API_KEY, BRAVE_SEARCH_URL
+from .rate_limiter import brave_rate_limiter
+from .text import canonical_url
+from config import (
+    BRAVE_API_KEY, BRAVE_SEARCH_URL, BRAVE_POOL_SIZE,
+    BRAVE_KEEPALIVE_SECONDS, BRAVE_REQUEST_TIMEOUT, BRAVE_PAGE_SIZE, BRAVE_MAX_PAGES,
+    BRAVE_PAGE_CONCURRENCY, BRAVE_PAGE_DUPLICATE_RATIO, RESULTS_PER_SEARCH
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def search_brave(keyword: str, retry_count: int = 3) -> List[SearchResult]:
+class BraveClient:
     """
-    Perform a search using the Brave Search API with retry logic
+    Process-wide HTTP client for the Brave Search API.
+
+    Owns one aiohttp session with a keep-alive connection pool, so requests
+    reuse warm TCP/TLS connections instead of reconnecting every time. The
+    FastAPI app starts and closes it; anything else gets a session lazily.
     """
-    if not BRAVE_API_KEY:
-        logger.error("Brave API key not configured")
-        raise ValueError("Brave API key not configured")
 
+    def __init__(self, search_url: str = BRAVE_SEARCH_URL, pool_size: int = BRAVE_POOL_SIZE,
+                 keepalive_timeout: float = BRAVE_KEEPALIVE_SECONDS,
+                 request_timeout: float = BRAVE_REQUEST_TIMEOUT):
+        self.search_url = search_url
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.request_timeout = request_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self):
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_size,
+            ttl_dns_cache=300,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+        )
+        self._loop = asyncio.get_running_loop()
+        logger.info(f"Brave client started with a pool of {self.pool_size} connections")
+
+    async def session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it if needed on the running loop"""
+        if self._loop is not None and self._loop is not asyncio.get_running_loop():
+            # Sessions are bound to the loop that created them
+            self._session = None
+        await self.start()
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("Brave client closed")
+        self._session = None
+        self._loop = None
+
+brave_client = BraveClient()
+
+async def _fetch_page(keyword: str, offset: int, count: int, retry_count: int) -> Tuple[List[SearchResult], bool]:
+    """
+    Fetch one page of web results with retry logic. Returns the results and
+    whether Brave reports more results after this page.
+    """
     headers = {
         "Accept": "application/json",
         "X-Subscription-Token": BRAVE_API_KEY
@@ -25,7 +81,8 @@ async def search_brave(keyword: str, retry_count: int = 3) -> List[SearchResult]
 
     params = {
         "q": keyword,
-        "count": 10
+        "count": count,
+        "offset": offset
     }
 
     for attempt in range(retry_count):
@@ -35,42 +92,102 @@ async def search_brave(keyword: str, retry_count: int = 3) -> List[SearchResult]
             logger.info(f"Waiting {wait_time} seconds before retry {attempt + 1}")
             await asyncio.sleep(wait_time)
 
-        logger.info(f"Making Brave Search API request for keyword: {keyword} (attempt {attempt + 1})")
-        async with aiohttp.ClientSession() as session:
-            try:
-                async with session.get(BRAVE_SEARCH_URL, headers=headers, params=params) as response:
-                    if response.status == 429 and attempt < retry_count - 1:
-                        error_text = await response.text()
-                        logger.warning(f"Rate limited, will retry: {error_text}")
-                        continue
-
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Brave Search API error: Status {response.status}, Response: {error_text}")
-                        raise Exception(f"Brave Search API error: {response.status}")
-
-                    data = await response.json()
-                    logger.info(f"Received response from Brave Search API for {keyword}")
-
-                    results = []
-                    web_results = data.get("web", {}).get("results", [])
-                    logger.info(f"Found {len(web_results)} results for keyword: {keyword}")
-
-                    for web_result in web_results:
-                        result = SearchResult(
-                            title=web_result["title"],
-                            url=web_result["url"],
-                            description=web_result["description"],
-                            date=datetime.now()
-                        )
-                        results.append(result)
-
-                    return results
-            except Exception as e:
-                if attempt < retry_count - 1:
-                    logger.warning(f"Error on attempt {attempt + 1}, will retry: {str(e)}")
+        await brave_rate_limiter.acquire()
+        logger.info(f"Making Brave Search API request for keyword: {keyword} page {offset} (attempt {attempt + 1})")
+        session = await brave_client.session()
+        try:
+            async with session.get(brave_client.search_url, headers=headers, params=params) as response:
+                if response.status == 429 and attempt < retry_count - 1:
+                    error_text = await response.text()
+                    logger.warning(f"Rate limited, will retry: {error_text}")
                     continue
-                logger.error(f"Failed to fetch search results for {keyword}: {str(e)}")
-                raise Exception(f"Failed to fetch search results: {str(e)}")
 
-    raise Exception("Max retries exceeded")
\ No newline at end of file
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"Brave Search API error: Status {response.status}, Response: {error_text}")
+                    raise Exception(f"Brave Search API error: {response.status}")
+
+                data = await response.json()
+                web_results = data.get("web", {}).get("results", [])
+                logger.info(f"Found {len(web_results)} results for keyword: {keyword} page {offset}")
+
+                results = []
+                for web_result in web_results:
+                    result = SearchResult(
+                        title=web_result["title"],
+                        url=web_result["url"],
+                        description=web_result["description"],
+                        date=datetime.now()
+                    )
+                    results.append(result)
+
+                more = data.get("query", {}).get("more_results_available", len(web_results) >= count)
+                return results, bool(more)
+        except Exception as e:
+            if attempt < retry_count - 1:
+                logger.warning(f"Error on attempt {attempt + 1}, will retry: {str(e)}")
+                continue
+            logger.error(f"Failed to fetch search results for {keyword} page {offset}: {str(e)}")
+            raise Exception(f"Failed to fetch search results: {str(e)}")
+
+    raise Exception("Max retries exceeded")
+
+
+async def search_brave(keyword: str, retry_count: int = 3, count: int = RESULTS_PER_SEARCH) -> List[SearchResult]:
+    """
+    Perform a search using the Brave Search API, collecting up to count results.
+
+    Brave serves at most BRAVE_PAGE_SIZE results per request, so deeper
+    searches fetch the first page, then the remaining pages a few at a time
+    through the shared client and rate limiter. Results are merged in page
+    order and deduplicated by canonical URL. Paging stops when Brave has no
+    more results or a page is mostly URLs already seen.
+    """
+    if not BRAVE_API_KEY:
+        logger.error("Brave API key not configured")
+        raise ValueError("Brave API key not configured")
+
+    page_size = max(1, min(count, BRAVE_PAGE_SIZE))
+    max_pages = min(BRAVE_MAX_PAGES, math.ceil(count / page_size))
+    results: List[SearchResult] = []
+    seen_urls: Set[str] = set()
+
+    def merge(page: List[SearchResult]) -> float:
+        """Add the page's new URLs and return the share that were duplicates"""
+        duplicates = 0
+        for result in page:
+            url = canonical_url(result.url)
+            if url in seen_urls:
+                duplicates += 1
+                continue
+            seen_urls.add(url)
+            results.append(result)
+        return duplicates / len(page) if page else 1.0
+
+    page, more = await _fetch_page(keyword, 0, page_size, retry_count)
+    merge(page)
+    offset = 1
+    while more and offset < max_pages and len(results) < count:
+        wanted = math.ceil((count - len(results)) / page_size)
+        offsets = range(offset, min(max_pages, offset + min(wanted, BRAVE_PAGE_CONCURRENCY)))
+        pages = await asyncio.gather(
+            *(_fetch_page(keyword, o, page_size, retry_count) for o in offsets),
+            return_exceptions=True
+        )
+        for o, fetched in zip(offsets, pages):
+            if isinstance(fetched, Exception):
+                # Keep what the earlier pages returned rather than failing the whole search
+                logger.warning(f"Stopping pagination for {keyword} at page {o}: {str(fetched)}")
+                more = False
+                break
+            page, more = fetched
+            duplicate_ratio = merge(page)
+            if duplicate_ratio >= BRAVE_PAGE_DUPLICATE_RATIO:
+                logger.info(f"Stopping pagination for {keyword} at page {o}: {duplicate_ratio:.0%} duplicates")
+                more = False
+            if not more:
+                break
+        offset = offsets.stop
+
+    logger.info(f"Collected {len(results)} results for keyword: {keyword}")
+    return results[:count]
@@ -0,0 +1,339 @@
+import threading
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+from scipy import sparse
+from sklearn.cluster import DBSCAN
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+from .models import KeywordSearch
+from config import (
+    RETENTION_DAYS, CLUSTER_EPS, CLUSTER_MIN_SAMPLES, CLUSTER_LINK_THRESHOLD,
+    CLUSTER_RECLUSTER_RATIO, CLUSTER_MAX_NEIGHBORS
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 2 ** 18
+CHUNK_SIZE = 1000
+
+
+def similarity_graph(matrix: sparse.csr_matrix, threshold: float,
+                     max_neighbors: int = CLUSTER_MAX_NEIGHBORS) -> sparse.csr_matrix:
+    """
+    Sparse cosine similarity graph of L2-normalized rows.
+
+    Keeps only pairs with similarity >= threshold and at most max_neighbors
+    strongest neighbours per row, without the diagonal. Rows are multiplied
+    in chunks so memory grows with the number of kept edges, not with N^2.
+    The result is symmetric.
+    """
+    n = matrix.shape[0]
+    rows, cols, values = [], [], []
+    transposed = matrix.T.tocsc()
+    for start in range(0, n, CHUNK_SIZE):
+        block = (matrix[start:start + CHUNK_SIZE] @ transposed).tocsr()
+        block.data[block.data < threshold] = 0
+        block.setdiag(0, k=start)
+        block.eliminate_zeros()
+        for i in range(block.shape[0]):
+            lo, hi = block.indptr[i], block.indptr[i + 1]
+            row_cols, row_values = block.indices[lo:hi], block.data[lo:hi]
+            if hi - lo > max_neighbors:
+                keep = np.argpartition(row_values, -max_neighbors)[-max_neighbors:]
+                row_cols, row_values = row_cols[keep], row_values[keep]
+            rows.append(np.full(len(row_cols), start + i))
+            cols.append(row_cols)
+            values.append(row_values)
+
+    if rows:
+        graph = sparse.csr_matrix(
+            (np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=(n, n)
+        )
+    else:
+        graph = sparse.csr_matrix((n, n))
+    # Keep an edge if either endpoint selected it
+    return graph.maximum(graph.T).tocsr()
+
+
+def confidence_scores(graph: sparse.csr_matrix, threshold: float) -> np.ndarray:
+    """Mean similarity of each node to itself and its neighbours above threshold"""
+    strong = graph.multiply(graph > threshold).tocsr()
+    totals = np.asarray(strong.sum(axis=1)).ravel() + 1.0
+    counts = np.diff(strong.indptr) + 1
+    return np.clip(totals / counts, 0.1, 1.0)
+
+
+def align_to(coordinates: np.ndarray, target: np.ndarray) -> tuple:
+    """
+    Least-squares similarity transform (rotation or reflection, uniform
+    scale, translation) mapping coordinates onto target positions.
+    Returns (rotation, scale, source mean, target mean).
+    """
+    mu_src, mu_dst = coordinates.mean(axis=0), target.mean(axis=0)
+    src, dst = coordinates - mu_src, target - mu_dst
+    u, singular, vt = np.linalg.svd(src.T @ dst)
+    rotation = u @ vt
+    scale = singular.sum() / max((src ** 2).sum(), 1e-12)
+    return rotation, scale, mu_src, mu_dst
+
+
+def project_2d(matrix: sparse.csr_matrix) -> np.ndarray:
+    """Two-dimensional projection of TF-IDF rows with truncated SVD"""
+    n = matrix.shape[0]
+    if n < 3:
+        return np.column_stack([np.arange(n, dtype=float), np.zeros(n)])
+    return TruncatedSVD(n_components=2, random_state=42).fit_transform(matrix)
+
+
+class _Document:
+    __slots__ = ("key", "title", "url", "keyword", "counts", "last_seen", "cluster")
+
+    def __init__(self, key: str, title: str, url: str, keyword: str, counts, last_seen: datetime):
+        self.key = key
+        self.title = title
+        self.url = url
+        self.keyword = keyword
+        self.counts = counts
+        self.last_seen = last_seen
+        self.cluster = -1
+
+
+class ClusteringService:
+    """
+    Keeps a term vector and a cluster label for every stored result.
+
+    Terms are hashed, so there is no vocabulary to refit; document
+    frequencies are kept as running counts to weight them by IDF. New
+    searches are pulled from storage after the last position read, which
+    follows save order rather than timestamps, and assigned
+    to the nearest existing cluster. A full DBSCAN pass only runs when the
+    share of incrementally assigned documents exceeds CLUSTER_RECLUSTER_RATIO.
+    Graphs are cached per window until the documents change; results that
+    are only seen again, as in an unchanged daily run, do not count.
+    """
+
+    def __init__(self, storage, eps: float = CLUSTER_EPS, min_samples: int = CLUSTER_MIN_SAMPLES,
+                 recluster_ratio: float = CLUSTER_RECLUSTER_RATIO):
+        self.storage = storage
+        self.eps = eps
+        self.min_samples = min_samples
+        self.recluster_ratio = recluster_ratio
+        self._vectorizer = HashingVectorizer(
+            n_features=N_FEATURES,
+            stop_words='english',
+            alternate_sign=False,
+            norm=None
+        )
+        self._docs: Dict[str, _Document] = {}
+        self._df = np.zeros(N_FEATURES, dtype=np.int64)
+        self._centroids: Optional[sparse.csr_matrix] = None
+        self._centroid_labels: np.ndarray = np.array([], dtype=int)
+        self._position = None
+        self._pending = 0
+        self._version = 0
+        self._graphs: Dict[int, tuple] = {}
+        self._positions: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    async def get_graph(self, days: int = 7) -> Dict:
+        """Return precomputed nodes and links for results seen in the last N days"""
+        searches, position = await self.storage.get_searches_after(self._position)
+        return await self.storage.run(self._update_and_build, searches, position, days)
+
+    def _update_and_build(self, searches: List[KeywordSearch], position, days: int) -> Dict:
+        with self._lock:
+            self._ingest(searches)
+            self._position = position
+            cached = self._graphs.get(days)
+            if cached and cached[0] == self._version:
+                return cached[1]
+            built_at = datetime.now()
+            graph = self._build_graph(days)
+            self._graphs[days] = (self._version, graph, built_at)
+            return graph
+
+    def _idf(self) -> np.ndarray:
+        n = len(self._docs)
+        return np.log((1 + n) / (1 + self._df)) + 1
+
+    def _tfidf(self, docs: List[_Document]) -> sparse.csr_matrix:
+        counts = sparse.vstack([d.counts for d in docs]).tocsr()
+        return normalize(counts.multiply(self._idf()).tocsr())
+
+    def _ingest(self, searches: List[KeywordSearch]):
+        new_docs: List[_Document] = []
+        texts: List[str] = []
+        changed = False
+        for search in searches:
+            for result in search.results:
+                title = result.title.strip()
+                desc = result.description.strip()
+                if not title or not desc:
+                    continue
+                key = f"{search.keyword.lower()}|{result.url}"
+                doc = self._docs.get(key)
+                if doc is not None:
+                    if search.timestamp > doc.last_seen:
+                        # Seeing a result again only matters to graphs whose window had dropped it
+                        changed = changed or self._left_out(doc.last_seen)
+                        doc.last_seen = search.timestamp
+                    continue
+                doc = _Document(key, title, result.url, search.keyword, None, search.timestamp)
+                self._docs[key] = doc
+                new_docs.append(doc)
+                texts.append(f"{title} {desc}")
+
+        if new_docs:
+            counts = self._vectorizer.transform(texts).tocsr()
+            for i, doc in enumerate(new_docs):
+                doc.counts = counts[i]
+            self._df += np.bincount(counts.indices, minlength=N_FEATURES)
+            changed = True
+
+        changed = self._expire() or changed
+        if not changed:
+            return
+
+        self._version += 1
+        self._pending += len(new_docs)
+        if self._centroids is None or self._pending > self.recluster_ratio * len(self._docs):
+            self._recluster()
+        elif new_docs:
+            self._assign(new_docs)
+
+    def _left_out(self, last_seen: datetime) -> bool:
+        """Whether a cached graph was built without documents last seen at last_seen"""
+        return any(
+            last_seen <= built_at - timedelta(days=days)
+            for days, (_, _, built_at) in self._graphs.items()
+        )
+
+    def _expire(self) -> bool:
+        cutoff = datetime.now() - timedelta(days=RETENTION_DAYS)
+        expired = [key for key, doc in self._docs.items() if doc.last_seen <= cutoff]
+        for key in expired:
+            doc = self._docs.pop(key)
+            self._df[doc.counts.indices] -= 1
+            self._positions.pop(key, None)
+        return bool(expired)
+
+    def _recluster(self):
+        """Run DBSCAN over every document and rebuild the cluster centroids"""
+        docs = list(self._docs.values())
+        self._pending = 0
+        if not docs:
+            self._centroids = None
+            return
+
+        matrix = self._tfidf(docs)
+        labels = self._dbscan(similarity_graph(matrix, 1 - self.eps))
+        for doc, label in zip(docs, labels):
+            doc.cluster = int(label)
+
+        cluster_ids = np.unique(labels[labels != -1])
+        if len(cluster_ids):
+            members = sparse.csr_matrix(
+                (np.ones(int(np.sum(labels != -1))),
+                 (np.searchsorted(cluster_ids, labels[labels != -1]), np.flatnonzero(labels != -1))),
+                shape=(len(cluster_ids), len(docs))
+            )
+            self._centroids = normalize(members @ matrix)
+        else:
+            self._centroids = sparse.csr_matrix((0, N_FEATURES))
+        self._centroid_labels = cluster_ids
+        logger.info(f"Reclustered {len(docs)} documents into {len(cluster_ids)} clusters")
+
+    def _dbscan(self, graph: sparse.csr_matrix) -> np.ndarray:
+        """DBSCAN on a sparse similarity graph; missing pairs count as too far apart"""
+        distances = graph.copy()
+        # Stored zeros still mark neighbours, so identical documents keep their edge
+        distances.data = np.clip(1 - distances.data, 0, 1)
+        return DBSCAN(
+            eps=self.eps,
+            min_samples=self.min_samples,
+            metric='precomputed'
+        ).fit_predict(distances)
+
+    def _assign(self, docs: List[_Document]):
+        """Attach new documents to the most similar existing cluster, if close enough"""
+        if self._centroids is None or self._centroids.shape[0] == 0:
+            return
+        similarities = (self._tfidf(docs) @ self._centroids.T).toarray()
+        best = similarities.argmax(axis=1)
+        for i, doc in enumerate(docs):
+            if 1 - similarities[i, best[i]] <= self.eps:
+                doc.cluster = int(self._centroid_labels[best[i]])
+        logger.info(f"Assigned {len(docs)} new documents to existing clusters")
+
+    def _layout(self, docs: List[_Document], matrix: sparse.csr_matrix) -> np.ndarray:
+        """
+        2-D positions for docs, seeded from the previous layout.
+
+        Documents that were laid out before keep their position. New ones are
+        projected with truncated SVD, and the projection is fitted onto the
+        known positions so the map does not rotate or flip between requests.
+        """
+        projected = project_2d(matrix)
+        known = np.array([doc.key in self._positions for doc in docs])
+        if known.sum() >= 3:
+            previous = np.array([self._positions[doc.key] for doc in docs if doc.key in self._positions])
+            rotation, scale, mu_src, mu_dst = align_to(projected[known], previous)
+            coordinates = (projected - mu_src) @ rotation * scale + mu_dst
+            coordinates[known] = previous
+        else:
+            coordinates = projected
+
+        for doc, position in zip(docs, coordinates):
+            self._positions[doc.key] = position
+        return coordinates
+
+    def _build_graph(self, days: int) -> Dict:
+        cutoff = datetime.now() - timedelta(days=days)
+        docs = [doc for doc in self._docs.values() if doc.last_seen > cutoff]
+        if not docs:
+            return {"nodes": [], "links": []}
+
+        matrix = self._tfidf(docs)
+        graph = similarity_graph(matrix, min(1 - self.eps, CLUSTER_LINK_THRESHOLD))
+        labels = np.array([doc.cluster for doc in docs])
+        probabilities = confidence_scores(graph, CLUSTER_LINK_THRESHOLD)
+
+        coordinates = self._layout(docs, matrix)
+
+        # Scale coordinates to the canvas
+        x_min, x_max = np.min(coordinates[:, 0]), np.max(coordinates[:, 0])
+        y_min, y_max = np.min(coordinates[:, 1]), np.max(coordinates[:, 1])
+        x_scale = 800 / (x_max - x_min + 1e-10)
+        y_scale = 600 / (y_max - y_min + 1e-10)
+
+        nodes = []
+        for i, doc in enumerate(docs):
+            nodes.append({
+                'id': str(i),
+                'title': doc.title,
+                'url': doc.url,
+                'keyword': doc.keyword,
+                'x': float((coordinates[i, 0] - x_min) * x_scale),
+                'y': float((coordinates[i, 1] - y_min) * y_scale),
+                'cluster': int(labels[i]),
+                'confidence': float(probabilities[i])
+            })
+
+        # Link similar documents of the same cluster, straight from the sparse edges
+        edges = sparse.triu(graph, k=1).tocoo()
+        keep = (
+            (edges.data > CLUSTER_LINK_THRESHOLD)
+            & (labels[edges.row] != -1)
+            & (labels[edges.row] == labels[edges.col])
+        )
+        links = [
+            {'source': str(i), 'target': str(j), 'value': float(value)}
+            for i, j, value in zip(edges.row[keep], edges.col[keep], edges.data[keep])
+        ]
+
+        return {'nodes': nodes, 'links': links}
@@ -0,0 +1,63 @@
+"""
+JSON encoding used by the storage files and the API responses.
+
+Uses orjson when it is installed and the standard library otherwise;
+JSON_CODEC in config.py can force either. dumps() always returns UTF-8
+bytes and loads() accepts bytes or str, so callers do not depend on the
+implementation. Both raise json.JSONDecodeError (orjson's error is a
+subclass) on malformed input.
+"""
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Callable, Optional, Union
+from config import JSON_CODEC
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JSONDecodeError = json.JSONDecodeError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if JSON_CODEC == "orjson" and orjson is None:
+    raise ImportError("JSON_CODEC is set to orjson but orjson is not installed")
+if JSON_CODEC not in ("auto", "orjson", "json"):
+    raise ValueError(f"Unknown JSON codec: {JSON_CODEC}")
+
+CODEC = "orjson" if orjson is not None and JSON_CODEC != "json" else "json"
+logger.info(f"Using the {CODEC} JSON codec")
+
+
+def _default(value):
+    """Encode the non-JSON types the API hands over: dates and pydantic models"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(obj: Any, default: Optional[Callable] = None) -> bytes:
+    """
+    Encode obj as compact UTF-8 JSON. As with json.dumps, a given default
+    also receives datetimes, so ``default=str`` keeps the on-disk form
+    ``YYYY-MM-DD HH:MM:SS`` the storage files have always used.
+    """
+    if CODEC == "orjson":
+        if default is None:
+            return orjson.dumps(obj, default=_default)
+        return orjson.dumps(obj, default=default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(
+        obj, default=default or _default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if CODEC == "orjson":
+        return orjson.loads(data)
+    return json.loads(data)
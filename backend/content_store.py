@@ -0,0 +1,47 @@
+import gzip
+import hashlib
+import os
+import logging
+from typing import Optional
+from config import STORAGE_DIR, PAGES_DIR
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ContentStore:
+    """
+    Content-addressed store for extracted page text.
+
+    Each text is gzip-compressed under the SHA-256 of its contents, fanned
+    out over two-character subdirectories. Pages with identical text,
+    e.g. syndicated articles, share one file.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.path.join(STORAGE_DIR, PAGES_DIR)
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], f"{digest}.txt.gz")
+
+    def put(self, text: str) -> str:
+        """Store text if it is not stored yet and return its digest"""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(data))
+            os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        try:
+            with open(self._path(digest), 'rb') as f:
+                return gzip.decompress(f.read()).decode("utf-8")
+        except FileNotFoundError:
+            return None
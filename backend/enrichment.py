@@ -0,0 +1,212 @@
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set
+import aiohttp
+from .content_store import ContentStore
+from .text import canonical_url, url_domain
+from config import (
+    ENRICH_CONCURRENCY, ENRICH_PER_DOMAIN, ENRICH_TIMEOUT, ENRICH_PROCESSES, ENRICH_MAX_BYTES,
+    ENRICH_FLUSH_SIZE
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+EMPTY = "empty"
+FAILED = "failed"
+
+
+def extract_text(html: str) -> Optional[str]:
+    """Main text of an HTML page; runs in a worker process"""
+    import trafilatura
+    return trafilatura.extract(html, include_comments=False, include_tables=False)
+
+
+class EnrichmentService:
+    """
+    Background stage that fetches each newly seen result URL once and
+    stores its main text.
+
+    URLs are queued after a search is saved. A fixed set of workers fetches
+    them with a per-request timeout, at most ``per_domain`` at a time for
+    any one domain. Extraction runs in a process pool so it never holds up
+    the event loop, and the text lands in a ContentStore while storage
+    records the outcome per URL. Outcomes are buffered and saved
+    ``flush_size`` at a time or once the queue is drained; a URL stays
+    pending until its outcome is saved, so it is never queued twice.
+
+    Only the API worker running searches queues URLs, so the HTTP session,
+    workers and process pool are only set up on the first enqueue after
+    start(), and followers never create them.
+    """
+
+    def __init__(self, storage, content_store: Optional[ContentStore] = None,
+                 concurrency: int = ENRICH_CONCURRENCY, per_domain: int = ENRICH_PER_DOMAIN,
+                 timeout: float = ENRICH_TIMEOUT, processes: int = ENRICH_PROCESSES,
+                 max_bytes: int = ENRICH_MAX_BYTES, flush_size: int = ENRICH_FLUSH_SIZE):
+        self.storage = storage
+        self.content_store = content_store or ContentStore()
+        self.concurrency = concurrency
+        self.per_domain = per_domain
+        self.timeout = timeout
+        self.processes = processes
+        self.max_bytes = max_bytes
+        self.flush_size = flush_size
+        self._outcomes: Dict[str, Dict] = {}
+        self._busy = 0
+        self._started = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Set[str] = set()
+        # Per-domain semaphore and the number of fetches using it; idle domains are dropped
+        self._domains: Dict[str, List] = {}
+        self._workers: List[asyncio.Task] = []
+        self._enqueuing: Set[asyncio.Task] = set()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    async def start(self):
+        """Accept URLs from now on; the fetchers start with the first of them"""
+        self._started = True
+
+    def _launch(self):
+        self._queue = asyncio.Queue()
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.concurrency),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={"User-Agent": "Mozilla/5.0 (compatible; Intentionly/1.0)"}
+        )
+        self._processes = ProcessPoolExecutor(max_workers=self.processes)
+        self._workers = [asyncio.ensure_future(self._worker()) for _ in range(self.concurrency)]
+        logger.info(f"Enrichment started with {self.concurrency} fetchers and {self.processes} extractor processes")
+
+    async def close(self):
+        self._started = False
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        await self._flush()
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._processes is not None:
+            self._processes.shutdown(cancel_futures=True)
+            self._processes = None
+        self._queue = None
+        logger.info("Enrichment stopped")
+
+    def enqueue(self, urls: Iterable[str]):
+        """Queue URLs for enrichment in the background; known URLs are skipped"""
+        if not self._started:
+            return
+        if self._queue is None:
+            self._launch()
+        fresh = []
+        for url in map(canonical_url, urls):
+            if url not in self._pending:
+                self._pending.add(url)
+                fresh.append(url)
+        if fresh:
+            task = asyncio.ensure_future(self._enqueue(fresh))
+            self._enqueuing.add(task)
+            task.add_done_callback(self._on_enqueue_done)
+
+    async def _enqueue(self, urls: List[str]):
+        known = await self.storage.get_pages(urls)
+        if self._queue is None:
+            # Closed while the lookup ran
+            return
+        for url in urls:
+            if url in known:
+                self._pending.discard(url)
+            else:
+                self._queue.put_nowait(url)
+
+    def _on_enqueue_done(self, task: asyncio.Task):
+        self._enqueuing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Failed to queue URLs for enrichment: {str(task.exception())}")
+
+    async def join(self):
+        """Wait until every queued URL has been processed"""
+        while self._enqueuing:
+            await asyncio.gather(*self._enqueuing, return_exceptions=True)
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _worker(self):
+        while True:
+            url = await self._queue.get()
+            self._busy += 1
+            try:
+                await self.enrich(url)
+            except Exception as e:
+                # Record every failure, or the URL would be fetched again on each run
+                logger.error(f"Enrichment of {url} failed: {str(e) or type(e).__name__}")
+                self._record(url, FAILED, error=str(e) or type(e).__name__)
+            finally:
+                self._busy -= 1
+                if len(self._outcomes) >= self.flush_size or (self._queue.empty() and not self._busy):
+                    await self._flush()
+                self._queue.task_done()
+
+    def _record(self, url: str, status: str, content_hash: Optional[str] = None, error: Optional[str] = None):
+        self._outcomes[url] = {"status": status, "content_hash": content_hash, "error": error}
+
+    async def _flush(self):
+        """Save the buffered outcomes in one storage write"""
+        outcomes, self._outcomes = self._outcomes, {}
+        if not outcomes:
+            return
+        try:
+            await self.storage.save_pages(outcomes)
+        except Exception as e:
+            logger.error(f"Failed to save {len(outcomes)} enrichment outcomes: {str(e)}")
+        finally:
+            self._pending.difference_update(outcomes)
+
+    async def _fetch(self, url: str) -> str:
+        domain = url_domain(url)
+        slot = self._domains.setdefault(domain, [asyncio.Semaphore(self.per_domain), 0])
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                async with self._session.get(url) as response:
+                    response.raise_for_status()
+                    content_type = response.headers.get("Content-Type", "")
+                    if "html" not in content_type:
+                        raise ValueError(f"Unsupported content type: {content_type}")
+                    body = await response.content.read(self.max_bytes)
+                    return body.decode(response.charset or "utf-8", errors="replace")
+        finally:
+            slot[1] -= 1
+            if not slot[1]:
+                del self._domains[domain]
+
+    async def enrich(self, url: str):
+        """Fetch, extract and store one URL, recording the outcome"""
+        try:
+            html = await self._fetch(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.warning(f"Could not fetch {url}: {str(e) or type(e).__name__}")
+            self._record(url, FAILED, error=str(e) or type(e).__name__)
+            return
+
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(self._processes, extract_text, html)
+        if not text:
+            self._record(url, EMPTY)
+            return
+        digest = await self.storage.run(self.content_store.put, text)
+        self._record(url, OK, content_hash=digest)
+
+    async def get_text(self, url: str) -> Optional[str]:
+        """Extracted text of a URL, if it has been enriched"""
+        url = canonical_url(url)
+        page = (await self.storage.get_pages([url])).get(url)
+        if not page or not page["content_hash"]:
+            return None
+        return await self.storage.run(self.content_store.get, page["content_hash"])
@@ -0,0 +1,89 @@
+import asyncio
+import time
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+from .brave_search import search_brave
+from .models import KeywordSearch, KeywordSearchStatus, SearchResult
+from config import SEARCH_CONCURRENCY
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SearchFunction = Callable[[str], Awaitable[List[SearchResult]]]
+
+
+async def run_keyword_searches(
+    storage,
+    keywords: List[str],
+    search: SearchFunction = search_brave,
+    concurrency: int = SEARCH_CONCURRENCY,
+    cache=None,
+    enrichment=None,
+    on_progress: Optional[Callable[[KeywordSearchStatus], None]] = None
+) -> List[KeywordSearchStatus]:
+    """
+    Search and store several keywords concurrently through an AsyncStorage.
+
+    At most ``concurrency`` searches are in flight at once; request pacing is
+    left to the rate limiter used by search_brave. Fresh results are also put
+    into ``cache`` and, unless they repeat the keyword's previous run,
+    their URLs are queued on ``enrichment``. ``on_progress`` is called with
+    each keyword's status as it finishes.
+    Returns one status per keyword, in the order given, with the search
+    latency in milliseconds.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run_one(keyword: str) -> KeywordSearchStatus:
+        status = await search_one(keyword)
+        if on_progress is not None:
+            on_progress(status)
+        return status
+
+    async def search_one(keyword: str) -> KeywordSearchStatus:
+        async with semaphore:
+            logger.info(f"Searching for keyword: {keyword}")
+            start = time.perf_counter()
+            try:
+                results = await search(keyword)
+                latency_ms = (time.perf_counter() - start) * 1000
+                changed = await storage.save_search_results(KeywordSearch(
+                    keyword=keyword,
+                    results=results,
+                    timestamp=datetime.now()
+                ))
+                if cache is not None:
+                    cache.put(keyword, results)
+                if enrichment is not None and changed is not False:
+                    # An unchanged result set has no URLs enrichment has not seen
+                    enrichment.enqueue(r.url for r in results)
+                outcome = {True: "changed", False: "unchanged", None: "first"}[changed]
+                logger.info(f"Successfully saved {outcome} results for keyword: {keyword}")
+                return KeywordSearchStatus(
+                    keyword=keyword,
+                    status="ok",
+                    count=len(results),
+                    latency_ms=round(latency_ms, 1),
+                    changed=changed
+                )
+            except Exception as e:
+                latency_ms = (time.perf_counter() - start) * 1000
+                logger.error(f"Error searching for keyword {keyword}: {str(e)}")
+                return KeywordSearchStatus(
+                    keyword=keyword,
+                    status="error",
+                    latency_ms=round(latency_ms, 1),
+                    error=str(e)
+                )
+
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(run_one(k) for k in keywords))
+    failed = sum(1 for s in statuses if s.status != "ok")
+    unchanged = sum(1 for s in statuses if s.changed is False)
+    logger.info(
+        f"Searched {len(keywords)} keywords in {time.perf_counter() - start:.2f}s "
+        f"({failed} failed, {unchanged} unchanged, concurrency {concurrency})"
+    )
+    return list(statuses)
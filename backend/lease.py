@@ -0,0 +1,101 @@
+"""
+Process-wide leadership over search jobs.
+
+When uvicorn runs several workers, each imports the API and creates its
+own scheduler. Only the process holding an exclusive lock on
+SCHEDULER_LOCK_FILE in the data directory runs searches; the others
+serve reads and hand manual triggers over through storage. The operating
+system drops the lock when its holder exits or crashes, and a follower
+takes over on its next attempt.
+
+file_lock() uses the same mechanism, blocking, to serialize updates of
+shared files such as the jobs file of the file backends.
+"""
+import logging
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from config import STORAGE_DIR, SCHEDULER_LOCK_FILE
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _lock(f, blocking: bool):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive lock on path across processes for the duration of
+    the block, e.g. around a read-modify-write of a shared JSON file.
+    Not reentrant: a nested file_lock on the same path blocks.
+    """
+    with open(path, "a+") as f:
+        _lock(f, blocking=True)
+        try:
+            yield
+        finally:
+            _unlock(f)
+
+
+class LeaderLease:
+    """Non-blocking exclusive file lock, held until release() or process exit"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(STORAGE_DIR, SCHEDULER_LOCK_FILE)
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self) -> bool:
+        """Take the lock if no other process holds it; True while this process holds it"""
+        if self._file is not None:
+            return True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        f = open(self.path, "a+")
+        try:
+            _lock(f, blocking=False)
+        except OSError:
+            f.close()
+            return False
+        # The pid is informational only: the lock, not the file contents, decides
+        f.seek(0)
+        f.truncate()
+        f.write(f"{os.getpid()}\n")
+        f.flush()
+        self._file = f
+        logger.info(f"Process {os.getpid()} acquired the scheduler lease")
+        return True
+
+    def release(self):
+        if self._file is None:
+            return
+        try:
+            _unlock(self._file)
+        finally:
+            self._file.close()
+            self._file = None
+        logger.info(f"Process {os.getpid()} released the scheduler lease")
@@ -0,0 +1,75 @@
+"""
+Import the JSON file storage into the SQLite backend.
+
+Usage:
+    python -m backend.migrate [--data-dir data] [--db data/intentionly.db]
+
+Reads the keywords file, the legacy results file and any daily result
+segments. Runs that are already in the database are skipped, so the
+command is safe to re-run.
+"""
+import argparse
+import os
+import logging
+from typing import Dict, Iterator, List
+from . import codec
+from config import STORAGE_DIR, RESULTS_FILE, KEYWORDS_FILE, SEGMENTS_DIR, SQLITE_DB_FILE
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _load_json_list(path: str) -> List[Dict]:
+    try:
+        with open(path, 'rb') as f:
+            data = codec.loads(f.read())
+        return data if isinstance(data, list) else []
+    except FileNotFoundError:
+        return []
+    except codec.JSONDecodeError as e:
+        logger.error(f"Could not parse {path}: {str(e)}")
+        return []
+
+
+def _iter_segments(segments_dir: str) -> Iterator[Dict]:
+    if not os.path.isdir(segments_dir):
+        return
+    for name in sorted(os.listdir(segments_dir)):
+        if not name.endswith(".jsonl"):
+            continue
+        with open(os.path.join(segments_dir, name), 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield codec.loads(line)
+                except codec.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt record in segment {name}")
+
+
+def migrate_data_dir(storage, data_dir: str = STORAGE_DIR) -> Dict[str, int]:
+    """Copy keywords and search results from the JSON files in data_dir into storage"""
+    counts = {
+        "keywords": storage.import_keywords(_load_json_list(os.path.join(data_dir, KEYWORDS_FILE))),
+        "searches": storage.import_searches(_load_json_list(os.path.join(data_dir, RESULTS_FILE))),
+        "segment_searches": storage.import_searches(_iter_segments(os.path.join(data_dir, SEGMENTS_DIR))),
+    }
+    logger.info(f"Migrated {data_dir} into {storage.db_path}: {counts}")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import JSON storage files into the SQLite backend")
+    parser.add_argument("--data-dir", default=STORAGE_DIR, help="directory holding the JSON files")
+    parser.add_argument("--db", default=None, help=f"database path (default: <data-dir>/{SQLITE_DB_FILE})")
+    args = parser.parse_args()
+
+    from .sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage(args.db or os.path.join(args.data_dir, SQLITE_DB_FILE), migrate_from=None)
+    migrate_data_dir(storage, args.data_dir)
+
+
+if __name__ == "__main__":
+    main()
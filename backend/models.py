@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+from config import DEFAULT_KEYWORD_GROUP
 
 class SearchResult(BaseModel):
     title: str
@@ -17,8 +18,51 @@ class Keyword(BaseModel):
     value: str
     created_at: datetime
     is_active: bool = True
+    group: str = DEFAULT_KEYWORD_GROUP
+
+class KeywordImport(BaseModel):
+    value: str
+    group: Optional[str] = None
+    is_active: bool = True
 
 class SearchResponse(BaseModel):
     success: bool
     message: str
     results: Optional[List[SearchResult]] = None
+    cache: Optional[str] = None
+
+class KeywordSearchStatus(BaseModel):
+    keyword: str
+    status: str
+    count: int = 0
+    latency_ms: float
+    changed: Optional[bool] = None
+    error: Optional[str] = None
+
+
+class ArchiveHit(BaseModel):
+    url: str
+    title: str
+    snippet: str
+    score: float
+    keywords: List[str]
+    first_seen: datetime
+    last_seen: datetime
+    seen_count: int
+
+class ArchiveSearchResponse(BaseModel):
+    query: str
+    hits: List[ArchiveHit]
+    next_cursor: Optional[str] = None
+
+class SearchJob(BaseModel):
+    id: str
+    trigger: str
+    status: str = "queued"
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    total: int = 0
+    completed: int = 0
+    results: List[KeywordSearchStatus] = []
+    error: Optional[str] = None
@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from . import codec
+from .models import KeywordSearch, SearchResult
+from .records import SearchRecord
+from .text import canonical_url
+
+SEARCH_FIELDS = set(KeywordSearch.model_fields)
+RESULT_FIELDS = set(SearchResult.model_fields)
+
+Projection = Tuple[Set[str], Set[str]]
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Projection]:
+    """
+    Parse a field list such as ``keyword,timestamp,results.title,results.url``
+    into the search fields and result fields to keep. ``results`` alone keeps
+    every result field. Returns None when no projection was requested.
+    """
+    if not fields:
+        return None
+    search_fields: Set[str] = set()
+    result_fields: Set[str] = set()
+    for field in (f.strip() for f in fields.split(",")):
+        if not field:
+            continue
+        if field.startswith("results."):
+            name = field[len("results."):]
+            if name not in RESULT_FIELDS:
+                raise ValueError(f"Unknown result field: {name}")
+            search_fields.add("results")
+            result_fields.add(name)
+        elif field in SEARCH_FIELDS:
+            search_fields.add(field)
+            if field == "results":
+                result_fields.update(RESULT_FIELDS)
+        else:
+            raise ValueError(f"Unknown field: {field}")
+    return search_fields, result_fields
+
+
+def _field_names(projection: Optional[Projection]) -> Tuple[Set[str], List[str], List[str]]:
+    search_fields, result_fields = projection or (SEARCH_FIELDS, RESULT_FIELDS)
+    # Keep the model's field order in the output
+    search_names = [name for name in KeywordSearch.model_fields if name in search_fields and name != "results"]
+    result_names = [name for name in SearchResult.model_fields if name in result_fields]
+    return search_fields, search_names, result_names
+
+
+def iter_shaped(searches: Iterable[SearchRecord], projection: Optional[Projection] = None,
+                seen_urls: Optional[Set[str]] = None) -> Iterator[Dict]:
+    """
+    Apply field projection one search at a time. When seen_urls is given,
+    results whose canonical URL is already in it are dropped and new ones
+    are added, so deduplication can carry over between batches.
+    """
+    search_fields, search_names, result_names = _field_names(projection)
+    for search in searches:
+        item = {name: getattr(search, name) for name in search_names}
+        if "results" in search_fields:
+            results = []
+            for result in search.results:
+                if seen_urls is not None:
+                    url = canonical_url(result.url)
+                    if url in seen_urls:
+                        continue
+                    seen_urls.add(url)
+                results.append({name: getattr(result, name) for name in result_names})
+            item["results"] = results
+        yield item
+
+
+def shape_searches(searches: List[SearchRecord], projection: Optional[Projection] = None,
+                   dedup: bool = False) -> List[Dict]:
+    """Apply field projection and drop results whose URL was already returned"""
+    return list(iter_shaped(searches, projection, set() if dedup else None))
+
+
+def encode_searches(searches: List[SearchRecord], projection: Optional[Projection] = None,
+                    dedup: bool = False) -> bytes:
+    """Serialize searches to JSON bytes, shaping them first only when asked to"""
+    if projection is None and not dedup:
+        return codec.dumps([search.to_dict() for search in searches])
+    return codec.dumps(shape_searches(searches, projection, dedup))
+
+
+def encode_ndjson(searches: List[SearchRecord], projection: Optional[Projection] = None,
+                  seen_urls: Optional[Set[str]] = None, per_result: bool = False) -> bytes:
+    """
+    Serialize searches as newline-delimited JSON, one search per line or,
+    with per_result, one result per line carrying its search's fields.
+    """
+    lines = []
+    for item in iter_shaped(searches, projection, seen_urls):
+        if per_result:
+            results = item.pop("results", [])
+            lines.extend(codec.dumps({**item, **result}) for result in results)
+        else:
+            lines.append(codec.dumps(item))
+    return b"".join(line + b"\n" for line in lines)
@@ -0,0 +1,46 @@
+import asyncio
+import time
+import logging
+from typing import Optional
+from config import BRAVE_QPS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Async token bucket limiting how many requests start per second.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``;
+    each acquire() takes one token and sleeps until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        # The lock keeps waiters in FIFO order so no caller is starved
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                wait_time = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait_time)
+                self._refill()
+            self.tokens -= 1
+
+
+# Shared by every caller of the Brave API so scheduled and manual runs share one quota
+brave_rate_limiter = TokenBucket(BRAVE_QPS)
@@ -0,0 +1,78 @@
+"""
+Lightweight read-only records for the storage-to-response path.
+
+Stored searches are already valid, so bulk reads build these plain
+``__slots__`` objects instead of validated pydantic models. Timestamps
+stay as ISO text in the form pydantic would emit, so serialization is a
+single dump of dicts and strings with no datetime parsing on the way.
+Call to_model() where a KeywordSearch is needed.
+"""
+from datetime import datetime
+from typing import Dict, List
+from .models import KeywordSearch, SearchResult
+
+
+def iso_text(value) -> str:
+    """
+    Normalize a stored timestamp to the ISO text pydantic emits for a naive
+    datetime: a ``T`` separator and no fraction when microseconds are zero.
+    """
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif len(value) in (19, 26) and value[10] in " T":
+        # The fixed-width forms written by str(), isoformat() and the SQLite backend
+        value = f"{value[:10]}T{value[11:]}"
+    else:
+        value = datetime.fromisoformat(value).isoformat()
+    return value[:19] if value.endswith(".000000") else value
+
+
+class ResultRecord:
+    __slots__ = ("title", "url", "description", "date")
+
+    def __init__(self, title: str, url: str, description: str, date: str):
+        self.title = title
+        self.url = url
+        self.description = description
+        self.date = date
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ResultRecord":
+        return cls(data["title"], data["url"], data["description"], iso_text(data["date"]))
+
+    def to_dict(self) -> Dict:
+        return {"title": self.title, "url": self.url, "description": self.description, "date": self.date}
+
+    def to_model(self) -> SearchResult:
+        return SearchResult(title=self.title, url=self.url, description=self.description, date=self.date)
+
+
+class SearchRecord:
+    __slots__ = ("keyword", "results", "timestamp")
+
+    def __init__(self, keyword: str, results: List[ResultRecord], timestamp: str):
+        self.keyword = keyword
+        self.results = results
+        self.timestamp = timestamp
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "SearchRecord":
+        return cls(
+            data["keyword"],
+            [ResultRecord.from_dict(r) for r in data.get("results", [])],
+            iso_text(data["timestamp"])
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "keyword": self.keyword,
+            "results": [r.to_dict() for r in self.results],
+            "timestamp": self.timestamp
+        }
+
+    def to_model(self) -> KeywordSearch:
+        return KeywordSearch(
+            keyword=self.keyword,
+            results=[r.to_model() for r in self.results],
+            timestamp=self.timestamp
+        )
@@ -0,0 +1,100 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from . import codec
+from config import RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSON response rendered with the configured codec instead of json.dumps"""
+
+    def render(self, content: Any) -> bytes:
+        return codec.dumps(content)
+
+
+class CachedBody:
+    __slots__ = ("version", "body", "etag", "headers", "created_at")
+
+    def __init__(self, version: int, body: bytes, headers: Optional[Dict[str, str]], created_at: float):
+        self.version = version
+        self.body = body
+        self.etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        self.headers = headers or {}
+        self.created_at = created_at
+
+
+class ResponseCache:
+    """
+    Encoded JSON response bodies keyed by request path and query.
+
+    A body is served as is, with an ETag, until ``storage.version`` moves
+    on or ``ttl`` seconds pass (windows such as days=7 slide with the
+    clock). A matching If-None-Match gets an empty 304. Concurrent misses
+    for the same key share a single build.
+    """
+
+    def __init__(self, storage, max_entries: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.storage = storage
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CachedBody]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def make_key(request: Request) -> str:
+        return f"{request.url.path}?{'&'.join(sorted(f'{k}={v}' for k, v in request.query_params.multi_items()))}"
+
+    def _fresh(self, entry: Optional[CachedBody]) -> bool:
+        return (entry is not None and entry.version == self.storage.version
+                and time.time() - entry.created_at < self.ttl)
+
+    def _build(self, key: str, build: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """Start encoding the response for key, or join the build already running"""
+        task = self._inflight.get(key)
+        if task is None:
+            async def run():
+                version = self.storage.version
+                content = await build()
+                headers = None
+                if isinstance(content, tuple):
+                    content, headers = content
+                body = content if isinstance(content, bytes) else await self.storage.run(codec.dumps, content)
+                # Stored under the version read before the build, so a write during it leaves the entry stale
+                entry = await self.storage.run(CachedBody, version, body, headers, time.time())
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                return entry
+
+            task = asyncio.ensure_future(run())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._inflight.pop(key, None))
+        return task
+
+    async def respond(self, request: Request, build: Callable[[], Awaitable[Any]]) -> Response:
+        """
+        Serve the cached body for this request or build it. build returns
+        JSON-compatible content or encoded bytes, optionally paired with
+        extra headers as (content, headers).
+        """
+        key = self.make_key(request)
+        entry = self._entries.get(key)
+        if self._fresh(entry):
+            self._entries.move_to_end(key)
+        else:
+            entry = await asyncio.shield(self._build(key, build))
+
+        headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+        if entry.etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,55 @@
+from datetime import date
+from typing import Dict, List, Set, Tuple
+from .models import KeywordSearch
+from .text import canonical_url, term_counts, url_domain
+from config import TREND_TOP_TERMS
+
+
+def search_terms(search: KeywordSearch):
+    """Term counts over the titles and descriptions of one search"""
+    return term_counts(f"{r.title} {r.description}" for r in search.results)
+
+
+def build_trends(searches: List[KeywordSearch], since: date,
+                 top_terms: int = TREND_TOP_TERMS) -> List[Dict]:
+    """
+    Compute per keyword, per day trend rows from raw searches.
+
+    Used by the file backends, which have no materialized rollups. The
+    searches should start before ``since`` so URLs seen earlier are not
+    counted as new; only days from ``since`` on are returned.
+    """
+    seen: Dict[str, Set[str]] = {}
+    rows: Dict[Tuple[str, str], Dict] = {}
+    domains: Dict[Tuple[str, str], Set[str]] = {}
+    terms: Dict[Tuple[str, str], object] = {}
+    for search in searches:
+        keyword_seen = seen.setdefault(search.keyword.lower(), set())
+        urls = [canonical_url(r.url) for r in search.results]
+        new_urls = len(set(urls) - keyword_seen)
+        keyword_seen.update(urls)
+
+        day = search.timestamp.date()
+        if day < since:
+            continue
+        key = (search.keyword, day.isoformat())
+        row = rows.setdefault(key, {
+            "keyword": search.keyword, "date": day.isoformat(), "searches": 0, "results": 0,
+            "new_urls": 0, "seen_urls": 0, "domains": 0, "top_terms": []
+        })
+        row["searches"] += 1
+        row["results"] += len(urls)
+        row["new_urls"] += new_urls
+        row["seen_urls"] += len(urls) - new_urls
+        domains.setdefault(key, set()).update(url_domain(url) for url in urls)
+        if key in terms:
+            terms[key].update(search_terms(search))
+        else:
+            terms[key] = search_terms(search)
+
+    for key, row in rows.items():
+        row["domains"] = len(domains[key])
+        row["top_terms"] = [
+            [term, count] for term, count in sorted(terms[key].items(), key=lambda t: (-t[1], t[0]))[:top_terms]
+        ]
+    return sorted(rows.values(), key=lambda r: (r["date"], r["keyword"]))
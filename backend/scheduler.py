@@ -1,51 +1,311 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
-from datetime import datetime
+from apscheduler.triggers.interval import IntervalTrigger
 import logging
-from .brave_search import search_brave
-from .storage import Storage
-from .models import KeywordSearch
+import os
+import random
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from .fanout import run_keyword_searches
+from .async_storage import AsyncStorage
+from .lease import LeaderLease
+from .models import SearchJob, KeywordSearchStatus
+from config import (
+    JOB_HISTORY_SIZE, SCHEDULE_DEFAULT_INTERVAL, SCHEDULE_MIN_INTERVAL, SCHEDULE_MAX_INTERVAL,
+    SCHEDULE_SPEEDUP, SCHEDULE_BACKOFF, SCHEDULE_JITTER, SCHEDULE_RETRY_DELAY,
+    SCHEDULE_CATCHUP_WINDOW, SCHEDULE_TICK_SECONDS, SCHEDULER_POLL_SECONDS, BRAVE_DAILY_BUDGET,
+    RESULTS_PER_SEARCH, BRAVE_PAGE_SIZE
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Brave requests one keyword search takes at most
+SEARCH_COST = -(-RESULTS_PER_SEARCH // BRAVE_PAGE_SIZE)
+
+
+def next_interval(interval: float, changed: Optional[bool]) -> float:
+    """
+    Shorten a keyword's interval after a run that changed its results and
+    lengthen it after one that did not; a first run (None) leaves it as is
+    """
+    if changed is True:
+        interval *= SCHEDULE_SPEEDUP
+    elif changed is False:
+        interval *= SCHEDULE_BACKOFF
+    return min(SCHEDULE_MAX_INTERVAL, max(SCHEDULE_MIN_INTERVAL, interval))
+
+
+def jittered(seconds: float, rng: random.Random = random) -> timedelta:
+    return timedelta(seconds=seconds * rng.uniform(1 - SCHEDULE_JITTER, 1 + SCHEDULE_JITTER))
+
+
+def budget_stretch(intervals: List[float], budget: float = BRAVE_DAILY_BUDGET) -> float:
+    """Factor by which intervals must grow for these keywords to fit the daily request budget"""
+    demand = sum(86400 / interval for interval in intervals) * SEARCH_COST
+    return max(1.0, demand / budget) if budget > 0 else 1.0
+
+
+def plan_next_run(entry: Optional[Dict], status: KeywordSearchStatus, now: datetime,
+                  rng: random.Random = random, stretch: float = 1.0) -> Dict:
+    """
+    Schedule state of a keyword after the run that produced status. The
+    adaptive interval is kept as is; stretch only delays the next run.
+    """
+    interval = entry["interval"] if entry else SCHEDULE_DEFAULT_INTERVAL
+    if status.status != "ok":
+        # Retry soon without reading anything into the failure
+        return {"interval": interval, "next_run": now + jittered(SCHEDULE_RETRY_DELAY, rng),
+                "last_run": entry["last_run"] if entry else None}
+    interval = next_interval(interval, status.changed)
+    return {"interval": interval, "next_run": now + jittered(interval * stretch, rng), "last_run": now}
+
+
 class SearchScheduler:
+    """
+    Runs keyword searches as tracked jobs on the APScheduler executor.
+
+    Every keyword has its own interval, adapted after each run from whether
+    its results changed, and a jittered next run persisted in storage. A
+    tick every SCHEDULE_TICK_SECONDS searches the keywords that are due.
+    New keywords and runs that fell due while the server was down are
+    spread over SCHEDULE_CATCHUP_WINDOW rather than all run at once.
+
+    Scheduled searches stay within BRAVE_DAILY_BUDGET: when the keywords'
+    intervals add up to more requests a day than that, next runs are
+    stretched proportionally, new keywords are spread over as long as the
+    budget needs, and each tick takes no more due keywords than the
+    budget has accrued since the last one (up to a catch-up window's worth).
 
-    def __init__(self, storage: Storage):
+    Scheduled runs and manual sweeps share one job slot: a trigger that
+    arrives while a job is queued or running gets that job back instead of
+    starting another one. Jobs live in storage, so with several API
+    workers every worker can queue and poll them while only the holder of
+    the LeaderLease runs them.
+    """
+
+    def __init__(self, storage: AsyncStorage, cache=None, enrichment=None, lease: Optional[LeaderLease] = None):
         self.storage = storage
+        self.cache = cache
+        self.enrichment = enrichment
+        self.lease = lease or LeaderLease()
         self.scheduler = AsyncIOScheduler()
+        self.jobs: "OrderedDict[str, SearchJob]" = OrderedDict()
+        self.current_job: Optional[SearchJob] = None
+        self._caught_up = False
+        self._stretch = 1.0
+        self._allowance = self._burst = max(SEARCH_COST, BRAVE_DAILY_BUDGET * SCHEDULE_CATCHUP_WINDOW / 86400)
+        self._refilled_at = time.monotonic()
         self.setup_jobs()
         logger.info("SearchScheduler initialized")
 
     def setup_jobs(self):
-        # Schedule daily search at 10:45 UTC (4:15pm IST)
         self.scheduler.add_job(
-            self.run_daily_searches,
-            CronTrigger(hour=10, minute=45),
-            id='daily_searches'
+            self.run_due_searches,
+            IntervalTrigger(seconds=SCHEDULE_TICK_SECONDS),
+            id='due_searches'
+        )
+        self.scheduler.add_job(
+            self.poll,
+            IntervalTrigger(seconds=SCHEDULER_POLL_SECONDS),
+            id='poll'
+        )
+        logger.info(f"Due keyword searches checked every {SCHEDULE_TICK_SECONDS}s")
+
+    def _start_job(self, job: SearchJob, keywords: Optional[List[str]] = None):
+        """Make job the current job of this process and run it on the executor"""
+        self.jobs[job.id] = job
+        while len(self.jobs) > JOB_HISTORY_SIZE:
+            self.jobs.popitem(last=False)
+        self.current_job = job
+        self.scheduler.add_job(self._run_job, args=[job, keywords], id=f"search_{job.id}")
+
+    async def get_job(self, job_id: str) -> Optional[SearchJob]:
+        job = self.jobs.get(job_id)
+        if job is None:
+            data = await self.storage.get_job(job_id)
+            job = SearchJob(**data) if data else None
+        return job
+
+    async def trigger_search(self) -> SearchJob:
+        """
+        Queue a sweep over all active keywords, or return the manual sweep
+        already queued or in flight. A scheduled job running for the due
+        keywords does not count: the sweep is queued to run after it.
+        """
+        if self.current_job is not None and self.current_job.trigger == "manual":
+            logger.info(f"Search job {self.current_job.id} already in flight, coalescing trigger")
+            return self.current_job
+        job = SearchJob(id=uuid.uuid4().hex[:12], trigger="manual", created_at=datetime.now())
+        start_now = self.lease.held and self.current_job is None
+        if start_now:
+            # Claim the slot before yielding so poll() cannot pick the queued job up as well
+            self.current_job = job
+        try:
+            queued = SearchJob(**await self.storage.queue_job(job.dict()))
+        finally:
+            if self.current_job is job:
+                self.current_job = None
+        if queued.id != job.id:
+            logger.info(f"Search job {queued.id} already queued or running, coalescing trigger")
+            return queued
+        if start_now:
+            self._start_job(job)
+            logger.info(f"Queued search job {job.id}")
+        elif self.lease.held:
+            logger.info(f"Queued search job {job.id} to run after job {self.current_job.id}")
+        else:
+            logger.info(f"Queued search job {job.id} for the scheduler leader")
+        return job
+
+    async def poll(self):
+        """
+        Follow changes made by other workers and, while holding the lease,
+        run queued jobs and save the progress of the running one
+        """
+        await self.storage.sync_version()
+        if not self.lease.held:
+            if not self.lease.acquire():
+                return
+            await self._recover_jobs()
+        if self.current_job is not None:
+            await self.storage.save_job(self.current_job.dict())
+            return
+        queued = [job for job in await self.storage.get_active_jobs() if job["status"] == "queued"]
+        if queued and self.current_job is None:
+            job = SearchJob(**queued[0])
+            self._start_job(job)
+            logger.info(f"Picked up search job {job.id} queued by another worker")
+
+    async def _recover_jobs(self):
+        """Fail the jobs a previous leader left running; queued manual sweeps still run"""
+        for data in await self.storage.get_active_jobs():
+            if data["status"] == "running" or data["trigger"] != "manual":
+                job = SearchJob(**data)
+                job.status = "failed"
+                job.error = "Interrupted: the process running it stopped"
+                job.finished_at = datetime.now()
+                await self.storage.save_job(job.dict())
+                logger.warning(f"Search job {job.id} was interrupted by a restart")
+        logger.info(f"Process {os.getpid()} is now running searches")
+
+    async def run_due_searches(self):
+        """Queue a job for the active keywords whose next run has come"""
+        if not self.lease.held:
+            return
+        if self.current_job is not None:
+            logger.debug(f"Job {self.current_job.id} is still running, checking due keywords later")
+            return
+        if any(job["status"] == "queued" for job in await self.storage.get_active_jobs()):
+            # A queued sweep runs first, on the next poll, and covers the due keywords too
+            return
+        now = datetime.now()
+        keywords = await self.storage.get_keywords()
+        active = [keyword.value for keyword in keywords if keyword.is_active]
+        schedule = await self.storage.get_schedule()
+
+        new = [k for k in active if k not in schedule]
+        missed = [k for k in active if k in schedule and schedule[k]["next_run"] <= now] if not self._caught_up else []
+        if new or missed:
+            # New keywords, and runs missed while the server was down, are spread
+            # out instead of all landing on this tick; a large set over as long
+            # as the budget needs
+            window = SCHEDULE_CATCHUP_WINDOW
+            if BRAVE_DAILY_BUDGET > 0:
+                window = max(window, (len(new) + len(missed)) * SEARCH_COST * 86400 / BRAVE_DAILY_BUDGET)
+            spread = {
+                keyword: {
+                    "interval": schedule[keyword]["interval"] if keyword in schedule else SCHEDULE_DEFAULT_INTERVAL,
+                    "next_run": now + timedelta(seconds=random.uniform(0, window)),
+                    "last_run": schedule[keyword]["last_run"] if keyword in schedule else None
+                }
+                for keyword in new + missed
+            }
+            await self.storage.save_schedule(spread)
+            schedule.update(spread)
+            logger.info(f"Spread {len(spread)} keyword runs over the next {window:.0f}s")
+        self._caught_up = True
+        self._stretch = budget_stretch([schedule[keyword]["interval"] for keyword in active])
+
+        elapsed = time.monotonic() - self._refilled_at
+        self._refilled_at += elapsed
+        if BRAVE_DAILY_BUDGET > 0:
+            self._allowance = min(self._burst, self._allowance + BRAVE_DAILY_BUDGET * elapsed / 86400)
+
+        due = sorted((k for k in active if schedule[k]["next_run"] <= now), key=lambda k: schedule[k]["next_run"])
+        if not due or self.current_job is not None:
+            return
+        if BRAVE_DAILY_BUDGET > 0:
+            allowed = int(self._allowance // SEARCH_COST)
+            if allowed < len(due):
+                logger.info(f"Daily request budget allows {allowed} of {len(due)} due keywords this tick")
+                due = due[:allowed]
+            if not due:
+                return
+            self._allowance -= len(due) * SEARCH_COST
+        job = SearchJob(id=uuid.uuid4().hex[:12], trigger="scheduled", created_at=datetime.now(), total=len(due))
+        self._start_job(job, due)
+        logger.info(f"Queued search job {job.id} for {len(due)} due keywords")
+
+    async def _run_job(self, job: SearchJob, keywords: Optional[List[str]] = None):
+        def on_progress(status: KeywordSearchStatus):
+            job.results.append(status)
+            job.completed += 1
+
+        job.status = "running"
+        job.started_at = datetime.now()
+        try:
+            await self.storage.save_job(job.dict())
+            if keywords is None:
+                keywords = [keyword.value for keyword in await self.storage.get_keywords() if keyword.is_active]
+            job.total = len(keywords)
+            logger.info(f"Found {len(keywords)} keywords to search for job {job.id}")
+
+            statuses = await run_keyword_searches(
+                self.storage, keywords, cache=self.cache, enrichment=self.enrichment, on_progress=on_progress
+            )
+            await self._reschedule(statuses)
+            job.status = "done"
+        except Exception as e:
+            logger.error(f"Search job {job.id} failed: {str(e)}")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.now()
+            try:
+                await self.storage.save_job(job.dict())
+            except Exception as e:
+                logger.error(f"Failed to save search job {job.id}: {str(e)}")
+            if self.current_job is job:
+                self.current_job = None
+
+    async def _reschedule(self, statuses: List[KeywordSearchStatus]):
+        """Adapt each searched keyword's interval and persist its next run"""
+        now = datetime.now()
+        schedule = await self.storage.get_schedule()
+        entries = {
+            status.keyword: plan_next_run(schedule.get(status.keyword), status, now, stretch=self._stretch)
+            for status in statuses
+        }
+        await self.storage.save_schedule(entries)
+        faster = sum(1 for k, e in entries.items() if k in schedule and e["interval"] < schedule[k]["interval"])
+        slower = sum(1 for k, e in entries.items() if k in schedule and e["interval"] > schedule[k]["interval"])
+        logger.info(
+            f"Rescheduled {len(entries)} keywords ({faster} sooner, {slower} later"
+            f"{f', stretched {self._stretch:.2f}x to fit the budget' if self._stretch > 1 else ''})"
+        )
+
+    async def get_schedule(self) -> List[Dict]:
+        """Interval, last and next run of each active keyword, soonest first"""
+        keywords = await self.storage.get_keywords()
+        schedule = await self.storage.get_schedule()
+        return sorted(
+            ({"keyword": k.value, **schedule[k.value]} for k in keywords if k.is_active and k.value in schedule),
+            key=lambda entry: entry["next_run"]
         )
-        logger.info("Daily search job scheduled")
-
-    async def run_daily_searches(self):
-        logger.info("Starting daily search run")
-        keywords = self.storage.get_keywords()
-        logger.info(f"Found {len(keywords)} keywords to search")
-
-        for keyword in keywords:
-            if keyword.is_active:
-                try:
-                    logger.info(f"Searching for keyword: {keyword.value}")
-                    results = await search_brave(keyword.value)
-                    search = KeywordSearch(
-                        keyword=keyword.value,
-                        results=results,
-                        timestamp=datetime.now()
-                    )
-                    self.storage.save_search_results(search)
-                    logger.info(f"Successfully saved results for keyword: {keyword.value}")
-                except Exception as e:
-                    logger.error(f"Error searching for keyword {keyword.value}: {str(e)}")
 
     def start(self):
         self.scheduler.start()
@@ -53,4 +313,5 @@ class SearchScheduler:
 
     def shutdown(self):
         self.scheduler.shutdown()
-        logger.info("Scheduler shutdown")
\ No newline at end of file
+        self.lease.release()
+        logger.info("Scheduler shutdown")
@@ -0,0 +1,127 @@
+import asyncio
+import time
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from .brave_search import search_brave
+from .models import SearchResult
+from config import SEARCH_CACHE_TTL, SEARCH_CACHE_STALE_TTL, SEARCH_CACHE_MAX_ENTRIES
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+HIT = "hit"
+MISS = "miss"
+STALE = "stale"
+
+
+class CacheEntry:
+    __slots__ = ("results", "fetched_at")
+
+    def __init__(self, results: List[SearchResult], fetched_at: float):
+        self.results = results
+        self.fetched_at = fetched_at
+
+
+class SearchCache:
+    """
+    Bounded TTL + LRU cache in front of search_brave.
+
+    Entries younger than ``ttl`` seconds are served as hits. Entries up to
+    ``stale_ttl`` seconds past that are served as stale while one background
+    refresh runs. Concurrent misses for the same key share a single upstream
+    call. When an AsyncStorage is given, entries are persisted through it
+    and warm() reloads them, so a restart starts warm.
+    """
+
+    def __init__(self, storage=None, ttl: float = SEARCH_CACHE_TTL,
+                 stale_ttl: float = SEARCH_CACHE_STALE_TTL,
+                 max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.storage = storage
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def make_key(keyword: str, **params) -> str:
+        """Normalize case and whitespace of the query and append sorted parameters"""
+        key = " ".join(keyword.lower().split())
+        for name in sorted(params):
+            key += f"&{name}={params[name]}"
+        return key
+
+    async def warm(self):
+        """Load persisted entries that have not expired yet"""
+        if self.storage is None:
+            return
+        try:
+            since = time.time() - self.ttl - self.stale_ttl
+            for row in await self.storage.load_cached_searches(since, self.max_entries):
+                results = [SearchResult(**r) for r in row["results"]]
+                self._entries[row["key"]] = CacheEntry(results, row["fetched_at"])
+            logger.info(f"Search cache warmed with {len(self._entries)} entries")
+        except Exception as e:
+            logger.error(f"Failed to warm search cache: {str(e)}")
+
+    def _store(self, key: str, results: List[SearchResult], fetched_at: float):
+        self._entries[key] = CacheEntry(results, fetched_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        if self.storage is not None:
+            task = asyncio.ensure_future(self.storage.save_cached_search(
+                key, [r.dict() for r in results], fetched_at, self.ttl + self.stale_ttl
+            ))
+            task.add_done_callback(lambda t: self._on_persist_done(key, t))
+
+    def _on_persist_done(self, key: str, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Failed to persist search cache entry {key}: {str(task.exception())}")
+
+    def put(self, keyword: str, results: List[SearchResult], **params):
+        """Record fresh results fetched elsewhere, e.g. by a scheduled run"""
+        self._store(self.make_key(keyword, **params), results, time.time())
+
+    def _fetch(self, key: str, keyword: str, fetch: Callable[..., Awaitable[List[SearchResult]]],
+               params: Dict) -> asyncio.Task:
+        """Start an upstream call for key, or join the one already running"""
+        task = self._inflight.get(key)
+        if task is None:
+            async def run():
+                results = await fetch(keyword, **params)
+                self._store(key, results, time.time())
+                return results
+
+            task = asyncio.ensure_future(run())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._on_fetch_done(key, t))
+        return task
+
+    def _on_fetch_done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Search cache fetch failed for {key}: {str(task.exception())}")
+
+    async def get(self, keyword: str,
+                  fetch: Callable[..., Awaitable[List[SearchResult]]] = search_brave,
+                  **params) -> Tuple[List[SearchResult], str]:
+        """Return cached or fetched results together with the cache status"""
+        key = self.make_key(keyword, **params)
+        entry: Optional[CacheEntry] = self._entries.get(key)
+        if entry is not None:
+            age = time.time() - entry.fetched_at
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                return entry.results, HIT
+            if age < self.ttl + self.stale_ttl:
+                self._entries.move_to_end(key)
+                # Serve what we have and refresh in the background
+                self._fetch(key, keyword, fetch, params)
+                return entry.results, STALE
+
+        results = await asyncio.shield(self._fetch(key, keyword, fetch, params))
+        return results, MISS
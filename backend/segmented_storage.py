@@ -0,0 +1,189 @@
+import os
+import logging
+from datetime import datetime, date, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from . import codec
+from .models import KeywordSearch
+from .records import SearchRecord
+from .storage import Storage
+from config import STORAGE_DIR, SEGMENTS_DIR, RETENTION_DAYS
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".jsonl"
+IMPORT_MARKER = ".imported"
+
+
+class SegmentedStorage(Storage):
+    """
+    Storage engine that appends search results to daily log segments.
+
+    Each day gets its own ``YYYY-MM-DD.jsonl`` file holding one KeywordSearch
+    per line. Saving a search appends a single line, retention deletes whole
+    expired segments and reads only open the segments inside the window.
+    Keywords are still kept in the keywords JSON file.
+    """
+
+    def __init__(self):
+        self.segments_dir = os.path.join(STORAGE_DIR, SEGMENTS_DIR)
+        os.makedirs(self.segments_dir, exist_ok=True)
+        super().__init__()
+        self.import_legacy_results()
+
+    def _initialize_results(self):
+        """Segments are created lazily on first append"""
+        pass
+
+    def _segment_path(self, day: date) -> str:
+        return os.path.join(self.segments_dir, f"{day.isoformat()}{SEGMENT_SUFFIX}")
+
+    def _list_segments(self) -> List[date]:
+        """Return the days that have a segment on disk, oldest first"""
+        days = []
+        for name in os.listdir(self.segments_dir):
+            if not name.endswith(SEGMENT_SUFFIX):
+                continue
+            try:
+                days.append(date.fromisoformat(name[:-len(SEGMENT_SUFFIX)]))
+            except ValueError:
+                logger.warning(f"Ignoring unexpected file in segments directory: {name}")
+        return sorted(days)
+
+    def change_token(self):
+        """Changes whenever any process saves keywords or appends to a segment"""
+        segments = self._list_segments()
+        latest = os.stat(self._segment_path(segments[-1])) if segments else None
+        keywords = os.stat(self.keywords_path).st_mtime_ns if os.path.exists(self.keywords_path) else 0
+        return keywords, len(segments), latest.st_size if latest else 0, latest.st_mtime_ns if latest else 0
+
+    def _append(self, records: List[Dict], day: date):
+        lines = b"".join(codec.dumps(r, default=str) + b"\n" for r in records)
+        with open(self._segment_path(day), 'ab') as f:
+            f.write(lines)
+
+    def _read_segment(self, day: date) -> Iterator[Dict]:
+        try:
+            with open(self._segment_path(day), 'rb') as f:
+                for line_no, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield codec.loads(line)
+                    except codec.JSONDecodeError:
+                        # A crash mid-append can leave a partial last line behind
+                        logger.warning(f"Skipping corrupt record in segment {day} line {line_no}")
+        except FileNotFoundError:
+            return
+
+    def _read_segment_from(self, day: date, offset: int) -> Tuple[List[Dict], int]:
+        """Records appended to a segment after byte offset, and the offset after the last complete line"""
+        try:
+            with open(self._segment_path(day), 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except FileNotFoundError:
+            return [], offset
+        # A line without its newline is still being appended; it is read next time
+        end = data.rfind(b"\n") + 1
+        records = []
+        for line in data[:end].splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(codec.loads(line))
+            except codec.JSONDecodeError:
+                logger.warning(f"Skipping corrupt record in segment {day} after offset {offset}")
+        return records, offset + end
+
+    def get_searches_after(self, position: Optional[Any] = None) -> Tuple[List[KeywordSearch], Any]:
+        """
+        Return the searches appended after position, oldest first, and the
+        position to pass next time: the size read so far of every segment,
+        so searches appended late to an older day's segment are not skipped
+        """
+        read = dict(position or {})
+        records, next_position = [], {}
+        for day in self._list_segments():
+            day_records, next_position[day.isoformat()] = self._read_segment_from(day, read.get(day.isoformat(), 0))
+            records.extend(day_records)
+        records.sort(key=lambda r: r['timestamp'])
+        return [SearchRecord.from_dict(r).to_model() for r in records], next_position
+
+    def save_search_results(self, keyword_search: KeywordSearch) -> Optional[bool]:
+        changed = None
+        # The keyword's previous run is in the newest segment that has one
+        for day in reversed(self._list_segments()):
+            if day > keyword_search.timestamp.date():
+                continue
+            found = self._results_changed(self._read_segment(day), keyword_search)
+            if found is not None:
+                changed = found
+                break
+        self._append([keyword_search.dict()], keyword_search.timestamp.date())
+        self._cleanup_old_results()
+        return changed
+
+    def _records_since(self, since: datetime) -> Iterator[Dict]:
+        """Read only the segments that can hold searches newer than since"""
+        for day in self._list_segments():
+            if day >= since.date():
+                yield from self._read_segment(day)
+
+    def _load_results(self) -> List[Dict]:
+        return [r for day in self._list_segments() for r in self._read_segment(day)]
+
+    def _cleanup_old_results(self):
+        """Drop whole segments that fall entirely outside the retention window"""
+        cutoff_day = (datetime.now() - timedelta(days=RETENTION_DAYS)).date()
+        for day in self._list_segments():
+            if day >= cutoff_day:
+                break
+            try:
+                os.remove(self._segment_path(day))
+                logger.info(f"Removed expired result segment {day}")
+            except FileNotFoundError:
+                pass
+
+    def import_json_results(self, path: str) -> int:
+        """Append the searches stored in a legacy results JSON file to the segments"""
+        with open(path, 'rb') as f:
+            data = codec.loads(f.read())
+        if not isinstance(data, list):
+            return 0
+
+        by_day: Dict[date, List[Dict]] = {}
+        for r in data:
+            try:
+                day = datetime.fromisoformat(str(r['timestamp'])).date()
+            except (KeyError, TypeError, ValueError):
+                logger.warning(f"Skipping legacy record without a valid timestamp: {str(r)[:100]}")
+                continue
+            by_day.setdefault(day, []).append(r)
+
+        for day, records in sorted(by_day.items()):
+            self._append(records, day)
+        imported = sum(len(records) for records in by_day.values())
+        logger.info(f"Imported {imported} searches from {path}")
+        return imported
+
+    def import_legacy_results(self, path: Optional[str] = None) -> int:
+        """Import the legacy results file once, leaving the original file untouched"""
+        path = path or self.results_path
+        marker_path = os.path.join(self.segments_dir, IMPORT_MARKER)
+        if os.path.exists(marker_path) or not os.path.exists(path):
+            return 0
+
+        try:
+            imported = self.import_json_results(path)
+        except codec.JSONDecodeError as e:
+            logger.error(f"Could not import legacy results from {path}: {str(e)}")
+            return 0
+
+        with open(marker_path, 'wb') as f:
+            f.write(codec.dumps({"source": path, "records": imported, "imported_at": datetime.now()}, default=str))
+        self._cleanup_old_results()
+        return imported
@@ -0,0 +1,969 @@
+import os
+import sqlite3
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from . import codec
+from .models import KeywordSearch, Keyword
+from .records import ResultRecord, SearchRecord, iso_text
+from .storage import encode_cursor, decode_cursor, keyword_quota
+from .text import canonical_url, results_fingerprint, strip_html, term_counts, url_domain
+from .archive import MARK_END, MARK_START, fts_query, render_marks
+from config import (
+    STORAGE_DIR, SQLITE_DB_FILE, RETENTION_DAYS, ROLLUP_RETENTION_DAYS, TREND_TOP_TERMS,
+    JOB_HISTORY_SIZE, DEFAULT_KEYWORD_GROUP, STREAM_BATCH_SIZE
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS keywords (
+    id INTEGER PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    tracked INTEGER NOT NULL DEFAULT 1,
+    group_name TEXT NOT NULL DEFAULT 'default'
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_keywords_value ON keywords(value COLLATE NOCASE);
+
+-- A run whose results match the keyword's previous run stores no results of its
+-- own; same_as points at the run holding them and reads expand it from there
+CREATE TABLE IF NOT EXISTS search_runs (
+    id INTEGER PRIMARY KEY,
+    keyword_id INTEGER NOT NULL REFERENCES keywords(id),
+    timestamp TEXT NOT NULL,
+    fingerprint TEXT,
+    same_as INTEGER REFERENCES search_runs(id),
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_search_runs_timestamp ON search_runs(timestamp);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_search_runs_keyword ON search_runs(keyword_id, timestamp);
+
+-- url is the canonical form, used to recognize a page found again; each run
+-- result keeps the URL as returned in run_results.url when it differs
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_urls_last_seen ON urls(last_seen);
+
+CREATE TABLE IF NOT EXISTS keyword_urls (
+    keyword_id INTEGER NOT NULL,
+    url_id INTEGER NOT NULL,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    seen_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (keyword_id, url_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_keyword_urls_last_seen ON keyword_urls(last_seen);
+
+CREATE TABLE IF NOT EXISTS pages (
+    url_id INTEGER PRIMARY KEY REFERENCES urls(id) ON DELETE CASCADE,
+    status TEXT NOT NULL,
+    content_hash TEXT,
+    error TEXT,
+    fetched_at TEXT NOT NULL
+);
+
+-- Full-text index over the stripped title and description of each URL, keyed by urls.id
+CREATE VIRTUAL TABLE IF NOT EXISTS url_fts USING fts5(
+    title, description, tokenize = 'porter unicode61 remove_diacritics 2'
+);
+
+CREATE TABLE IF NOT EXISTS run_results (
+    run_id INTEGER NOT NULL REFERENCES search_runs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    url_id INTEGER NOT NULL REFERENCES urls(id),
+    is_new INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    url TEXT,
+    PRIMARY KEY (run_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_run_results_url ON run_results(url_id);
+
+CREATE TABLE IF NOT EXISTS keyword_daily_rollups (
+    day TEXT NOT NULL,
+    keyword_id INTEGER NOT NULL REFERENCES keywords(id),
+    searches INTEGER NOT NULL DEFAULT 0,
+    results INTEGER NOT NULL DEFAULT 0,
+    new_urls INTEGER NOT NULL DEFAULT 0,
+    seen_urls INTEGER NOT NULL DEFAULT 0,
+    domains INTEGER NOT NULL DEFAULT 0,
+    top_terms TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (day, keyword_id)
+);
+CREATE TABLE IF NOT EXISTS keyword_daily_domains (
+    keyword_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    PRIMARY KEY (keyword_id, day, domain)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS keyword_daily_terms (
+    keyword_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    term TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (keyword_id, day, term)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS keyword_schedule (
+    keyword_id INTEGER PRIMARY KEY REFERENCES keywords(id),
+    interval REAL NOT NULL,
+    next_run TEXT NOT NULL,
+    last_run TEXT
+);
+
+-- Search jobs shared by the API workers: any worker queues and reads them, the
+-- scheduler leader runs them
+CREATE TABLE IF NOT EXISTS search_jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_search_jobs_status ON search_jobs(status, created_at);
+
+CREATE TABLE IF NOT EXISTS search_cache (
+    key TEXT PRIMARY KEY,
+    results TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_search_cache_fetched_at ON search_cache(fetched_at);
+
+-- Counters such as keywords_revision, bumped by every keyword change
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def format_timestamp(value) -> str:
+    """Render a datetime as fixed-width text so string order matches time order"""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    return value.isoformat(sep=" ", timespec="microseconds")
+
+
+def run_summary(results: List[Dict]) -> Dict:
+    """Domains and term counts a run adds to its keyword's daily rollup"""
+    return {
+        "domains": sorted({url_domain(r["url"]) for r in results}),
+        "terms": dict(term_counts(f"{r['title']} {r['description']}" for r in results))
+    }
+
+
+class SQLiteStorage:
+    """
+    Storage engine backed by a single SQLite database.
+
+    Exposes the same interface as Storage. Keywords, search runs and results
+    live in normalized tables, so time-window, per-keyword and retention
+    queries are index range scans instead of full-file parses.
+
+    Each distinct result page is stored once in ``urls`` under its canonical
+    URL. A run only records references to it, flagged ``is_new`` when the
+    keyword had not returned that URL in an earlier run; ``keyword_urls``
+    tracks first seen, last seen and seen count per keyword. A run whose
+    results fingerprint matches the keyword's previous run is stored as a
+    marker pointing at the run that holds those results.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, migrate_from: Optional[str] = STORAGE_DIR):
+        self.db_path = db_path or os.path.join(STORAGE_DIR, SQLITE_DB_FILE)
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._local = threading.local()
+        is_new = not os.path.exists(self.db_path)
+        self._initialize_storage()
+        if is_new and migrate_from:
+            # First start on this database: bring over whatever the file backends left behind
+            from .migrate import migrate_data_dir
+            migrate_data_dir(self, migrate_from)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _initialize_storage(self):
+        """Create tables and indexes if they don't exist"""
+        conn = self._connect()
+        tables = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        with conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(search_runs)")}
+            for column in ("fingerprint TEXT", "same_as INTEGER REFERENCES search_runs(id)", "summary TEXT"):
+                if column.split()[0] not in columns:
+                    conn.execute(f"ALTER TABLE search_runs ADD COLUMN {column}")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_search_runs_same_as ON search_runs(same_as)")
+            if "url" not in {row["name"] for row in conn.execute("PRAGMA table_info(run_results)")}:
+                # Runs stored before this kept only the canonical URL
+                conn.execute("ALTER TABLE run_results ADD COLUMN url TEXT")
+            if "group_name" not in {row["name"] for row in conn.execute("PRAGMA table_info(keywords)")}:
+                conn.execute(
+                    f"ALTER TABLE keywords ADD COLUMN group_name TEXT NOT NULL DEFAULT '{DEFAULT_KEYWORD_GROUP}'"
+                )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_keywords_group ON keywords(group_name, tracked)")
+            if "results" in tables:
+                # Results used to be stored in full for every run
+                self._migrate_legacy_results(conn)
+            if "url_fts" not in tables:
+                self._rebuild_fts(conn)
+            if "keyword_daily_rollups" not in tables:
+                # Databases created before rollups existed need them built once
+                self._rebuild_rollups(conn)
+
+    def _keyword_id(self, conn: sqlite3.Connection, keyword: str, tracked: bool = False,
+                    created_at: Optional[datetime] = None, is_active: bool = True,
+                    group: str = DEFAULT_KEYWORD_GROUP) -> int:
+        row = conn.execute(
+            "SELECT id FROM keywords WHERE value = ? COLLATE NOCASE", (keyword,)
+        ).fetchone()
+        if row:
+            return row["id"]
+        cursor = conn.execute(
+            "INSERT INTO keywords (value, created_at, is_active, tracked, group_name) VALUES (?, ?, ?, ?, ?)",
+            (keyword, format_timestamp(created_at or datetime.now()), int(is_active), int(tracked), group)
+        )
+        return cursor.lastrowid
+
+    def get_keywords(self, group: Optional[str] = None) -> List[Keyword]:
+        query = "SELECT value, created_at, is_active, group_name FROM keywords WHERE tracked = 1"
+        params: Tuple = ()
+        if group is not None:
+            query += " AND group_name = ?"
+            params = (group,)
+        rows = self._connect().execute(query + " ORDER BY id", params).fetchall()
+        return [
+            Keyword(
+                value=row["value"],
+                created_at=datetime.fromisoformat(row["created_at"]),
+                is_active=bool(row["is_active"]),
+                group=row["group_name"]
+            )
+            for row in rows
+        ]
+
+    def add_keyword(self, keyword: str, group: str = DEFAULT_KEYWORD_GROUP) -> bool:
+        """Track a keyword; False when its group is at its quota"""
+        return self.add_keywords([{"value": keyword, "group": group}])["over_quota"] == 0
+
+    def add_keywords(self, keywords: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Track keyword dicts (value, group, is_active) in one transaction.
+        Values are unique regardless of case and across groups; keywords
+        beyond their group's quota are skipped. Returns how many were
+        added, were already tracked or were over quota.
+        """
+        summary = {"added": 0, "existing": 0, "over_quota": 0}
+        conn = self._connect()
+        with conn:
+            counts = dict(conn.execute(
+                "SELECT group_name, COUNT(*) FROM keywords WHERE tracked = 1 GROUP BY group_name"
+            ).fetchall())
+            for k in keywords:
+                group = k.get("group") or DEFAULT_KEYWORD_GROUP
+                row = conn.execute(
+                    "SELECT id, tracked FROM keywords WHERE value = ? COLLATE NOCASE", (k["value"],)
+                ).fetchone()
+                if row and row["tracked"]:
+                    summary["existing"] += 1
+                    continue
+                if counts.get(group, 0) >= keyword_quota(group):
+                    summary["over_quota"] += 1
+                    continue
+
+                if row:
+                    # Keyword was removed earlier but its search history is still referenced
+                    conn.execute(
+                        "UPDATE keywords SET value = ?, created_at = ?, is_active = ?, tracked = 1, group_name = ? "
+                        "WHERE id = ?",
+                        (k["value"], format_timestamp(datetime.now()), int(k.get("is_active", True)), group, row["id"])
+                    )
+                else:
+                    self._keyword_id(conn, k["value"], tracked=True, is_active=k.get("is_active", True), group=group)
+                counts[group] = counts.get(group, 0) + 1
+                summary["added"] += 1
+            if summary["added"]:
+                self._bump_keywords_revision(conn)
+        return summary
+
+    def remove_keyword(self, keyword: str):
+        conn = self._connect()
+        with conn:
+            conn.execute("UPDATE keywords SET tracked = 0 WHERE value = ? COLLATE NOCASE", (keyword,))
+            self._bump_keywords_revision(conn)
+
+    def _bump_keywords_revision(self, conn: sqlite3.Connection):
+        """Advance the revision change_token reports for keywords; call inside the changing transaction"""
+        conn.execute("""
+            INSERT INTO meta (key, value) VALUES ('keywords_revision', 1)
+            ON CONFLICT(key) DO UPDATE SET value = value + 1
+        """)
+
+    def save_search_results(self, keyword_search: KeywordSearch) -> Optional[bool]:
+        """
+        Store a search run and return whether its results changed since the
+        keyword's previous run, or None when there is no previous run to
+        compare with or the run was already stored
+        """
+        conn = self._connect()
+        with conn:
+            _, changed = self._insert_search(conn, keyword_search.dict())
+        self._cleanup_old_results()
+        return changed
+
+    def _insert_search(self, conn: sqlite3.Connection, search: Dict) -> Tuple[bool, Optional[bool]]:
+        """
+        Insert one search run with its results. Returns whether the run was
+        inserted (False when it is already stored) and whether its results
+        changed, None without an earlier run; unchanged runs are stored as a
+        marker without results.
+        """
+        keyword_id = self._keyword_id(conn, search["keyword"])
+        timestamp = format_timestamp(search["timestamp"])
+        results = search.get("results", [])
+        fingerprint = results_fingerprint(results)
+        previous = conn.execute("""
+            SELECT id, fingerprint, same_as FROM search_runs
+            WHERE keyword_id = ? AND timestamp < ? ORDER BY timestamp DESC LIMIT 1
+        """, (keyword_id, timestamp)).fetchone()
+        same_as = None
+        if previous is not None and previous["fingerprint"] == fingerprint:
+            same_as = previous["same_as"] or previous["id"]
+
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO search_runs (keyword_id, timestamp, fingerprint, same_as) VALUES (?, ?, ?, ?)",
+            (keyword_id, timestamp, fingerprint, same_as)
+        )
+        if not cursor.rowcount:
+            return False, None
+        if same_as is not None:
+            self._touch_results(conn, same_as, keyword_id, timestamp)
+            source = conn.execute("SELECT summary FROM search_runs WHERE id = ?", (same_as,)).fetchone()
+            self._update_rollups(conn, keyword_id, timestamp[:10], len(results), 0, codec.loads(source["summary"]))
+            return True, False
+
+        new_urls = self._insert_results(conn, cursor.lastrowid, keyword_id, timestamp, results)
+        summary = run_summary(results)
+        conn.execute(
+            "UPDATE search_runs SET summary = ? WHERE id = ?", (codec.dumps(summary).decode(), cursor.lastrowid)
+        )
+        self._update_rollups(conn, keyword_id, timestamp[:10], len(results), new_urls, summary)
+        return True, (True if previous is not None else None)
+
+    def _touch_results(self, conn: sqlite3.Connection, run_id: int, keyword_id: int, timestamp: str):
+        """Mark the URLs of run_id as seen again at timestamp, for a run that repeated them"""
+        url_ids = "SELECT url_id FROM run_results WHERE run_id = ?"
+        conn.execute(f"""
+            UPDATE urls SET last_seen = max(last_seen, ?), seen_count = seen_count + 1
+            WHERE id IN ({url_ids})
+        """, (timestamp, run_id))
+        conn.execute(f"""
+            UPDATE keyword_urls SET last_seen = max(last_seen, ?), seen_count = seen_count + 1
+            WHERE keyword_id = ? AND url_id IN ({url_ids})
+        """, (timestamp, keyword_id, run_id))
+
+    def _insert_results(self, conn: sqlite3.Connection, run_id: int, keyword_id: int,
+                        timestamp: str, results: List[Dict]) -> int:
+        """
+        Record a run's results as references into the URL index and return
+        how many of them the keyword had not returned before.
+        """
+        rows = []
+        new_ids = set()
+        for position, r in enumerate(results):
+            url_id = self._upsert_url(conn, r, timestamp)
+            seen = conn.execute(
+                "SELECT first_seen FROM keyword_urls WHERE keyword_id = ? AND url_id = ?", (keyword_id, url_id)
+            ).fetchone()
+            # Only the first occurrence of a URL within a run counts as new
+            is_new = url_id not in new_ids and (seen is None or seen["first_seen"] >= timestamp)
+            if is_new:
+                new_ids.add(url_id)
+            conn.execute("""
+                INSERT INTO keyword_urls (keyword_id, url_id, first_seen, last_seen, seen_count)
+                VALUES (?, ?, ?, ?, 1)
+                ON CONFLICT (keyword_id, url_id) DO UPDATE SET
+                    first_seen = min(first_seen, excluded.first_seen),
+                    last_seen = max(last_seen, excluded.last_seen),
+                    seen_count = seen_count + 1
+            """, (keyword_id, url_id, timestamp, timestamp))
+            url = r["url"] if r["url"] != canonical_url(r["url"]) else None
+            rows.append((run_id, position, url_id, int(is_new), format_timestamp(r["date"]), url))
+
+        conn.executemany(
+            "INSERT INTO run_results (run_id, position, url_id, is_new, date, url) VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+        return len(new_ids)
+
+    def _upsert_url(self, conn: sqlite3.Connection, result: Dict, timestamp: str) -> int:
+        """
+        Add a result to the URL index under its canonical URL, reindexing
+        its text only when it changed
+        """
+        url = canonical_url(result["url"])
+        row = conn.execute("SELECT id, title, description FROM urls WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            url_id = conn.execute(
+                "INSERT INTO urls (url, title, description, first_seen, last_seen, seen_count) "
+                "VALUES (?, ?, ?, ?, ?, 1)",
+                (url, result["title"], result["description"], timestamp, timestamp)
+            ).lastrowid
+        else:
+            url_id = row["id"]
+            conn.execute("""
+                UPDATE urls SET
+                    first_seen = min(first_seen, ?),
+                    last_seen = max(last_seen, ?),
+                    seen_count = seen_count + 1
+                WHERE id = ?
+            """, (timestamp, timestamp, url_id))
+            if (row["title"], row["description"]) == (result["title"], result["description"]):
+                return url_id
+            conn.execute(
+                "UPDATE urls SET title = ?, description = ? WHERE id = ?",
+                (result["title"], result["description"], url_id)
+            )
+            conn.execute("DELETE FROM url_fts WHERE rowid = ?", (url_id,))
+        conn.execute(
+            "INSERT INTO url_fts (rowid, title, description) VALUES (?, ?, ?)",
+            (url_id, strip_html(result["title"]), strip_html(result["description"]))
+        )
+        return url_id
+
+    def _rebuild_fts(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM url_fts")
+        conn.executemany(
+            "INSERT INTO url_fts (rowid, title, description) VALUES (?, ?, ?)",
+            (
+                (row["id"], strip_html(row["title"]), strip_html(row["description"]))
+                for row in conn.execute("SELECT id, title, description FROM urls").fetchall()
+            )
+        )
+
+    def _migrate_legacy_results(self, conn: sqlite3.Connection):
+        """Move fully stored results into the URL index and drop the old table"""
+        runs = conn.execute("SELECT id, keyword_id, timestamp FROM search_runs ORDER BY timestamp, id").fetchall()
+        for run in runs:
+            results = conn.execute(
+                "SELECT title, url, description, date FROM results WHERE run_id = ? ORDER BY position",
+                (run["id"],)
+            ).fetchall()
+            self._insert_results(conn, run["id"], run["keyword_id"], run["timestamp"], [dict(r) for r in results])
+        conn.execute("DROP TABLE results")
+        logger.info(f"Moved results of {len(runs)} stored searches into the URL index")
+
+    def _update_rollups(self, conn: sqlite3.Connection, keyword_id: int, day: str,
+                        result_count: int, new_urls: int, summary: Dict):
+        """Fold one search run, given by its run_summary(), into its keyword's daily rollup"""
+        conn.executemany(
+            "INSERT OR IGNORE INTO keyword_daily_domains (keyword_id, day, domain) VALUES (?, ?, ?)",
+            [(keyword_id, day, domain) for domain in summary["domains"]]
+        )
+        conn.executemany(
+            "INSERT INTO keyword_daily_terms (keyword_id, day, term, count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (keyword_id, day, term) DO UPDATE SET count = count + excluded.count",
+            [(keyword_id, day, term, count) for term, count in summary["terms"].items()]
+        )
+        domains = conn.execute(
+            "SELECT COUNT(*) FROM keyword_daily_domains WHERE keyword_id = ? AND day = ?", (keyword_id, day)
+        ).fetchone()[0]
+        top_terms = conn.execute(
+            "SELECT term, count FROM keyword_daily_terms WHERE keyword_id = ? AND day = ? "
+            "ORDER BY count DESC, term LIMIT ?",
+            (keyword_id, day, TREND_TOP_TERMS)
+        ).fetchall()
+        conn.execute("""
+            INSERT INTO keyword_daily_rollups
+                (day, keyword_id, searches, results, new_urls, seen_urls, domains, top_terms)
+            VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+            ON CONFLICT (day, keyword_id) DO UPDATE SET
+                searches = searches + 1,
+                results = results + excluded.results,
+                new_urls = new_urls + excluded.new_urls,
+                seen_urls = seen_urls + excluded.seen_urls,
+                domains = excluded.domains,
+                top_terms = excluded.top_terms
+        """, (
+            day, keyword_id, result_count, new_urls, result_count - new_urls, domains,
+            codec.dumps([[row["term"], row["count"]] for row in top_terms]).decode()
+        ))
+
+    def _rebuild_rollups(self, conn: sqlite3.Connection):
+        for table in ("keyword_daily_rollups", "keyword_daily_domains", "keyword_daily_terms"):
+            conn.execute(f"DELETE FROM {table}")
+        runs = conn.execute(
+            "SELECT id, keyword_id, timestamp, same_as FROM search_runs ORDER BY timestamp, id"
+        ).fetchall()
+        summaries: Dict[int, Dict] = {}
+        for run in runs:
+            source = run["same_as"] or run["id"]
+            results = conn.execute("""
+                SELECT u.title, u.url, u.description, res.is_new FROM run_results res
+                JOIN urls u ON u.id = res.url_id
+                WHERE res.run_id = ? ORDER BY res.position
+            """, (source,)).fetchall()
+            if source not in summaries:
+                summaries[source] = run_summary([dict(r) for r in results])
+            new_urls = 0 if run["same_as"] else sum(r["is_new"] for r in results)
+            self._update_rollups(
+                conn, run["keyword_id"], run["timestamp"][:10], len(results), new_urls, summaries[source]
+            )
+        if runs:
+            logger.info(f"Rebuilt daily rollups from {len(runs)} stored searches")
+
+    def get_trends(self, since: date, keywords: Optional[List[str]] = None) -> List[Dict]:
+        """Per keyword, per day rollups from the day since onwards"""
+        query = """
+            SELECT k.value AS keyword, g.day AS date, g.searches, g.results,
+                   g.new_urls, g.seen_urls, g.domains, g.top_terms
+            FROM keyword_daily_rollups g
+            JOIN keywords k ON k.id = g.keyword_id
+            WHERE g.day >= ?
+        """
+        params: list = [since.isoformat()]
+        if keywords:
+            placeholders = ", ".join("?" for _ in keywords)
+            query += f" AND k.value COLLATE NOCASE IN ({placeholders})"
+            params.extend(keywords)
+        query += " ORDER BY g.day, k.value"
+        rows = []
+        for row in self._connect().execute(query, params):
+            item = dict(row)
+            item["top_terms"] = codec.loads(item["top_terms"])
+            rows.append(item)
+        return rows
+
+    def get_term_frequencies(self, since: date, keywords: Optional[List[str]] = None,
+                             limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Most frequent terms from the day since onwards, summed from the daily term counts"""
+        query = """
+            SELECT t.term, SUM(t.count) AS count FROM keyword_daily_terms t
+            WHERE t.day >= ?
+        """
+        params: list = [since.isoformat()]
+        if keywords:
+            placeholders = ", ".join("?" for _ in keywords)
+            query += f" AND t.keyword_id IN (SELECT id FROM keywords WHERE value COLLATE NOCASE IN ({placeholders}))"
+            params.extend(keywords)
+        query += " GROUP BY t.term ORDER BY count DESC, t.term"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [(row["term"], row["count"]) for row in self._connect().execute(query, params)]
+
+    def search_archive(self, query: str, since: datetime, keywords: Optional[List[str]] = None,
+                       limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Rank URLs last seen after since by BM25 over their title and
+        description, HTML-escaped with matches wrapped in <mark>. Returns one page of
+        hits and the cursor for the next page.
+        """
+        match = fts_query(query)
+        if not match:
+            return [], None
+        offset = int(decode_cursor(cursor)[0]) if cursor else 0
+        sql = """
+            SELECT COALESCE(
+                       (SELECT res.url FROM run_results res WHERE res.url_id = u.id AND res.url IS NOT NULL
+                        ORDER BY res.run_id DESC LIMIT 1), u.url
+                   ) AS url, u.first_seen, u.last_seen, u.seen_count,
+                   highlight(url_fts, 0, ?, ?) AS title,
+                   snippet(url_fts, 1, ?, ?, '…', 32) AS snippet,
+                   bm25(url_fts, 2.0, 1.0) AS rank,
+                   (SELECT group_concat(k.value, '|') FROM keyword_urls ku
+                    JOIN keywords k ON k.id = ku.keyword_id WHERE ku.url_id = u.id) AS keywords
+            FROM url_fts
+            JOIN urls u ON u.id = url_fts.rowid
+            WHERE url_fts MATCH ? AND u.last_seen > ?
+        """
+        params: list = [MARK_START, MARK_END, MARK_START, MARK_END, match, format_timestamp(since)]
+        if keywords:
+            placeholders = ", ".join("?" for _ in keywords)
+            sql += f"""
+                AND u.id IN (SELECT ku.url_id FROM keyword_urls ku JOIN keywords k ON k.id = ku.keyword_id
+                             WHERE k.value COLLATE NOCASE IN ({placeholders}))
+            """
+            params.extend(keywords)
+        # Fetch one extra hit to learn whether another page exists
+        sql += " ORDER BY rank LIMIT ? OFFSET ?"
+        params.extend([limit + 1, offset])
+
+        hits = []
+        for row in self._connect().execute(sql, params):
+            hit = dict(row)
+            hit["score"] = round(-hit.pop("rank"), 6)
+            hit["title"] = render_marks(hit["title"])
+            hit["snippet"] = render_marks(hit["snippet"])
+            hit["keywords"] = hit["keywords"].split("|") if hit["keywords"] else []
+            hit["first_seen"] = datetime.fromisoformat(hit["first_seen"])
+            hit["last_seen"] = datetime.fromisoformat(hit["last_seen"])
+            hits.append(hit)
+        next_cursor = encode_cursor(offset + limit) if len(hits) > limit else None
+        return hits[:limit], next_cursor
+
+    def get_search_results(self, days: int = 7, keyword: Optional[str] = None) -> List[KeywordSearch]:
+        return self.get_searches_since(datetime.now() - timedelta(days=days), keyword)
+
+    def get_searches_since(self, since: datetime, keyword: Optional[str] = None) -> List[KeywordSearch]:
+        """Return searches stored strictly after since, oldest first"""
+        return self.query_searches(since, keywords=[keyword] if keyword else None)[0]
+
+    def _run_filter(self, since: datetime, until: Optional[datetime],
+                    keywords: Optional[List[str]]) -> Tuple[str, list]:
+        """WHERE clause over search_runs r for a time window and keyword set"""
+        clause = "r.timestamp > ?"
+        params: list = [format_timestamp(since)]
+        if until is not None:
+            clause += " AND r.timestamp <= ?"
+            params.append(format_timestamp(until))
+        if keywords:
+            placeholders = ", ".join("?" for _ in keywords)
+            clause += f" AND r.keyword_id IN (SELECT id FROM keywords WHERE value COLLATE NOCASE IN ({placeholders}))"
+            params.extend(keywords)
+        return clause, params
+
+    def query_searches(self, since: datetime, until: Optional[datetime] = None,
+                       keywords: Optional[List[str]] = None, limit: Optional[int] = None,
+                       cursor: Optional[str] = None,
+                       new_only: bool = False) -> Tuple[List[KeywordSearch], Optional[str]]:
+        """
+        Return one page of searches in (since, until], oldest first, and the
+        cursor for the next page (None when there are no more). With new_only
+        each search keeps only the URLs its keyword had not returned before.
+        """
+        records, next_cursor = self.query_search_records(since, until, keywords, limit, cursor, new_only)
+        return [record.to_model() for record in records], next_cursor
+
+    def query_search_records(self, since: datetime, until: Optional[datetime] = None,
+                             keywords: Optional[List[str]] = None, limit: Optional[int] = None,
+                             cursor: Optional[str] = None,
+                             new_only: bool = False) -> Tuple[List[SearchRecord], Optional[str]]:
+        """Same as query_searches, as unvalidated records built straight from the rows"""
+        clause, params = self._run_filter(since, until, keywords)
+        if cursor:
+            # Keyset pagination on (timestamp, id), which is the timestamp index order
+            after_timestamp, after_id = decode_cursor(cursor)
+            clause += " AND (r.timestamp > ? OR (r.timestamp = ? AND r.id > ?))"
+            params.extend([after_timestamp, after_timestamp, int(after_id)])
+        page_limit = ""
+        if limit:
+            # Fetch one extra run to learn whether another page exists
+            page_limit = " LIMIT ?"
+            params.append(limit + 1)
+        searches, run_keys = self._load_runs(clause, params, page_limit, new_only)
+
+        run_ids = list(searches)
+        next_cursor = None
+        if limit and len(run_ids) > limit:
+            last_id = run_ids[limit - 1]
+            next_cursor = encode_cursor(run_keys[last_id], last_id)
+            run_ids = run_ids[:limit]
+        return [searches[run_id] for run_id in run_ids], next_cursor
+
+    def get_searches_after(self, position: Optional[int] = None) -> Tuple[List[KeywordSearch], int]:
+        """
+        Return the searches saved after position, oldest first, and the
+        position to pass next time. Positions are search_runs ids, which
+        follow the order runs are saved in rather than their timestamps, so
+        a run saved late with an earlier timestamp is not skipped. None
+        returns every stored search.
+        """
+        latest = self._connect().execute("SELECT COALESCE(MAX(id), 0) FROM search_runs").fetchone()[0]
+        searches, _ = self._load_runs("r.id > ? AND r.id <= ?", [position or 0, latest], "", False)
+        return [record.to_model() for record in searches.values()], latest
+
+    def _load_runs(self, clause: str, params: list, page_limit: str,
+                   new_only: bool) -> Tuple[Dict[int, SearchRecord], Dict[int, str]]:
+        """Searches of the runs matching clause by run id, oldest first, and each run's timestamp"""
+        # Unchanged runs read the results of the run they repeat; none of those are new
+        results_join = "res.run_id = p.id AND res.is_new = 1" if new_only \
+            else "res.run_id = COALESCE(p.same_as, p.id)"
+        query = f"""
+            WITH page AS (
+                SELECT r.id, r.keyword_id, r.timestamp, r.same_as FROM search_runs r
+                WHERE {clause}
+                ORDER BY r.timestamp, r.id{page_limit}
+            )
+            SELECT p.id AS run_id, k.value AS keyword, p.timestamp,
+                   u.title, COALESCE(res.url, u.url), u.description,
+                   CASE WHEN p.same_as IS NULL THEN res.date ELSE p.timestamp END AS date
+            FROM page p
+            JOIN keywords k ON k.id = p.keyword_id
+            LEFT JOIN run_results res ON {results_join}
+            LEFT JOIN urls u ON u.id = res.url_id
+            ORDER BY p.timestamp, p.id, res.position
+        """
+
+        searches: Dict[int, SearchRecord] = {}
+        run_keys: Dict[int, str] = {}
+        rows = self._connect().cursor()
+        # Plain tuples; building a sqlite3.Row per result is measurable on long windows
+        rows.row_factory = None
+        for run_id, keyword, timestamp, title, url, description, result_date in rows.execute(query, params):
+            search = searches.get(run_id)
+            if search is None:
+                search = searches[run_id] = SearchRecord(keyword, [], iso_text(timestamp))
+                run_keys[run_id] = timestamp
+            if url is not None:
+                search.results.append(ResultRecord(title, url, description, iso_text(result_date)))
+        return searches, run_keys
+
+    def iter_search_pages(self, since: datetime, until: Optional[datetime] = None,
+                          keywords: Optional[List[str]] = None, new_only: bool = False,
+                          batch_size: int = STREAM_BATCH_SIZE) -> Iterator[List[SearchRecord]]:
+        """Yield the searches in (since, until] batch_size at a time, one keyset query per batch"""
+        cursor = None
+        while True:
+            page, cursor = self.query_search_records(since, until, keywords, batch_size, cursor, new_only)
+            if page:
+                yield page
+            if not cursor:
+                break
+
+    def count_results_by_day(self, since: datetime, until: Optional[datetime] = None,
+                             keywords: Optional[List[str]] = None) -> List[Dict]:
+        """Number of searches and results per keyword per day"""
+        clause, params = self._run_filter(since, until, keywords)
+        rows = self._connect().execute(f"""
+            SELECT k.value AS keyword, substr(r.timestamp, 1, 10) AS date,
+                   COUNT(DISTINCT r.id) AS searches, COUNT(res.run_id) AS results
+            FROM search_runs r
+            JOIN keywords k ON k.id = r.keyword_id
+            LEFT JOIN run_results res ON res.run_id = COALESCE(r.same_as, r.id)
+            WHERE {clause}
+            GROUP BY k.value, substr(r.timestamp, 1, 10)
+            ORDER BY 2, k.value
+        """, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def _cleanup_old_results(self):
+        cutoff = format_timestamp(datetime.now() - timedelta(days=RETENTION_DAYS))
+        conn = self._connect()
+        with conn:
+            self._promote_repeated_runs(conn, cutoff)
+            conn.execute("DELETE FROM search_runs WHERE timestamp <= ?", (cutoff,))
+            # URLs last returned by an expired run are no longer referenced
+            conn.execute("DELETE FROM keyword_urls WHERE last_seen <= ?", (cutoff,))
+            conn.execute("DELETE FROM url_fts WHERE rowid IN (SELECT id FROM urls WHERE last_seen <= ?)", (cutoff,))
+            conn.execute("DELETE FROM urls WHERE last_seen <= ?", (cutoff,))
+            rollup_cutoff = (datetime.now() - timedelta(days=ROLLUP_RETENTION_DAYS)).date().isoformat()
+            for table in ("keyword_daily_rollups", "keyword_daily_domains", "keyword_daily_terms"):
+                conn.execute(f"DELETE FROM {table} WHERE day < ?", (rollup_cutoff,))
+
+    def _promote_repeated_runs(self, conn: sqlite3.Connection, cutoff: str):
+        """
+        Before an expiring run is deleted, hand its results to the oldest
+        retained run that repeats it, so the later markers still resolve.
+        """
+        rows = conn.execute("""
+            SELECT r.id, r.timestamp, r.same_as FROM search_runs r
+            JOIN search_runs s ON s.id = r.same_as
+            WHERE s.timestamp <= ? AND r.timestamp > ?
+            ORDER BY r.timestamp, r.id
+        """, (cutoff, cutoff)).fetchall()
+        promoted = set()
+        for row in rows:
+            source = row["same_as"]
+            if source in promoted:
+                continue
+            promoted.add(source)
+            # Nothing in the repeated results was new for the run taking them over
+            conn.execute(
+                "UPDATE run_results SET run_id = ?, is_new = 0, date = ? WHERE run_id = ?",
+                (row["id"], row["timestamp"], source)
+            )
+            conn.execute("""
+                UPDATE search_runs SET same_as = NULL,
+                    summary = (SELECT summary FROM search_runs WHERE id = ?)
+                WHERE id = ?
+            """, (source, row["id"]))
+            conn.execute("UPDATE search_runs SET same_as = ? WHERE same_as = ?", (row["id"], source))
+
+    def get_pages(self, urls: List[str]) -> Dict[str, Dict]:
+        """Enrichment state (status, content_hash, error, fetched_at) of the given canonical URLs"""
+        if not urls:
+            return {}
+        placeholders = ", ".join("?" for _ in urls)
+        rows = self._connect().execute(f"""
+            SELECT u.url, p.status, p.content_hash, p.error, p.fetched_at
+            FROM pages p JOIN urls u ON u.id = p.url_id
+            WHERE u.url IN ({placeholders})
+        """, urls).fetchall()
+        return {row["url"]: {k: row[k] for k in row.keys() if k != "url"} for row in rows}
+
+    def save_pages(self, outcomes: Dict[str, Dict]):
+        """Record enrichment outcomes ({url: {status, content_hash, error}}) in one transaction"""
+        fetched_at = format_timestamp(datetime.now())
+        conn = self._connect()
+        with conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO pages (url_id, status, content_hash, error, fetched_at)
+                SELECT id, ?, ?, ?, ? FROM urls WHERE url = ?
+            """, [
+                (outcome["status"], outcome.get("content_hash"), outcome.get("error"), fetched_at, url)
+                for url, outcome in outcomes.items()
+            ])
+
+    def get_schedule(self) -> Dict[str, Dict]:
+        """Per-keyword schedule state of tracked keywords: interval in seconds, next_run and last_run"""
+        rows = self._connect().execute("""
+            SELECT k.value, s.interval, s.next_run, s.last_run
+            FROM keyword_schedule s JOIN keywords k ON k.id = s.keyword_id
+            WHERE k.tracked = 1
+        """).fetchall()
+        return {
+            row["value"]: {
+                "interval": row["interval"],
+                "next_run": datetime.fromisoformat(row["next_run"]),
+                "last_run": datetime.fromisoformat(row["last_run"]) if row["last_run"] else None
+            }
+            for row in rows
+        }
+
+    def save_schedule(self, entries: Dict[str, Dict]):
+        """Insert or replace the schedule state of the given keywords"""
+        conn = self._connect()
+        with conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO keyword_schedule (keyword_id, interval, next_run, last_run)
+                SELECT id, ?, ?, ? FROM keywords WHERE value = ? COLLATE NOCASE
+            """, [
+                (entry["interval"], format_timestamp(entry["next_run"]),
+                 format_timestamp(entry["last_run"]) if entry.get("last_run") else None, keyword)
+                for keyword, entry in entries.items()
+            ])
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        row = self._connect().execute("SELECT data FROM search_jobs WHERE id = ?", (job_id,)).fetchone()
+        return codec.loads(row["data"]) if row else None
+
+    def get_active_jobs(self) -> List[Dict]:
+        """Queued and running search jobs, oldest first"""
+        rows = self._connect().execute(
+            "SELECT data FROM search_jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+        ).fetchall()
+        return [codec.loads(row["data"]) for row in rows]
+
+    def _store_job(self, conn: sqlite3.Connection, job: Dict):
+        conn.execute(
+            "INSERT OR REPLACE INTO search_jobs (id, status, created_at, data) VALUES (?, ?, ?, ?)",
+            (job["id"], job["status"], format_timestamp(job["created_at"]), codec.dumps(job, default=str).decode())
+        )
+        conn.execute("""
+            DELETE FROM search_jobs WHERE status NOT IN ('queued', 'running') AND id NOT IN (
+                SELECT id FROM search_jobs WHERE status NOT IN ('queued', 'running')
+                ORDER BY created_at DESC LIMIT ?
+            )
+        """, (JOB_HISTORY_SIZE,))
+
+    def save_job(self, job: Dict):
+        """Insert or replace a search job, keeping the JOB_HISTORY_SIZE most recent finished ones"""
+        conn = self._connect()
+        with conn:
+            self._store_job(conn, job)
+
+    def queue_job(self, job: Dict) -> Dict:
+        """
+        Store job unless a queued or running job with the same trigger exists
+        already; return the job that will run
+        """
+        conn = self._connect()
+        with conn:
+            # Take the write lock before looking, so two workers cannot both queue a job
+            conn.execute("BEGIN IMMEDIATE")
+            for row in conn.execute(
+                "SELECT data FROM search_jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall():
+                active = codec.loads(row["data"])
+                if active["trigger"] == job["trigger"]:
+                    return active
+            self._store_job(conn, job)
+            return job
+
+    def change_token(self):
+        """Changes whenever any connection saves a search or changes keywords"""
+        row = self._connect().execute("""
+            SELECT (SELECT MAX(id) FROM search_runs),
+                   (SELECT value FROM meta WHERE key = 'keywords_revision')
+        """).fetchone()
+        return tuple(row)
+
+    def load_cached_searches(self, since: float, limit: int) -> List[Dict]:
+        """Return persisted search cache entries fetched after since, newest last"""
+        rows = self._connect().execute(
+            "SELECT key, results, fetched_at FROM search_cache WHERE fetched_at > ? "
+            "ORDER BY fetched_at DESC LIMIT ?",
+            (since, limit)
+        ).fetchall()
+        return [
+            {"key": row["key"], "results": codec.loads(row["results"]), "fetched_at": row["fetched_at"]}
+            for row in reversed(rows)
+        ]
+
+    def save_cached_search(self, key: str, results: List[Dict], fetched_at: float, max_age: float):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, results, fetched_at) VALUES (?, ?, ?)",
+                (key, codec.dumps(results, default=str).decode(), fetched_at)
+            )
+            conn.execute("DELETE FROM search_cache WHERE fetched_at < ?", (fetched_at - max_age,))
+
+    def import_keywords(self, keywords: Iterable[Dict]) -> int:
+        """Import keyword dicts as stored in the keywords JSON file"""
+        imported = 0
+        conn = self._connect()
+        with conn:
+            for k in keywords:
+                if not isinstance(k, dict) or not k.get("value"):
+                    continue
+                row = conn.execute(
+                    "SELECT tracked FROM keywords WHERE value = ? COLLATE NOCASE", (k["value"],)
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "UPDATE keywords SET tracked = 1 WHERE value = ? COLLATE NOCASE", (k["value"],)
+                    )
+                else:
+                    self._keyword_id(
+                        conn, k["value"], tracked=True,
+                        created_at=datetime.fromisoformat(str(k.get("created_at", datetime.now()))),
+                        is_active=k.get("is_active", True),
+                        group=k.get("group", DEFAULT_KEYWORD_GROUP)
+                    )
+                imported += 1
+            if imported:
+                self._bump_keywords_revision(conn)
+        return imported
+
+    def import_searches(self, searches: Iterable[Dict]) -> int:
+        """Import KeywordSearch dicts, skipping runs that were imported before"""
+        imported = 0
+        conn = self._connect()
+        with conn:
+            for search in searches:
+                try:
+                    inserted, _ = self._insert_search(conn, search)
+                    if inserted:
+                        imported += 1
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning(f"Skipping malformed search record: {str(e)}")
+        return imported
@@ -1,21 +1,47 @@
-import json
+import base64
 import os
-from datetime import datetime, timedelta
-from typing import List, Dict
+from datetime import date, datetime, timedelta
+from typing import Any, List, Dict, Iterable, Iterator, Optional, Set, Tuple
+from . import codec
 from .models import SearchResult, KeywordSearch, Keyword
-from config import STORAGE_DIR, RESULTS_FILE, KEYWORDS_FILE, RETENTION_DAYS
+from .records import SearchRecord
+from .rollups import build_trends
+from .archive import rank_documents
+from .lease import file_lock
+from .text import canonical_url, results_fingerprint, term_counts
+from config import (
+    STORAGE_DIR, RESULTS_FILE, KEYWORDS_FILE, PAGES_FILE, SCHEDULE_FILE, JOBS_FILE,
+    RETENTION_DAYS, STORAGE_BACKEND, JOB_HISTORY_SIZE, DEFAULT_KEYWORD_GROUP, KEYWORD_QUOTA,
+    KEYWORD_GROUP_QUOTAS, STREAM_BATCH_SIZE
+)
+
+def encode_cursor(*parts) -> str:
+    """Pack cursor parts into an opaque URL-safe token"""
+    return base64.urlsafe_b64encode("|".join(str(p) for p in parts).encode()).decode()
+
+def decode_cursor(cursor: str) -> List[str]:
+    try:
+        return base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+def keyword_quota(group: str) -> int:
+    """How many keywords a group may track"""
+    return KEYWORD_GROUP_QUOTAS.get(group, KEYWORD_QUOTA)
 
 class Storage:
     def __init__(self):
         os.makedirs(STORAGE_DIR, exist_ok=True)
         self.results_path = os.path.join(STORAGE_DIR, RESULTS_FILE)
         self.keywords_path = os.path.join(STORAGE_DIR, KEYWORDS_FILE)
+        self.pages_path = os.path.join(STORAGE_DIR, PAGES_FILE)
+        self.schedule_path = os.path.join(STORAGE_DIR, SCHEDULE_FILE)
+        self.jobs_path = os.path.join(STORAGE_DIR, JOBS_FILE)
         self._initialize_storage()
 
     def _initialize_storage(self):
         """Initialize storage files if they don't exist"""
-        if not os.path.exists(self.results_path):
-            self._save_results([])
+        self._initialize_results()
         if not os.path.exists(self.keywords_path):
             self._save_keywords([])
         # Ensure the keywords file is not empty
@@ -27,79 +53,386 @@ class Storage:
         except:
             self._save_keywords([])
 
+    def _initialize_results(self):
+        if not os.path.exists(self.results_path):
+            self._save_results([])
+
     def _save_results(self, results: List[Dict]):
-        with open(self.results_path, 'w') as f:
-            json.dump(results, f, default=str)
+        self._write_json(self.results_path, results)
 
     def _save_keywords(self, keywords: List[Dict]):
-        with open(self.keywords_path, 'w') as f:
-            json.dump(keywords, f, default=str)
+        self._write_json(self.keywords_path, keywords)
+
+    def _write_json(self, path: str, data):
+        """Write to a temporary file and rename it so readers never see a partial file"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(codec.dumps(data, default=str))
+        os.replace(tmp_path, path)
 
-    def get_keywords(self) -> List[Keyword]:
+    def _load_keywords(self) -> List[Dict]:
         try:
-            with open(self.keywords_path, 'r') as f:
-                data = json.load(f)
-                if not isinstance(data, list):
-                    return []
-
-                keywords = []
-                for k in data:
-                    if isinstance(k, dict):
-                        keywords.append(Keyword(
-                            value=k.get("value", ""),
-                            created_at=datetime.fromisoformat(k.get("created_at", datetime.now().isoformat())),
-                            is_active=k.get("is_active", True)
-                        ))
-                return keywords
-        except (json.JSONDecodeError, FileNotFoundError):
+            with open(self.keywords_path, 'rb') as f:
+                data = codec.loads(f.read())
+        except (codec.JSONDecodeError, FileNotFoundError):
             self._initialize_storage()
             return []
+        return [k for k in data if isinstance(k, dict)] if isinstance(data, list) else []
 
-    def add_keyword(self, keyword: str) -> bool:
-        keywords = self.get_keywords()
-
-        # Check current keyword count
-        if len(keywords) >= 10:
-            return False
+    def get_keywords(self, group: Optional[str] = None) -> List[Keyword]:
+        return [
+            Keyword(
+                value=k.get("value", ""),
+                created_at=datetime.fromisoformat(k.get("created_at", datetime.now().isoformat())),
+                is_active=k.get("is_active", True),
+                group=k.get("group", DEFAULT_KEYWORD_GROUP)
+            )
+            for k in self._load_keywords()
+            if group is None or k.get("group", DEFAULT_KEYWORD_GROUP) == group
+        ]
 
-        # Check if keyword already exists
-        if any(k.value.lower() == keyword.lower() for k in keywords):
-            return True
+    def add_keyword(self, keyword: str, group: str = DEFAULT_KEYWORD_GROUP) -> bool:
+        """Track a keyword; False when its group is at its quota"""
+        return self.add_keywords([{"value": keyword, "group": group}])["over_quota"] == 0
 
-        new_keyword = Keyword(
-            value=keyword,
-            created_at=datetime.now(),
-            is_active=True
-        )
+    def add_keywords(self, keywords: Iterable[Dict]) -> Dict[str, int]:
+        """
+        Track keyword dicts (value, group, is_active) in one write. Values
+        are unique regardless of case and across groups; keywords beyond
+        their group's quota are skipped. Returns how many were added, were
+        already tracked or were over quota.
+        """
+        # Any API worker may change keywords, so the read-modify-write holds a file lock
+        with file_lock(f"{self.keywords_path}.lock"):
+            stored = self._load_keywords()
+            index = {k.get("value", "").lower() for k in stored}
+            counts: Dict[str, int] = {}
+            for k in stored:
+                group = k.get("group", DEFAULT_KEYWORD_GROUP)
+                counts[group] = counts.get(group, 0) + 1
 
-        keywords_dict = [k.dict() for k in keywords]
-        keywords_dict.append(new_keyword.dict())
-        self._save_keywords(keywords_dict)
-        return True
+            summary = {"added": 0, "existing": 0, "over_quota": 0}
+            for k in keywords:
+                group = k.get("group") or DEFAULT_KEYWORD_GROUP
+                if k["value"].lower() in index:
+                    summary["existing"] += 1
+                elif counts.get(group, 0) >= keyword_quota(group):
+                    summary["over_quota"] += 1
+                else:
+                    stored.append(Keyword(
+                        value=k["value"], created_at=datetime.now(), is_active=k.get("is_active", True), group=group
+                    ).dict())
+                    index.add(k["value"].lower())
+                    counts[group] = counts.get(group, 0) + 1
+                    summary["added"] += 1
+            if summary["added"]:
+                self._save_keywords(stored)
+            return summary
 
     def remove_keyword(self, keyword: str):
-        keywords = self.get_keywords()
-        keywords = [k for k in keywords if k.value != keyword]
-        self._save_keywords([k.dict() for k in keywords])
+        with file_lock(f"{self.keywords_path}.lock"):
+            keywords = self._load_keywords()
+            self._save_keywords([k for k in keywords if k.get("value", "").lower() != keyword.lower()])
 
-    def save_search_results(self, keyword_search: KeywordSearch):
+    def save_search_results(self, keyword_search: KeywordSearch) -> Optional[bool]:
+        """
+        Store a search run and return whether its results changed since the
+        keyword's previous run, or None when there is no previous run to
+        compare with. The file backends always store the full run.
+        """
         results = self._load_results()
-        results.append(keyword_search.dict())
+        changed = self._results_changed(results, keyword_search)
+        # seq numbers searches in the order they were saved, for get_searches_after
+        seq = max((r.get('seq', 0) for r in results), default=0) + 1
+        results.append({**keyword_search.dict(), 'seq': seq})
         self._save_results(results)
         self._cleanup_old_results()
+        return changed
 
-    def get_search_results(self, days: int = 7) -> List[KeywordSearch]:
-        results = self._load_results()
-        cutoff_date = datetime.now() - timedelta(days=days)
-        recent_results = [
-            r for r in results
-            if datetime.fromisoformat(r['timestamp']) > cutoff_date
-        ]
-        return [KeywordSearch(**r) for r in recent_results]
+    def _results_changed(self, records: Iterable[Dict], keyword_search: KeywordSearch) -> Optional[bool]:
+        """
+        Compare a new run with the latest earlier run of its keyword among
+        records; None when records hold no earlier run of the keyword.
+        """
+        keyword = keyword_search.keyword.lower()
+        previous, previous_at = None, None
+        for r in records:
+            if r['keyword'].lower() != keyword:
+                continue
+            timestamp = datetime.fromisoformat(str(r['timestamp']))
+            if timestamp < keyword_search.timestamp and (previous_at is None or timestamp > previous_at):
+                previous, previous_at = r, timestamp
+        if previous is None:
+            return None
+        return results_fingerprint(previous.get('results', [])) != results_fingerprint(
+            result.dict() for result in keyword_search.results
+        )
+
+    def get_search_results(self, days: int = 7, keyword: Optional[str] = None) -> List[KeywordSearch]:
+        return self.get_searches_since(datetime.now() - timedelta(days=days), keyword)
+
+    def get_searches_since(self, since: datetime, keyword: Optional[str] = None) -> List[KeywordSearch]:
+        """Return searches stored strictly after since, oldest first"""
+        return self.query_searches(since, keywords=[keyword] if keyword else None)[0]
+
+    def get_searches_after(self, position: Optional[Any] = None) -> Tuple[List[KeywordSearch], Any]:
+        """
+        Return the searches saved after position, oldest first, and the
+        position to pass next time. Positions follow the order searches are
+        saved in rather than their timestamps, so a search saved late with
+        an earlier timestamp is not skipped. None returns every stored search.
+        """
+        after = position or 0
+        records = [r for r in self._load_results() if r.get('seq', 0) > after or position is None]
+        records.sort(key=lambda r: r['timestamp'])
+        latest = max((r.get('seq', 0) for r in records), default=after)
+        return [SearchRecord.from_dict(r).to_model() for r in records], latest
+
+    def _records_since(self, since: datetime) -> Iterable[Dict]:
+        """Raw records that may be newer than since; callers still filter by timestamp"""
+        return self._load_results()
+
+    def query_searches(self, since: datetime, until: Optional[datetime] = None,
+                       keywords: Optional[List[str]] = None, limit: Optional[int] = None,
+                       cursor: Optional[str] = None,
+                       new_only: bool = False) -> Tuple[List[KeywordSearch], Optional[str]]:
+        """
+        Return one page of searches in (since, until], oldest first, and the
+        cursor for the next page (None when there are no more). With new_only
+        each search keeps only the URLs its keyword had not returned before.
+        """
+        records, next_cursor = self.query_search_records(since, until, keywords, limit, cursor, new_only)
+        return [record.to_model() for record in records], next_cursor
+
+    def query_search_records(self, since: datetime, until: Optional[datetime] = None,
+                             keywords: Optional[List[str]] = None, limit: Optional[int] = None,
+                             cursor: Optional[str] = None,
+                             new_only: bool = False) -> Tuple[List[SearchRecord], Optional[str]]:
+        """Same as query_searches, as unvalidated records for serialization"""
+        matched = list(self._matching_records(since, until, keywords, new_only))
+
+        # The file backends have no stable row ids, so the cursor is an offset
+        offset = int(decode_cursor(cursor)[0]) if cursor else 0
+        end = offset + limit if limit else len(matched)
+        page = matched[offset:end]
+        next_cursor = encode_cursor(end) if end < len(matched) else None
+        return [SearchRecord.from_dict(r) for r in page], next_cursor
+
+    def iter_search_pages(self, since: datetime, until: Optional[datetime] = None,
+                          keywords: Optional[List[str]] = None, new_only: bool = False,
+                          batch_size: int = STREAM_BATCH_SIZE) -> Iterator[List[SearchRecord]]:
+        """
+        Yield the searches in (since, until] batch_size at a time from a
+        single pass over the stored results, rather than reloading them for
+        every page as offset cursors would
+        """
+        page = []
+        for r in self._matching_records(since, until, keywords, new_only):
+            page.append(SearchRecord.from_dict(r))
+            if len(page) == batch_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    def _matching_records(self, since: datetime, until: Optional[datetime],
+                          keywords: Optional[List[str]], new_only: bool) -> Iterator[Dict]:
+        """Raw searches in (since, until] for the keywords, oldest first"""
+        wanted = {k.lower() for k in keywords} if keywords else None
+        # Telling new URLs apart needs every retained run, not just the window
+        records = sorted(self._load_results(), key=lambda r: r['timestamp']) if new_only \
+            else self._records_since(since)
+        seen: Dict[str, Set[str]] = {}
+        for r in records:
+            if wanted is not None and r['keyword'].lower() not in wanted:
+                continue
+            if new_only:
+                r = self._drop_seen_results(r, seen.setdefault(r['keyword'].lower(), set()))
+            timestamp = datetime.fromisoformat(r['timestamp'])
+            if timestamp <= since or (until is not None and timestamp > until):
+                continue
+            yield r
+
+    def _drop_seen_results(self, record: Dict, seen: Set[str]) -> Dict:
+        """Copy of a raw search keeping only results whose canonical URL is not in seen"""
+        results = []
+        for result in record.get('results', []):
+            url = canonical_url(result['url'])
+            if url not in seen:
+                seen.add(url)
+                results.append(result)
+        return {**record, 'results': results}
+
+    def count_results_by_day(self, since: datetime, until: Optional[datetime] = None,
+                             keywords: Optional[List[str]] = None) -> List[Dict]:
+        """Number of searches and results per keyword per day"""
+        counts: Dict[Tuple[str, str], Dict] = {}
+        for search in self.query_searches(since, until, keywords)[0]:
+            day = search.timestamp.date().isoformat()
+            row = counts.setdefault(
+                (search.keyword, day),
+                {"keyword": search.keyword, "date": day, "searches": 0, "results": 0}
+            )
+            row["searches"] += 1
+            row["results"] += len(search.results)
+        return sorted(counts.values(), key=lambda r: (r["date"], r["keyword"]))
+
+    def get_trends(self, since: date, keywords: Optional[List[str]] = None) -> List[Dict]:
+        """
+        Per keyword, per day counts, new versus seen URLs, distinct domains and
+        top terms. The file backends compute them from the retained searches.
+        """
+        history_start = datetime.now() - timedelta(days=RETENTION_DAYS)
+        return build_trends(self.query_searches(history_start, keywords=keywords)[0], since)
+
+    def get_term_frequencies(self, since: date, keywords: Optional[List[str]] = None,
+                             limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Most frequent terms in result titles and descriptions from the day since onwards"""
+        start = datetime.combine(since, datetime.min.time())
+        counts = term_counts(
+            f"{r.title} {r.description}"
+            for search in self.query_searches(start, keywords=keywords)[0]
+            for r in search.results
+        )
+        return sorted(counts.items(), key=lambda t: (-t[1], t[0]))[:limit]
+
+    def search_archive(self, query: str, since: datetime, keywords: Optional[List[str]] = None,
+                       limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Rank URLs seen after since by BM25 over their title and description.
+        The file backends build the documents from the retained searches.
+        """
+        documents: Dict[str, Dict] = {}
+        for search in self.query_searches(since, keywords=keywords)[0]:
+            for result in search.results:
+                url = canonical_url(result.url)
+                document = documents.get(url)
+                if document is None:
+                    document = documents[url] = {
+                        "url": url, "first_seen": search.timestamp, "seen_count": 0, "keywords": []
+                    }
+                document.update(title=result.title, description=result.description, last_seen=search.timestamp)
+                document["seen_count"] += 1
+                if search.keyword not in document["keywords"]:
+                    document["keywords"].append(search.keyword)
+
+        hits = rank_documents(list(documents.values()), query)
+        for hit in hits:
+            del hit["description"]
+        offset = int(decode_cursor(cursor)[0]) if cursor else 0
+        next_cursor = encode_cursor(offset + limit) if offset + limit < len(hits) else None
+        return hits[offset:offset + limit], next_cursor
+
+    def _load_pages(self) -> Dict[str, Dict]:
+        try:
+            with open(self.pages_path, 'rb') as f:
+                return codec.loads(f.read())
+        except (FileNotFoundError, codec.JSONDecodeError):
+            return {}
+
+    def get_pages(self, urls: List[str]) -> Dict[str, Dict]:
+        """Enrichment state (status, content_hash, error, fetched_at) of the given canonical URLs"""
+        pages = self._load_pages()
+        return {url: pages[url] for url in urls if url in pages}
+
+    def save_pages(self, outcomes: Dict[str, Dict]):
+        """Record enrichment outcomes ({url: {status, content_hash, error}}) in one write"""
+        with file_lock(f"{self.pages_path}.lock"):
+            pages = self._load_pages()
+            fetched_at = datetime.now().isoformat()
+            for url, outcome in outcomes.items():
+                pages[url] = {
+                    "status": outcome["status"], "content_hash": outcome.get("content_hash"),
+                    "error": outcome.get("error"), "fetched_at": fetched_at
+                }
+            cutoff = (datetime.now() - timedelta(days=RETENTION_DAYS)).isoformat()
+            self._write_json(self.pages_path, {u: p for u, p in pages.items() if p["fetched_at"] > cutoff})
+
+    def get_schedule(self) -> Dict[str, Dict]:
+        """Per-keyword schedule state: interval in seconds, next_run and last_run"""
+        try:
+            with open(self.schedule_path, 'rb') as f:
+                data = codec.loads(f.read())
+        except (FileNotFoundError, codec.JSONDecodeError):
+            return {}
+        tracked = {k.value for k in self.get_keywords()}
+        return {
+            keyword: {
+                "interval": entry["interval"],
+                "next_run": datetime.fromisoformat(entry["next_run"]),
+                "last_run": datetime.fromisoformat(entry["last_run"]) if entry.get("last_run") else None
+            }
+            for keyword, entry in data.items() if keyword in tracked
+        }
+
+    def save_schedule(self, entries: Dict[str, Dict]):
+        """Insert or replace the schedule state of the given keywords"""
+        with file_lock(f"{self.schedule_path}.lock"):
+            schedule = self.get_schedule()
+            schedule.update(entries)
+            self._write_json(self.schedule_path, schedule)
+
+    def _load_jobs(self) -> List[Dict]:
+        try:
+            with open(self.jobs_path, 'rb') as f:
+                return codec.loads(f.read())
+        except (FileNotFoundError, codec.JSONDecodeError):
+            return []
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        return next((job for job in self._load_jobs() if job["id"] == job_id), None)
+
+    def get_active_jobs(self) -> List[Dict]:
+        """Queued and running search jobs, oldest first"""
+        return [job for job in self._load_jobs() if job["status"] in ("queued", "running")]
+
+    def save_job(self, job: Dict):
+        """Insert or replace a search job, keeping the JOB_HISTORY_SIZE most recent finished ones"""
+        # Every API worker reads and rewrites the jobs file, so the whole update holds a file lock
+        with file_lock(f"{self.jobs_path}.lock"):
+            self._save_job(job)
+
+    def _save_job(self, job: Dict):
+        jobs = self._load_jobs()
+        for i, stored in enumerate(jobs):
+            if stored["id"] == job["id"]:
+                jobs[i] = job
+                break
+        else:
+            jobs.append(job)
+        finished = [j for j in jobs if j["status"] not in ("queued", "running")]
+        expired = {j["id"] for j in finished[:-JOB_HISTORY_SIZE]}
+        self._write_json(self.jobs_path, [j for j in jobs if j["id"] not in expired])
+
+    def queue_job(self, job: Dict) -> Dict:
+        """
+        Store job unless a queued or running job with the same trigger exists
+        already; return the job that will run
+        """
+        with file_lock(f"{self.jobs_path}.lock"):
+            active = [j for j in self.get_active_jobs() if j["trigger"] == job["trigger"]]
+            if active:
+                return active[0]
+            self._save_job(job)
+            return job
+
+    def change_token(self):
+        """Changes whenever any process saves results or keywords"""
+        return tuple(
+            os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+            for path in (self.keywords_path, self.results_path)
+        )
+
+    def load_cached_searches(self, since: float, limit: int) -> List[Dict]:
+        """The file backends do not persist the search cache"""
+        return []
+
+    def save_cached_search(self, key: str, results: List[Dict], fetched_at: float, max_age: float):
+        pass
 
     def _load_results(self) -> List[Dict]:
-        with open(self.results_path, 'r') as f:
-            return json.load(f)
+        with open(self.results_path, 'rb') as f:
+            return codec.loads(f.read())
 
     def _cleanup_old_results(self):
         results = self._load_results()
@@ -108,4 +441,16 @@ class Storage:
             r for r in results
             if datetime.fromisoformat(r['timestamp']) > cutoff_date
         ]
-        self._save_results(filtered_results)
\ No newline at end of file
+        self._save_results(filtered_results)
+
+def create_storage() -> Storage:
+    """Create the storage engine selected by STORAGE_BACKEND in config.py"""
+    if STORAGE_BACKEND == "json":
+        return Storage()
+    if STORAGE_BACKEND == "segmented":
+        from .segmented_storage import SegmentedStorage
+        return SegmentedStorage()
+    if STORAGE_BACKEND == "sqlite":
+        from .sqlite_storage import SQLiteStorage
+        return SQLiteStorage()
+    raise ValueError(f"Unknown storage backend: {STORAGE_BACKEND}")
@@ -0,0 +1,74 @@
+import hashlib
+import html
+import re
+from collections import Counter
+from typing import Dict, Iterable, List
+from urllib.parse import parse_qsl, quote, urlencode, urlsplit, urlunsplit
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+TAG_RE = re.compile(r"<[^>]+>")
+CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+WORD_RE = re.compile(r"[a-z][a-z0-9'-]+")
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_hsenc", "_hsmi", "ref_src",
+}
+
+
+def strip_html(text: str) -> str:
+    """
+    Remove tags such as the <strong> highlights Brave puts in descriptions.
+    The result is plain text, entities decoded, and must be escaped again
+    before it is rendered as HTML.
+    """
+    return CONTROL_RE.sub("", html.unescape(TAG_RE.sub("", text)))
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of three or more characters that are not stop words"""
+    return [
+        word for word in WORD_RE.findall(strip_html(text).lower())
+        if len(word) >= 3 and word not in ENGLISH_STOP_WORDS
+    ]
+
+
+def term_counts(texts: Iterable[str]) -> Counter:
+    counts: Counter = Counter()
+    for text in texts:
+        counts.update(tokenize(text))
+    return counts
+
+
+def url_domain(url: str) -> str:
+    domain = urlsplit(url).netloc.lower()
+    return domain[4:] if domain.startswith("www.") else domain
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a result URL so the same page found twice compares equal:
+    lowercase scheme and host, no default port, fragment, tracking
+    parameters or trailing slash.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = parts.netloc.lower()
+    if (scheme, host[-3:]) == ("http", ":80") or (scheme, host[-4:]) == ("https", ":443"):
+        host = host.rsplit(":", 1)[0]
+    query = urlencode([
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name.lower() not in TRACKING_PARAMS
+    ], quote_via=quote)
+    return urlunsplit((scheme, host, parts.path.rstrip("/"), query, ""))
+
+
+def results_fingerprint(results: Iterable[Dict]) -> str:
+    """
+    Hash of a result set's URLs, titles and descriptions, in order. URLs
+    are taken as returned, since an unchanged run is served back with the
+    URLs of the run it repeats.
+    """
+    digest = hashlib.sha1()
+    for r in results:
+        digest.update(f"{r['url']}\t{r['title']}\t{r['description']}\n".encode())
+    return digest.hexdigest()
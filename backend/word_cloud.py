@@ -0,0 +1,61 @@
+import io
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from config import WORD_CLOUD_MAX_WORDS, WORD_CLOUD_CACHE_SIZE
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def render_png(frequencies: List[Tuple[str, int]], width: int = 800, height: int = 400) -> bytes:
+    """Lay out a word cloud from precomputed term counts and encode it as PNG"""
+    from wordcloud import WordCloud
+
+    cloud = WordCloud(
+        width=width, height=height,
+        background_color='white',
+        colormap='viridis',
+        max_words=len(frequencies)
+    ).generate_from_frequencies(dict(frequencies))
+    buffer = io.BytesIO()
+    cloud.to_image().save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+class WordCloudService:
+    """
+    Serves word cloud images built from the stored term frequencies.
+
+    Rendered PNGs are kept per (window, keyword set) in a small LRU and
+    reused until a new search is saved or the day rolls over.
+    """
+
+    def __init__(self, storage, max_words: int = WORD_CLOUD_MAX_WORDS,
+                 max_entries: int = WORD_CLOUD_CACHE_SIZE):
+        self.storage = storage
+        self.max_words = max_words
+        self.max_entries = max_entries
+        self._images: "OrderedDict[tuple, Tuple[int, Optional[bytes]]]" = OrderedDict()
+
+    async def get_png(self, days: int, keywords: Optional[List[str]] = None) -> Optional[bytes]:
+        """PNG for the last N days and the given keywords, or None when there are no terms"""
+        since = (datetime.now() - timedelta(days=days)).date()
+        key = (since, tuple(sorted({k.lower() for k in keywords or []})))
+        cached = self._images.get(key)
+        if cached and cached[0] == self.storage.version:
+            self._images.move_to_end(key)
+            return cached[1]
+
+        version = self.storage.version
+        frequencies = await self.storage.get_term_frequencies(since, keywords, self.max_words)
+        image = await self.storage.run(render_png, frequencies) if frequencies else None
+        logger.info(f"Rendered word cloud for {key} from {len(frequencies)} terms")
+
+        self._images[key] = (version, image)
+        self._images.move_to_end(key)
+        while len(self._images) > self.max_entries:
+            self._images.popitem(last=False)
+        return image
@@ -0,0 +1,122 @@
+"""
+Measure how /results load affects the latency of cheap endpoints.
+
+Usage:
+    python -m benchmarks.bench_api_load [--searches 3000] [--duration 10]
+
+Seeds a temporary data directory, starts uvicorn on it, keeps several
+clients hammering /results?days=30 and meanwhile samples / and /keywords.
+If blocking storage work runs on the event loop, the p99 of the cheap
+endpoints climbs to the cost of a full /results call.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import aiohttp
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORT = 8765
+
+
+def seed(data_dir: str, searches: int):
+    """Fill a SQLite store with synthetic searches spread over the last 30 days"""
+    sys.path.insert(0, REPO_ROOT)
+    from backend.sqlite_storage import SQLiteStorage
+
+    storage = SQLiteStorage(os.path.join(data_dir, "intentionly.db"), migrate_from=None)
+    now = datetime.now()
+    keywords = [f"keyword {i}" for i in range(10)]
+    storage.import_keywords({"value": k, "created_at": now.isoformat()} for k in keywords)
+    storage.import_searches(
+        {
+            "keyword": keywords[i % len(keywords)],
+            "timestamp": now - timedelta(days=29 * i / searches),
+            "results": [
+                {
+                    "title": f"Result {j} for search {i}",
+                    "url": f"https://example.test/{i}/{j}",
+                    "description": "Lorem ipsum dolor sit amet " * 8,
+                    "date": now,
+                }
+                for j in range(10)
+            ],
+        }
+        for i in range(searches)
+    )
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def hammer(session, url, stop_at):
+    while time.monotonic() < stop_at:
+        async with session.get(url) as response:
+            await response.read()
+
+
+async def probe(session, url, stop_at, latencies):
+    while time.monotonic() < stop_at:
+        start = time.perf_counter()
+        async with session.get(url) as response:
+            await response.read()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.02)
+
+
+async def run_load(duration: float, heavy_clients: int):
+    base = f"http://127.0.0.1:{PORT}"
+    async with aiohttp.ClientSession() as session:
+        for _ in range(100):
+            try:
+                async with session.get(base + "/") as response:
+                    if response.status == 200:
+                        break
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.1)
+
+        stop_at = time.monotonic() + duration
+        root, keywords = [], []
+        await asyncio.gather(
+            *(hammer(session, base + "/results?days=30", stop_at) for _ in range(heavy_clients)),
+            probe(session, base + "/", stop_at, root),
+            probe(session, base + "/keywords", stop_at, keywords),
+        )
+
+    for label, latencies in (("/", root), ("/keywords", keywords)):
+        print(
+            f"{label:<10} n={len(latencies):<5} p50 {percentile(latencies, 0.5):8.1f} ms  "
+            f"p99 {percentile(latencies, 0.99):8.1f} ms  max {max(latencies):8.1f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test cheap endpoints while /results is busy")
+    parser.add_argument("--searches", type=int, default=3000)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--heavy-clients", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        seed(os.path.join(workdir, "data"), args.searches)
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT, STORAGE_BACKEND="sqlite")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.api:app", "--port", str(PORT), "--log-level", "warning"],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            asyncio.run(run_load(args.duration, args.heavy_clients))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compare a fresh aiohttp session per request with the pooled BraveClient.
+
+Usage:
+    python -m benchmarks.bench_brave_client [--requests 200] [--concurrency 10]
+
+Both variants call a local Brave stub. The stub is plain HTTP, so the gap
+shown here is TCP setup only; against the real API each new session also
+pays DNS and a TLS handshake.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("BRAVE_API_KEY", "benchmark")
+os.environ.setdefault("BRAVE_QPS", "100000")
+
+import aiohttp
+from backend import brave_search
+from backend.brave_search import BraveClient, search_brave
+from benchmarks.brave_stub import start_stub
+
+
+async def fresh_session_search(url: str, keyword: str):
+    """The previous behaviour: one ClientSession per request"""
+    headers = {"Accept": "application/json", "X-Subscription-Token": "benchmark"}
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, headers=headers, params={"q": keyword, "count": 10}) as response:
+            return await response.json()
+
+
+async def measure(label: str, call, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(f"keyword {i}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(
+        f"{label:<22} mean {statistics.mean(latencies):7.2f} ms  "
+        f"p50 {latencies[len(latencies) // 2]:7.2f} ms  "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1]:7.2f} ms  "
+        f"{requests / elapsed:8.1f} req/s"
+    )
+
+
+async def main(requests: int, concurrency: int):
+    runner, url = await start_stub()
+    try:
+        await measure("fresh session", lambda k: fresh_session_search(url, k), requests, concurrency)
+
+        brave_search.brave_client = BraveClient(search_url=url)
+        await brave_search.brave_client.start()
+        # One page each, like the fresh-session variant
+        await measure("pooled BraveClient", lambda k: search_brave(k, count=10), requests, concurrency)
+        await brave_search.brave_client.close()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
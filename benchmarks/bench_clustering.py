@@ -0,0 +1,97 @@
+"""
+Compare dense and sparse similarity clustering on synthetic result corpora.
+
+Usage:
+    python -m benchmarks.bench_clustering [--sizes 1000 10000 50000] [--dense-limit 10000]
+
+"dense" is the previous approach: a full N x N cosine matrix, DBSCAN on
+the dense distance matrix and a Python double loop for links. "sparse" is
+the thresholded k-NN graph used by backend.clustering. Dense runs above
+--dense-limit are skipped and reported with the memory they would need.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+from scipy import sparse
+from sklearn.cluster import DBSCAN
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.feature_extraction.text import TfidfTransformer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from backend.clustering import N_FEATURES, similarity_graph, confidence_scores
+
+EPS = 0.7
+THRESHOLD = 0.3
+
+
+def synthetic_corpus(n: int, topics: int = 50, seed: int = 42):
+    """Short title+snippet texts drawn from overlapping topic vocabularies"""
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(5000)]
+    topic_words = [rng.sample(vocabulary, 40) for _ in range(topics)]
+    texts = []
+    for _ in range(n):
+        words = topic_words[rng.randrange(topics)]
+        texts.append(" ".join(rng.choice(words) if rng.random() < 0.7 else rng.choice(vocabulary)
+                              for _ in range(30)))
+    return texts
+
+
+def vectorize(texts):
+    counts = HashingVectorizer(n_features=N_FEATURES, alternate_sign=False, norm=None).transform(texts)
+    return TfidfTransformer().fit_transform(counts).tocsr()
+
+
+def run_dense(matrix):
+    similarity = np.clip(cosine_similarity(matrix), 0, 1)
+    distance = np.clip(1 - similarity, 0, 1)
+    labels = DBSCAN(eps=EPS, min_samples=2, metric="precomputed").fit_predict(distance)
+    links = 0
+    n = matrix.shape[0]
+    for i in range(n):
+        for j in range(i + 1, n):
+            if labels[i] != -1 and labels[i] == labels[j] and similarity[i, j] > THRESHOLD:
+                links += 1
+    return labels, links
+
+
+def run_sparse(matrix):
+    graph = similarity_graph(matrix, THRESHOLD)
+    distances = graph.copy()
+    distances.data = np.clip(1 - distances.data, 0, 1)
+    labels = DBSCAN(eps=EPS, min_samples=2, metric="precomputed").fit_predict(distances)
+    confidence_scores(graph, THRESHOLD)
+    edges = sparse.triu(graph, k=1).tocoo()
+    keep = (labels[edges.row] != -1) & (labels[edges.row] == labels[edges.col])
+    return labels, int(keep.sum()), graph.nnz
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dense vs sparse result clustering")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--dense-limit", type=int, default=10000)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        matrix = vectorize(synthetic_corpus(n))
+
+        start = time.perf_counter()
+        labels, links, nnz = run_sparse(matrix)
+        sparse_time = time.perf_counter() - start
+        print(f"N={n:<6} sparse {sparse_time:8.2f} s  edges {nnz:>9}  "
+              f"clusters {len(set(labels) - {-1}):>5}  links {links}")
+
+        dense_bytes = 2 * n * n * 8
+        if n > args.dense_limit:
+            print(f"N={n:<6} dense  skipped (two N x N float64 matrices need {dense_bytes / 1e9:.1f} GB)")
+            continue
+        start = time.perf_counter()
+        labels, links = run_dense(matrix)
+        print(f"N={n:<6} dense  {time.perf_counter() - start:8.2f} s  matrices {dense_bytes / 1e9:6.2f} GB  "
+              f"clusters {len(set(labels) - {-1}):>5}  links {links}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Run the enrichment stage against the local page fixture.
+
+Usage:
+    python -m benchmarks.bench_enrichment [--pages 200] [--latency-ms 50]
+
+Saves searches whose results point at the fixture under two host names,
+queues them on an EnrichmentService backed by a throwaway SQLite
+database, and reports throughput, the outcome per status, the peak
+number of requests in flight per host and how many distinct texts were
+stored.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+from backend.async_storage import AsyncStorage
+from backend.content_store import ContentStore
+from backend.enrichment import EnrichmentService
+from backend.models import KeywordSearch, SearchResult
+from backend.sqlite_storage import SQLiteStorage
+from backend.text import canonical_url
+from benchmarks.page_fixture import start_fixture
+
+
+def fixture_urls(port: int, pages: int):
+    urls = []
+    for n in range(pages):
+        host = "127.0.0.1" if n % 2 else "localhost"
+        kind = "article"
+        if n % 25 == 0:
+            kind = "missing"
+        elif n % 25 == 1:
+            kind = "binary"
+        elif n % 10 == 2:
+            # Same text as an article elsewhere; stored once
+            kind = "syndicated"
+        urls.append(f"http://{host}:{port}/{kind}/{n - 1 if kind == 'syndicated' else n}?utm_source=bench")
+    return urls
+
+
+async def main(pages: int, latency_ms: float, per_domain: int, concurrency: int, timeout: float):
+    runner, port = await start_fixture(latency_ms, slow_ms=timeout * 2000)
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage = AsyncStorage(SQLiteStorage(os.path.join(data_dir, "bench.db"), migrate_from=None))
+        urls = fixture_urls(port, pages) + [f"http://localhost:{port}/slow/0"]
+        now = datetime.now()
+        for i in range(0, len(urls), 10):
+            await storage.save_search_results(KeywordSearch(keyword="bench", timestamp=now.replace(microsecond=i), results=[
+                SearchResult(title=f"Result {j}", url=url, description="fixture", date=now)
+                for j, url in enumerate(urls[i:i + 10])
+            ]))
+
+        service = EnrichmentService(
+            storage, ContentStore(os.path.join(data_dir, "pages")),
+            concurrency=concurrency, per_domain=per_domain, timeout=timeout
+        )
+        await service.start()
+        try:
+            start = time.perf_counter()
+            service.enqueue(urls)
+            # Enqueueing a second time must not refetch anything
+            service.enqueue(urls)
+            await service.join()
+            elapsed = time.perf_counter() - start
+
+            pages_state = await storage.get_pages([canonical_url(url) for url in urls])
+            statuses = Counter(p["status"] for p in pages_state.values())
+            blobs = sum(len(files) for _, _, files in os.walk(os.path.join(data_dir, "pages")))
+            app = runner.app
+            print(f"{len(urls)} URLs in {elapsed:.2f}s ({len(urls) / elapsed:.1f} URLs/s), {app['requests']} requests")
+            print(f"statuses: {dict(statuses)}")
+            print(f"peak in flight per host: {dict(app['peak_in_flight'])} (limit {per_domain})")
+            print(f"stored texts: {blobs} for {statuses['ok']} enriched URLs")
+        finally:
+            await service.close()
+            storage.shutdown()
+    await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--per-domain", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=2)
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.latency_ms, args.per_domain, args.concurrency, args.timeout))
@@ -0,0 +1,64 @@
+"""
+Measure keyword management with thousands of keywords on each storage backend.
+
+Usage:
+    python -m benchmarks.bench_keywords [--keywords 5000] [--single 200]
+
+Bulk-imports ``keywords`` keywords into a fresh store, then adds
+``single`` more one at a time as POST /keywords would, and lists them
+all. Reports the import time, the mean time per single add and the
+listing time.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("KEYWORD_QUOTA", "1000000")
+
+from backend.segmented_storage import SegmentedStorage
+from backend.sqlite_storage import SQLiteStorage
+from backend.storage import Storage
+from config import STORAGE_DIR, SQLITE_DB_FILE
+
+
+def measure(label: str, engine, keywords: int, single: int):
+    started = time.perf_counter()
+    summary = engine.add_keywords([{"value": f"keyword {i}"} for i in range(keywords)])
+    imported = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for i in range(single):
+        engine.add_keyword(f"single keyword {i}")
+    per_add = (time.perf_counter() - started) / single * 1000
+
+    started = time.perf_counter()
+    listed = len(engine.get_keywords())
+    listing = (time.perf_counter() - started) * 1000
+    print(
+        f"{label:<10} import {summary['added']} in {imported:6.2f}s  add one {per_add:7.2f} ms  "
+        f"list {listed} in {listing:7.1f} ms"
+    )
+
+
+def main(keywords: int, single: int):
+    for label, make in [
+        ("json", Storage),
+        ("segmented", SegmentedStorage),
+        ("sqlite", lambda: SQLiteStorage(os.path.join(STORAGE_DIR, SQLITE_DB_FILE), migrate_from=None)),
+    ]:
+        with tempfile.TemporaryDirectory() as workdir:
+            previous = os.getcwd()
+            os.chdir(workdir)
+            try:
+                measure(label, make(), keywords, single)
+            finally:
+                os.chdir(previous)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keywords", type=int, default=5000)
+    parser.add_argument("--single", type=int, default=200)
+    args = parser.parse_args()
+    main(args.keywords, args.single)
@@ -0,0 +1,46 @@
+"""
+Time the cluster map layout: metric MDS versus truncated SVD.
+
+Usage:
+    python -m benchmarks.bench_layout [--sizes 500 1000 2000 10000 50000] [--mds-limit 2000]
+
+MDS is the previous layout and needs the dense distance matrix; runs above
+--mds-limit are skipped. SVD is backend.clustering.project_2d.
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+from sklearn.manifold import MDS
+from sklearn.metrics.pairwise import cosine_similarity
+
+from backend.clustering import project_2d
+from benchmarks.bench_clustering import synthetic_corpus, vectorize
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MDS vs truncated SVD layout")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 10000, 50000])
+    parser.add_argument("--mds-limit", type=int, default=2000)
+    args = parser.parse_args()
+    warnings.simplefilter("ignore", FutureWarning)
+
+    for n in args.sizes:
+        matrix = vectorize(synthetic_corpus(n))
+
+        start = time.perf_counter()
+        project_2d(matrix)
+        print(f"N={n:<6} svd {time.perf_counter() - start:8.3f} s")
+
+        if n > args.mds_limit:
+            print(f"N={n:<6} mds skipped")
+            continue
+        start = time.perf_counter()
+        distance = np.clip(1 - cosine_similarity(matrix), 0, 1)
+        MDS(n_components=2, dissimilarity="precomputed", random_state=42).fit_transform(distance)
+        print(f"N={n:<6} mds {time.perf_counter() - start:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
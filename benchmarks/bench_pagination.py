@@ -0,0 +1,67 @@
+"""
+Measure deep Brave searches fetched page by page against parallel pages.
+
+Usage:
+    python -m benchmarks.bench_pagination [--keywords 20] [--count 100] [--latency-ms 150]
+
+Runs search_brave for several keywords against the local Brave stub, once
+with one page in flight per keyword and once with BRAVE_PAGE_CONCURRENCY
+pages, then once against a stub that recycles URLs past its first 30
+results to show the duplicate cut-off. Reports wall time, requests sent
+and results kept per keyword.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("BRAVE_API_KEY", "benchmark")
+os.environ.setdefault("BRAVE_QPS", "100000")
+
+from backend import brave_search
+from backend.brave_search import BraveClient, search_brave
+from benchmarks.brave_stub import start_stub
+from config import BRAVE_PAGE_CONCURRENCY, SEARCH_CONCURRENCY
+
+
+async def run(label: str, keywords: int, count: int, latency_ms: float, page_concurrency: int,
+              total: int = 200, recycle: bool = False):
+    runner, url = await start_stub(latency_ms, total=total, recycle=recycle)
+    brave_search.brave_client = BraveClient(search_url=url)
+    brave_search.BRAVE_PAGE_CONCURRENCY = page_concurrency
+    semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+
+    async def one(i: int):
+        async with semaphore:
+            return await search_brave(f"keyword {i}", count=count)
+
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(keywords)))
+        elapsed = time.perf_counter() - start
+        requests = runner.app["requests"]
+        kept = sum(len(r) for r in results) / keywords
+        unique = all(len({r.url for r in rs}) == len(rs) for rs in results)
+        print(
+            f"{label:<28} {elapsed:6.2f}s  {requests:4d} requests  "
+            f"{kept:5.1f} results/keyword  unique={unique}"
+        )
+    finally:
+        await brave_search.brave_client.close()
+        await runner.cleanup()
+
+
+async def main(keywords: int, count: int, latency_ms: float):
+    await run("sequential pages", keywords, count, latency_ms, 1)
+    await run(f"{BRAVE_PAGE_CONCURRENCY} pages in parallel", keywords, count, latency_ms, BRAVE_PAGE_CONCURRENCY)
+    await run("recycled past 30 results", keywords, count, latency_ms, BRAVE_PAGE_CONCURRENCY,
+              total=30, recycle=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keywords", type=int, default=20)
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    args = parser.parse_args()
+    asyncio.run(main(args.keywords, args.count, args.latency_ms))
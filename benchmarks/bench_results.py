@@ -0,0 +1,95 @@
+"""
+Measure /results throughput on a seeded SQLite store.
+
+Usage:
+    python -m benchmarks.bench_results [--searches 3000] [--requests 20]
+
+Seeds a temporary data directory, starts uvicorn on it and fetches
+/results?days=30 back to back, with and without a field projection and
+with new_only. Reports requests per second, result rows per second and
+the body size, so runs before and after a change can be compared, plus
+the latency of a revalidation that sends the ETag back.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+from benchmarks.bench_api_load import REPO_ROOT, percentile, seed
+
+PORT = 8766
+QUERIES = [
+    ("full", "/results?days=30"),
+    ("projected", "/results?days=30&fields=keyword,timestamp,results.url"),
+    ("new_only", "/results?days=30&new_only=true"),
+]
+
+
+async def measure(requests: int):
+    base = f"http://127.0.0.1:{PORT}"
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        for _ in range(100):
+            try:
+                async with session.get(base + "/") as response:
+                    if response.status == 200:
+                        break
+            except aiohttp.ClientError:
+                await asyncio.sleep(0.1)
+
+        for label, path in QUERIES:
+            # One warm-up request so connection setup and page cache are out of the numbers
+            async with session.get(base + path) as response:
+                body = await response.read()
+                etag = response.headers.get("ETag")
+            rows = body.count(b'"url"')
+
+            latencies = []
+            started = time.perf_counter()
+            for _ in range(requests):
+                start = time.perf_counter()
+                async with session.get(base + path) as response:
+                    await response.read()
+                latencies.append((time.perf_counter() - start) * 1000)
+            elapsed = time.perf_counter() - started
+
+            revalidate = "n/a"
+            if etag:
+                start = time.perf_counter()
+                async with session.get(base + path, headers={"If-None-Match": etag}) as response:
+                    await response.read()
+                revalidate = f"{(time.perf_counter() - start) * 1000:.1f} ms ({response.status})"
+            print(
+                f"{label:<10} {requests / elapsed:6.2f} req/s  {rows * requests / elapsed:9.0f} results/s  "
+                f"p50 {percentile(latencies, 0.5):7.1f} ms  body {len(body) / 1e6:5.1f} MB  "
+                f"revalidate {revalidate}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure /results throughput")
+    parser.add_argument("--searches", type=int, default=3000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        seed(os.path.join(workdir, "data"), args.searches)
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT, STORAGE_BACKEND="sqlite")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.api:app", "--port", str(PORT), "--log-level", "warning"],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            asyncio.run(measure(args.requests))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measure a month of daily runs where most keywords return what they did yesterday.
+
+Usage:
+    python -m benchmarks.bench_unchanged [--keywords 10] [--days 30] [--results 50] [--change-rate 0.2]
+
+Saves one run per keyword per day into a fresh SQLite store, with only
+``change-rate`` of the runs returning a different result set, and asks
+the clustering service for its 7-day graph after each day as the
+dashboard would. Reports time spent saving, time spent clustering, the
+number of stored result rows and the database size.
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from backend.async_storage import AsyncStorage
+from backend.clustering import ClusteringService
+from backend.models import KeywordSearch, SearchResult
+from backend.sqlite_storage import SQLiteStorage
+
+WORDS = "market model launch price chip data cloud policy research startup robot energy".split()
+
+
+def result_set(keyword: str, version: int, count: int, day: datetime):
+    rng = random.Random(f"{keyword}/{version}")
+    return [
+        SearchResult(
+            title=f"{keyword} {' '.join(rng.sample(WORDS, 3))} {version}-{i}",
+            url=f"https://site{i % 9}.test/{keyword.replace(' ', '-')}/{version}/{i}",
+            description=f"{keyword} report: {' '.join(rng.sample(WORDS, 6))}",
+            date=day
+        )
+        for i in range(count)
+    ]
+
+
+async def main(keywords: int, days: int, results: int, change_rate: float):
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "intentionly.db")
+        storage = AsyncStorage(SQLiteStorage(path, migrate_from=None))
+        clustering = ClusteringService(storage)
+        rng = random.Random(42)
+        versions = {f"keyword {k}": 0 for k in range(keywords)}
+        start_day = datetime.now() - timedelta(days=days)
+
+        save_time = cluster_time = 0.0
+        for day in range(days):
+            timestamp = start_day + timedelta(days=day)
+            started = time.perf_counter()
+            for keyword in versions:
+                if day and rng.random() < change_rate:
+                    versions[keyword] += 1
+                await storage.save_search_results(KeywordSearch(
+                    keyword=keyword,
+                    results=result_set(keyword, versions[keyword], results, timestamp),
+                    timestamp=timestamp
+                ))
+            save_time += time.perf_counter() - started
+
+            started = time.perf_counter()
+            await clustering.get_graph(7)
+            cluster_time += time.perf_counter() - started
+
+        conn = storage.storage._connect()
+        rows = conn.execute("SELECT COUNT(*) FROM run_results").fetchone()[0]
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        size = sum(os.path.getsize(os.path.join(workdir, name)) for name in os.listdir(workdir))
+        storage.shutdown()
+        print(
+            f"{keywords * days} runs: save {save_time:6.2f}s  clustering {cluster_time:6.2f}s  "
+            f"{rows} result rows  {size / 1e6:5.1f} MB on disk"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keywords", type=int, default=10)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--results", type=int, default=50)
+    parser.add_argument("--change-rate", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.keywords, args.days, args.results, args.change_rate))
@@ -0,0 +1,92 @@
+"""
+Local stand-in for the Brave web search API, for benchmarks.
+
+Usage:
+    python -m benchmarks.brave_stub [--port 8765] [--latency-ms 50] [--total 100] [--recycle]
+
+Serves GET /res/v1/web/search with deterministic results for each query,
+so the backend can run against it by setting
+BRAVE_SEARCH_URL=http://127.0.0.1:8765/res/v1/web/search.
+
+Paging follows the real API: count is at most 20, offset is a page
+number from 0 to 9 and query.more_results_available tells whether
+another page exists. Each query has ``total`` results; with ``recycle``
+pages past the end repeat earlier URLs instead of coming back empty.
+"""
+import argparse
+import asyncio
+import hashlib
+from typing import Optional, Tuple
+from aiohttp import web
+
+SEARCH_PATH = "/res/v1/web/search"
+
+
+MAX_COUNT = 20
+MAX_OFFSET = 9
+
+
+def fake_results(query: str, count: int, offset: int = 0, total: Optional[int] = None,
+                 recycle: bool = False):
+    """Build a page of deterministic web results for a query"""
+    slug = hashlib.sha1(query.encode()).hexdigest()[:8]
+    indexes = range(offset * count, (offset + 1) * count)
+    if total is not None:
+        indexes = [i % total for i in indexes] if recycle else [i for i in indexes if i < total]
+    return [
+        {
+            "title": f"{query} result {i}",
+            "url": f"https://example-{i % 7}.test/{slug}/{i}",
+            "description": f"About <strong>{query}</strong>: item {i} from the stub index."
+        }
+        for i in indexes
+    ]
+
+
+def create_app(latency_ms: float = 0, total: int = 100, recycle: bool = False) -> web.Application:
+    async def search(request: web.Request) -> web.Response:
+        if not request.headers.get("X-Subscription-Token"):
+            return web.json_response({"error": "missing token"}, status=401)
+        count = int(request.query.get("count", 20))
+        offset = int(request.query.get("offset", 0))
+        if not 1 <= count <= MAX_COUNT or not 0 <= offset <= MAX_OFFSET:
+            return web.json_response({"error": "count or offset out of range"}, status=422)
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        query = request.query.get("q", "")
+        request.app["requests"] += 1
+        more = recycle or (offset + 1) * count < total
+        return web.json_response({
+            "query": {"original": query, "more_results_available": more and offset < MAX_OFFSET},
+            "web": {"results": fake_results(query, count, offset, total, recycle)}
+        })
+
+    app = web.Application()
+    app["requests"] = 0
+    app.router.add_get(SEARCH_PATH, search)
+    return app
+
+
+async def start_stub(latency_ms: float = 0, port: int = 0, total: int = 100,
+                     recycle: bool = False) -> Tuple[web.AppRunner, str]:
+    """Start the stub on localhost and return its runner and search URL"""
+    runner = web.AppRunner(create_app(latency_ms, total, recycle))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{bound_port}{SEARCH_PATH}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Brave Search API stub")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--total", type=int, default=100, help="results available per query")
+    parser.add_argument("--recycle", action="store_true", help="repeat earlier URLs past the end")
+    args = parser.parse_args()
+    web.run_app(create_app(args.latency_ms, args.total, args.recycle), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Local HTTP fixture serving article pages, for exercising enrichment.
+
+Usage:
+    python -m benchmarks.page_fixture [--port 8766] [--latency-ms 50]
+
+Routes:
+    /article/{n}      an HTML article with a distinct body per n
+    /syndicated/{n}   the same body as /article/{n} under another URL
+    /missing/{n}      404
+    /binary/{n}       a non-HTML payload
+    /slow/{n}         an article served after --slow-ms
+
+The app counts requests and records the peak number of requests in
+flight per Host header, so per-domain limits can be checked by serving
+the same fixture as 127.0.0.1 and localhost.
+"""
+import argparse
+import asyncio
+from collections import defaultdict
+from typing import Tuple
+from aiohttp import web
+
+PARAGRAPH = (
+    "Supply chain regulation is moving quickly as brands publish Scope 3 emissions, "
+    "textile passports and recycling targets for their products. "
+)
+
+
+def article_html(n: int) -> str:
+    paragraphs = "".join(f"<p>Article {n}, section {i}. {PARAGRAPH * 3}</p>" for i in range(6))
+    return (
+        f"<html><head><title>Article {n}</title></head><body>"
+        f"<nav><a href='/'>Home</a> | <a href='/about'>About</a></nav>"
+        f"<article><h1>Article {n}</h1>{paragraphs}</article>"
+        f"<footer>Copyright fixture</footer></body></html>"
+    )
+
+
+def create_app(latency_ms: float = 0, slow_ms: float = 5000) -> web.Application:
+    app = web.Application()
+    app["requests"] = 0
+    app["in_flight"] = defaultdict(int)
+    app["peak_in_flight"] = defaultdict(int)
+
+    @web.middleware
+    async def track(request: web.Request, handler):
+        host = request.host
+        app["requests"] += 1
+        app["in_flight"][host] += 1
+        app["peak_in_flight"][host] = max(app["peak_in_flight"][host], app["in_flight"][host])
+        try:
+            if latency_ms:
+                await asyncio.sleep(latency_ms / 1000)
+            return await handler(request)
+        finally:
+            app["in_flight"][host] -= 1
+
+    async def article(request: web.Request) -> web.Response:
+        return web.Response(text=article_html(int(request.match_info["n"])), content_type="text/html")
+
+    async def missing(request: web.Request) -> web.Response:
+        raise web.HTTPNotFound()
+
+    async def binary(request: web.Request) -> web.Response:
+        return web.Response(body=b"%PDF-1.4 fixture", content_type="application/pdf")
+
+    async def slow(request: web.Request) -> web.Response:
+        await asyncio.sleep(slow_ms / 1000)
+        return await article(request)
+
+    app.middlewares.append(track)
+    app.router.add_get("/article/{n}", article)
+    app.router.add_get("/syndicated/{n}", article)
+    app.router.add_get("/missing/{n}", missing)
+    app.router.add_get("/binary/{n}", binary)
+    app.router.add_get("/slow/{n}", slow)
+    return app
+
+
+async def start_fixture(latency_ms: float = 0, port: int = 0,
+                        slow_ms: float = 5000) -> Tuple[web.AppRunner, int]:
+    """Start the fixture on localhost and return its runner and port"""
+    runner = web.AppRunner(create_app(latency_ms, slow_ms))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve article pages for enrichment runs")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--slow-ms", type=float, default=5000)
+    args = parser.parse_args()
+    web.run_app(create_app(args.latency_ms, args.slow_ms), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,22 @@
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 # API Configuration
 BRAVE_API_KEY = os.getenv("BRAVE_API_KEY", "")
-BRAVE_SEARCH_URL = "https://api.search.brave.com/res/v1/web/search"
+BRAVE_SEARCH_URL = os.getenv("BRAVE_SEARCH_URL", "https://api.search.brave.com/res/v1/web/search")
+# Pooled HTTP client settings for the Brave API
+BRAVE_POOL_SIZE = int(os.getenv("BRAVE_POOL_SIZE", "20"))
+BRAVE_KEEPALIVE_SECONDS = 60
+BRAVE_REQUEST_TIMEOUT = 30
+# Brave returns at most 20 results per request and accepts page offsets 0-9
+BRAVE_PAGE_SIZE = 20
+BRAVE_MAX_PAGES = 10
+# Pages of one keyword requested at once after the first page
+BRAVE_PAGE_CONCURRENCY = 3
+# Stop paging once this share of a page's URLs came back on earlier pages
+BRAVE_PAGE_DUPLICATE_RATIO = 0.5
 
 # Backend Configuration
 BACKEND_HOST = "0.0.0.0"
@@ -12,8 +26,107 @@ BACKEND_PORT = 8002
 STORAGE_DIR = "data"
 RESULTS_FILE = "search_results.json"
 KEYWORDS_FILE = "keywords.json"
+SCHEDULE_FILE = "schedule.json"
+JOBS_FILE = "jobs.json"
+# Held by the one process that runs searches when uvicorn has several workers
+SCHEDULER_LOCK_FILE = "scheduler.lock"
+SEGMENTS_DIR = "segments"
+SQLITE_DB_FILE = "intentionly.db"
+# Worker threads running blocking storage calls for the async API
+STORAGE_THREADS = int(os.getenv("STORAGE_THREADS", "8"))
+# "sqlite" keeps indexed tables in SQLITE_DB_FILE, "segmented" appends results to daily
+# log segments, "json" rewrites RESULTS_FILE on every save
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
+# "auto" uses orjson when installed, "orjson" requires it, "json" forces the standard library
+JSON_CODEC = os.getenv("JSON_CODEC", "auto")
 
 # Search Configuration
-MAX_KEYWORDS = 10
-RESULTS_PER_SEARCH = 10
-RETENTION_DAYS = 30
\ No newline at end of file
+# Keywords are tracked in groups, e.g. one per team or tenant, and each group
+# may track up to KEYWORD_QUOTA of them. KEYWORD_GROUP_QUOTAS overrides the
+# quota of single groups as "group=quota,group=quota"
+DEFAULT_KEYWORD_GROUP = "default"
+KEYWORD_QUOTA = int(os.getenv("KEYWORD_QUOTA", "1000"))
+
+
+def _group_quotas(spec: str) -> dict:
+    """Parse "group=quota,..."; malformed entries are logged and skipped so a typo can't stop the app"""
+    quotas = {}
+    for item in filter(None, (item.strip() for item in spec.split(","))):
+        group, _, quota = item.partition("=")
+        if not group.strip() or not quota.strip().isdigit():
+            logger.warning(f"Ignoring malformed KEYWORD_GROUP_QUOTAS entry '{item}', expected group=quota")
+            continue
+        quotas[group.strip()] = int(quota)
+    return quotas
+
+
+KEYWORD_GROUP_QUOTAS = _group_quotas(os.getenv("KEYWORD_GROUP_QUOTAS", ""))
+# Results kept per keyword search, fetched as several Brave pages when above BRAVE_PAGE_SIZE
+RESULTS_PER_SEARCH = int(os.getenv("RESULTS_PER_SEARCH", "50"))
+# Topic clustering of stored results (cosine distance)
+CLUSTER_EPS = 0.7
+CLUSTER_MIN_SAMPLES = 2
+CLUSTER_LINK_THRESHOLD = 0.3
+# Strongest neighbours kept per result in the sparse similarity graph
+CLUSTER_MAX_NEIGHBORS = 30
+# Full reclustering runs once this share of documents was assigned incrementally
+CLUSTER_RECLUSTER_RATIO = 0.25
+
+# GET /search response cache: fresh for SEARCH_CACHE_TTL seconds, then served
+# stale for up to SEARCH_CACHE_STALE_TTL more while refreshing in the background
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "900"))
+SEARCH_CACHE_STALE_TTL = int(os.getenv("SEARCH_CACHE_STALE_TTL", "3600"))
+SEARCH_CACHE_MAX_ENTRIES = 500
+# Keyword searches allowed in flight at once during a run
+SEARCH_CONCURRENCY = int(os.getenv("SEARCH_CONCURRENCY", "5"))
+# Requests per second allowed by the Brave plan (Free: 1, Base: 20)
+BRAVE_QPS = float(os.getenv("BRAVE_QPS", "1"))
+# Brave requests per day the scheduler may spend; defaults to half of what
+# BRAVE_QPS allows, leaving the rest to interactive searches. Intervals are
+# stretched when the keywords' adaptive cadence would need more
+BRAVE_DAILY_BUDGET = int(os.getenv("BRAVE_DAILY_BUDGET", str(int(BRAVE_QPS * 86400 / 2))))
+RETENTION_DAYS = 30
+# Daily trend rollups outlive the raw results they summarize
+ROLLUP_RETENTION_DAYS = 400
+TREND_TOP_TERMS = 10
+WORD_CLOUD_MAX_WORDS = 200
+WORD_CLOUD_CACHE_SIZE = 32
+JOB_HISTORY_SIZE = 20
+# Adaptive per-keyword scheduling (seconds). A keyword's interval shrinks by
+# SCHEDULE_SPEEDUP when its results changed and grows by SCHEDULE_BACKOFF when
+# they did not, within the min/max bounds; each next run is jittered by
+# +/- SCHEDULE_JITTER of the interval so runs spread out instead of lining up
+SCHEDULE_DEFAULT_INTERVAL = int(os.getenv("SCHEDULE_DEFAULT_INTERVAL", str(24 * 3600)))
+SCHEDULE_MIN_INTERVAL = int(os.getenv("SCHEDULE_MIN_INTERVAL", str(6 * 3600)))
+SCHEDULE_MAX_INTERVAL = int(os.getenv("SCHEDULE_MAX_INTERVAL", str(7 * 24 * 3600)))
+SCHEDULE_SPEEDUP = 0.5
+SCHEDULE_BACKOFF = 1.5
+SCHEDULE_JITTER = 0.1
+# A failed search is retried after this long without changing the interval
+SCHEDULE_RETRY_DELAY = 3600
+# Runs that fell due while the server was down are spread over this window
+SCHEDULE_CATCHUP_WINDOW = int(os.getenv("SCHEDULE_CATCHUP_WINDOW", "3600"))
+# How often the scheduler looks for keywords that are due
+SCHEDULE_TICK_SECONDS = 60
+# How often every worker syncs with storage: followers try to take the lease and
+# pick up changes made by other workers, the leader picks up queued triggers
+# and saves the progress of its running job
+SCHEDULER_POLL_SECONDS = 2
+# Searches read from storage per batch when streaming /results
+STREAM_BATCH_SIZE = 200
+# Encoded API responses kept until the next write; windows relative to now
+# also expire after RESPONSE_CACHE_TTL seconds
+RESPONSE_CACHE_SIZE = 64
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "300"))
+
+# Article text enrichment
+ENRICH_ENABLED = os.getenv("ENRICH_ENABLED", "1") == "1"
+ENRICH_CONCURRENCY = 8
+ENRICH_PER_DOMAIN = 2
+ENRICH_TIMEOUT = 20
+ENRICH_PROCESSES = 2
+ENRICH_MAX_BYTES = 2_000_000
+# Enrichment outcomes are written to storage in batches of this size, or when the queue drains
+ENRICH_FLUSH_SIZE = 50
+PAGES_DIR = "pages"
+PAGES_FILE = "pages.json"
\ No newline at end of file
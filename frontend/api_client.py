@@ -0,0 +1,145 @@
+import json
+import logging
+import sys
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import requests
+import streamlit as st
+from requests.adapters import HTTPAdapter
+
+# Add root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from frontend.config import get_api_url, API_CACHE_TTL, API_TIMEOUT, API_POOL_SIZE, API_STREAM_CACHE_SIZE
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    """The backend answered with an error status"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(f"{status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled keep-alive session shared by every Streamlit session"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=API_POOL_SIZE, pool_maxsize=API_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _raise_for_status(response: requests.Response):
+    if response.status_code >= 400:
+        try:
+            detail = response.json().get("detail", response.text)
+        except ValueError:
+            detail = response.text
+        raise ApiError(response.status_code, str(detail))
+
+
+def _freeze(params: Optional[Dict]) -> Tuple:
+    """Turn request params into a hashable cache key, lists included"""
+    return tuple(sorted(
+        (name, tuple(value) if isinstance(value, list) else value)
+        for name, value in (params or {}).items()
+        if value is not None
+    ))
+
+
+@st.cache_data(ttl=API_CACHE_TTL, show_spinner=False)
+def _cached_get(endpoint: str, params: Tuple) -> Tuple[int, bytes, str]:
+    # Errors raise, so only successful responses are cached
+    response = get_session().get(
+        get_api_url(endpoint),
+        params=dict(params),
+        timeout=API_TIMEOUT
+    )
+    _raise_for_status(response)
+    return response.status_code, response.content, response.headers.get("content-type", "")
+
+
+def get_json(endpoint: str, params: Optional[Dict] = None, cached: bool = True) -> Any:
+    """GET a JSON endpoint, through the shared cache unless polling for live state"""
+    if not cached:
+        response = get_session().get(get_api_url(endpoint), params=params, timeout=API_TIMEOUT)
+        _raise_for_status(response)
+        return response.json()
+    _, content, _ = _cached_get(endpoint, _freeze(params))
+    return json.loads(content) if content else None
+
+
+def get_content(endpoint: str, params: Optional[Dict] = None) -> Optional[bytes]:
+    """GET raw bytes, e.g. an image, through the shared cache; None on 204"""
+    status_code, content, _ = _cached_get(endpoint, _freeze(params))
+    return None if status_code == 204 else content
+
+
+# Every Streamlit session thread shares the stream cache, so changes to it hold this lock
+_stream_lock = threading.Lock()
+
+
+@st.cache_resource
+def _stream_cache() -> "OrderedDict[Tuple, Tuple[float, List]]":
+    return OrderedDict()
+
+
+def stream_json(endpoint: str, params: Optional[Dict] = None) -> Iterator[Any]:
+    """
+    Yield the rows of an NDJSON endpoint as they arrive. A fully read
+    stream is kept for API_CACHE_TTL and replayed from memory.
+    """
+    key = (endpoint, _freeze(params))
+    cached = _stream_cache().get(key)
+    if cached and time.time() - cached[0] < API_CACHE_TTL:
+        yield from cached[1]
+        return
+
+    rows = []
+    with get_session().get(get_api_url(endpoint), params=params, stream=True, timeout=API_TIMEOUT) as response:
+        _raise_for_status(response)
+        for line in response.iter_lines():
+            if line:
+                row = json.loads(line)
+                rows.append(row)
+                yield row
+
+    streams = _stream_cache()
+    with _stream_lock:
+        streams[key] = (time.time(), rows)
+        streams.move_to_end(key)
+        while len(streams) > API_STREAM_CACHE_SIZE:
+            streams.popitem(last=False)
+
+
+def invalidate():
+    """Drop cached responses after anything that changes backend data"""
+    _cached_get.clear()
+    with _stream_lock:
+        _stream_cache().clear()
+    logger.info("Cleared cached API responses")
+
+
+def post(endpoint: str, params: Optional[Dict] = None, timeout: Optional[float] = API_TIMEOUT) -> Any:
+    """POST, then invalidate cached reads; returns the decoded JSON body"""
+    response = get_session().post(get_api_url(endpoint), params=params, timeout=timeout)
+    _raise_for_status(response)
+    invalidate()
+    return response.json()
+
+
+def delete(endpoint: str, params: Optional[Dict] = None) -> Any:
+    """DELETE, then invalidate cached reads; returns the decoded JSON body"""
+    response = get_session().delete(get_api_url(endpoint), params=params, timeout=API_TIMEOUT)
+    _raise_for_status(response)
+    invalidate()
+    return response.json()
@@ -42,6 +42,7 @@ try:
         from frontend.components.search_results import search_results
         from frontend.components.trend_viz import trend_visualization
         from frontend.components.search_preferences import search_preferences
+        from frontend.components.archive_search import archive_search
         logger.info("Successfully imported all components")
     except ImportError as e:
         logger.error(f"Failed to import components: {str(e)}")
@@ -58,7 +59,7 @@ try:
 
             logger.info("Setting up navigation tabs")
             # Main navigation
-            tabs = st.tabs(["Keywords", "Search Preferences", "Search Results", "Trends"])
+            tabs = st.tabs(["Keywords", "Search Preferences", "Search Results", "Trends", "Archive"])
 
             with tabs[0]:
                 logger.info("Initializing keyword manager")
@@ -80,6 +81,10 @@ try:
                 logger.info("Initializing trend visualization")
                 trend_visualization()
 
+            with tabs[4]:
+                logger.info("Initializing archive search")
+                archive_search()
+
             # Footer
             st.markdown("---")
             st.markdown(
@@ -0,0 +1,67 @@
+import streamlit as st
+import requests
+import html
+import logging
+import sys
+import os
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Add root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from frontend.api_client import ApiError, get_json
+
+PAGE_SIZE = 20
+
+def archive_search():
+    """Full-text search over every result collected so far"""
+    st.subheader("Search the Archive")
+
+    query = st.text_input("Find stored results mentioning", placeholder="e.g. scope 3 emissions")
+    days = st.slider("Search results seen in the last N days", 1, 365, 30, key="archive_days")
+    if not query.strip():
+        return
+
+    # Pages are fetched on demand; each cursor is remembered so earlier pages stay cheap
+    cursors = st.session_state.setdefault("archive_cursors", {})
+    state_key = (query, days)
+    pages = cursors.setdefault(state_key, [None])
+
+    try:
+        hits = []
+        next_cursor = None
+        for cursor in pages:
+            response = get_json("archive/search", {"q": query, "days": days, "limit": PAGE_SIZE, "cursor": cursor})
+            hits.extend(response["hits"])
+            next_cursor = response["next_cursor"]
+
+        if not hits:
+            st.info("No stored results match that search.")
+            return
+
+        for hit in hits:
+            # title and snippet arrive HTML-escaped with only <mark> highlights as markup
+            title = hit["title"]
+            if hit["url"].lower().startswith(("http://", "https://")):
+                title = f'<a href="{html.escape(hit["url"], quote=True)}" target="_blank">{title}</a>'
+            st.markdown(f"<strong>{title}</strong>", unsafe_allow_html=True)
+            st.markdown(hit["snippet"], unsafe_allow_html=True)
+            st.caption(
+                f"{', '.join(hit['keywords'])} · seen {hit['seen_count']} times · "
+                f"last {hit['last_seen'][:10]}"
+            )
+
+        if next_cursor and st.button("Show more"):
+            pages.append(next_cursor)
+            st.rerun()
+    except ApiError as e:
+        st.error(e.detail or "Archive search failed")
+        logger.error(f"Error searching archive: {str(e)}")
+    except requests.exceptions.ConnectionError as e:
+        st.error("Unable to connect to backend service. Please try again later.")
+        logger.error(f"Connection error searching archive: {str(e)}")
+    except Exception as e:
+        st.error("An unexpected error occurred while searching the archive")
+        logger.error(f"Unexpected error searching archive: {str(e)}")
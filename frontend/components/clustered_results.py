@@ -1,178 +1,37 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import DBSCAN
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.manifold import MDS
 import logging
 import json
+import sys
+import os
 
 logger = logging.getLogger(__name__)
 
-def calculate_similarity_clusters(search_results):
-    """Calculate similarity between search results using DBSCAN clustering"""
-    try:
-        # Debug: Show input structure
-        st.write("### Input Data Structure")
-        if search_results:
-            st.write("Sample search result:")
-            st.json(search_results[0])
-
-        # Extract text content
-        texts = []
-        titles = []
-        urls = []
-        keywords = []
-
-        # Process each search result
-        for search in search_results:
-            keyword = search.get('keyword', '')
-            st.write(f"Processing keyword: {keyword}")
-
-            for result in search.get('results', []):
-                title = result.get('title', '').strip()
-                desc = result.get('description', '').strip()
-                if title and desc:
-                    texts.append(f"{title} {desc}")
-                    titles.append(title)
-                    urls.append(result.get('url', ''))
-                    keywords.append(keyword)
-
-        # Debug: Show extracted text data
-        st.write("### Extracted Data")
-        st.write(f"Number of documents: {len(texts)}")
-        if texts:
-            st.write("Sample document:")
-            st.write(texts[0])
-
-        if not texts:
-            st.error("No valid text content found for clustering")
-            return None
-
-        # Calculate TF-IDF
-        st.write("### TF-IDF Calculation")
-        vectorizer = TfidfVectorizer(
-            stop_words='english',
-            max_features=100,  # Reduced for debugging
-            min_df=1,
-            max_df=0.9
-        )
-        tfidf_matrix = vectorizer.fit_transform(texts)
-        st.write(f"TF-IDF Matrix Shape: {tfidf_matrix.shape}")
-
-        # Calculate normalized similarity matrix
-        similarity_matrix = cosine_similarity(tfidf_matrix)
-        # Ensure similarity values are between 0 and 1
-        similarity_matrix = np.clip(similarity_matrix, 0, 1)
-
-        st.write("### Similarity Matrix")
-        st.write("Sample similarities (first 3x3):")
-        st.dataframe(pd.DataFrame(similarity_matrix[:3, :3]))
-
-        # Convert to distance matrix with proper normalization
-        distance_matrix = np.clip(1 - similarity_matrix, 0, 1)
-
-        # Cluster the documents
-        st.write("### Clustering Process")
-        eps = 0.7  # Increased threshold for more inclusive clusters
-        min_samples = 2  # Minimum points per cluster
-        st.write(f"DBSCAN parameters: eps={eps}, min_samples={min_samples}")
-
-        clustering = DBSCAN(
-            eps=eps,
-            min_samples=min_samples,
-            metric='precomputed'
-        )
-        cluster_labels = clustering.fit_predict(distance_matrix)
-
-        # Analyze clusters
-        unique_clusters = np.unique(cluster_labels)
-        st.write(f"Number of clusters: {len(unique_clusters[unique_clusters != -1])}")
-        st.write("Cluster sizes:", np.bincount(cluster_labels[cluster_labels != -1]).tolist())
-        st.write("Number of noise points:", np.sum(cluster_labels == -1))
-
-        # Calculate cluster probabilities with normalization
-        probabilities = np.zeros(len(texts))
-        for i in range(len(texts)):
-            similar_docs = similarity_matrix[i] > 0.3
-            probabilities[i] = np.clip(np.mean(similarity_matrix[i][similar_docs]), 0.1, 1.0)
-
-        # Generate 2D coordinates
-        st.write("### Generating Visualization Coordinates")
-        mds = MDS(n_components=2, dissimilarity='precomputed', random_state=42)
-        coordinates = mds.fit_transform(distance_matrix)
-
-        st.write("Sample coordinates (first 3 points):")
-        coord_df = pd.DataFrame(
-            coordinates[:3], 
-            columns=['x', 'y']
-        )
-        st.dataframe(coord_df)
-
-        # Scale coordinates
-        x_min, x_max = np.min(coordinates[:, 0]), np.max(coordinates[:, 0])
-        y_min, y_max = np.min(coordinates[:, 1]), np.max(coordinates[:, 1])
-        x_scale = 800 / (x_max - x_min + 1e-10)
-        y_scale = 600 / (y_max - y_min + 1e-10)
-
-        # Create nodes with normalized coordinates
-        nodes = []
-        for i in range(len(texts)):
-            x_coord = (coordinates[i, 0] - x_min) * x_scale
-            y_coord = (coordinates[i, 1] - y_min) * y_scale
-            nodes.append({
-                'id': str(i),
-                'title': titles[i],
-                'url': urls[i],
-                'keyword': keywords[i],
-                'x': float(x_coord),
-                'y': float(y_coord),
-                'cluster': int(cluster_labels[i]),
-                'confidence': float(probabilities[i])
-            })
-
-        # Create links between similar nodes
-        links = []
-        for i in range(len(texts)):
-            for j in range(i + 1, len(texts)):
-                if cluster_labels[i] != -1 and cluster_labels[i] == cluster_labels[j]:
-                    sim_value = similarity_matrix[i, j]
-                    if sim_value > 0.3:  # Threshold for creating links
-                        links.append({
-                            'source': str(i),
-                            'target': str(j),
-                            'value': float(sim_value)
-                        })
-
-        st.write("### D3.js Data Summary")
-        st.write(f"Number of nodes: {len(nodes)}")
-        st.write(f"Number of links: {len(links)}")
-        if nodes:
-            st.write("Sample node:", nodes[0])
-        if links:
-            st.write("Sample link:", links[0])
-
-        return {'nodes': nodes, 'links': links}
+# Add root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from frontend.api_client import get_json
 
+def fetch_cluster_graph(days):
+    """Fetch the precomputed cluster graph for the last N days from the backend"""
+    try:
+        graph = get_json("clusters", {"days": days})
+        logger.info(f"Received cluster graph with {len(graph['nodes'])} nodes and {len(graph['links'])} links")
+        return graph
     except Exception as e:
-        logger.error(f"Error in clustering: {str(e)}", exc_info=True)
-        st.error(f"Error processing data: {str(e)}")
-        return None
+        logger.error(f"Error fetching cluster graph: {str(e)}", exc_info=True)
+    return None
 
-def clustered_results(search_results):
+def clustered_results(days):
     """Main entry point for clustering visualization"""
     st.subheader("Topic Clusters")
 
-    if not search_results:
-        st.info("No search results available. Please run a manual search first.")
-        return
-
-    st.info("Processing search results for clustering...")
-    result = calculate_similarity_clusters(search_results)
+    result = fetch_cluster_graph(days)
 
     if not result:
-        st.error("Failed to generate visualization. Check the debug information above.")
+        st.error("Failed to load the topic cluster graph.")
+        return
+
+    if not result["nodes"]:
+        st.info("No search results available. Please run a manual search first.")
         return
 
     # Create the visualization
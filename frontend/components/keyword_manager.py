@@ -1,6 +1,7 @@
 import streamlit as st
 import requests
 from typing import List
+from urllib.parse import quote
 import sys
 import os
 import logging
@@ -9,30 +10,32 @@ import pandas as pd
 
 # Add root directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from config import MAX_KEYWORDS
-from frontend.config import get_api_url
+from config import KEYWORD_QUOTA, DEFAULT_KEYWORD_GROUP
+from frontend.api_client import ApiError, get_json, post, delete
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PAGE_SIZE = 50
+
 def keyword_manager():
     st.subheader("Keyword Management")
 
     # Add new keyword
     with st.form("add_keyword"):
         new_keyword = st.text_input("Add a new keyword")
+        group = st.text_input("Group", value=DEFAULT_KEYWORD_GROUP)
         submit_button = st.form_submit_button("Add Keyword")
 
         if submit_button and new_keyword:
             try:
-                response = requests.post(get_api_url(f"keywords?keyword={new_keyword}"))
-                if response.status_code == 200:
-                    st.success("Keyword added successfully!")
-                else:
-                    error_msg = response.json().get("detail", "Failed to add keyword")
-                    st.error(error_msg)
-                    logger.error(f"Failed to add keyword: {error_msg}")
+                post("keywords", {"keyword": new_keyword, "group": group.strip() or DEFAULT_KEYWORD_GROUP})
+                st.success("Keyword added successfully!")
+            except ApiError as e:
+                error_msg = e.detail or "Failed to add keyword"
+                st.error(error_msg)
+                logger.error(f"Failed to add keyword: {error_msg}")
             except requests.exceptions.ConnectionError as e:
                 error_msg = "Unable to connect to backend service. Please try again later."
                 st.error(error_msg)
@@ -44,31 +47,43 @@ def keyword_manager():
     # Display current keywords
     st.subheader("Current Keywords")
     try:
-        response = requests.get(get_api_url("keywords"))
-        if response.status_code == 200:
-            keywords = response.json()
-            if not keywords:
-                st.info(f"No keywords added yet. You can add up to {MAX_KEYWORDS} keywords.")
-            else:
-                for keyword in keywords:
-                    col1, col2 = st.columns([3, 1])
-                    with col1:
-                        st.write(keyword["value"])
-                    with col2:
-                        if st.button("Remove", key=f"remove_{keyword['value']}"):
-                            try:
-                                delete_response = requests.delete(get_api_url(f"keywords/{keyword['value']}"))
-                                if delete_response.status_code == 200:
-                                    st.success("Keyword removed successfully!")
-                                    st.rerun()
-                                else:
-                                    st.error(delete_response.json().get("detail", "Failed to remove keyword"))
-                            except Exception as e:
-                                st.error("Failed to remove keyword")
-                                logger.error(f"Error removing keyword: {str(e)}")
+        keywords = get_json("keywords")
+        if not keywords:
+            st.info(f"No keywords added yet. You can add up to {KEYWORD_QUOTA} keywords per group.")
         else:
-            st.error("Failed to fetch keywords")
-            logger.error(f"Error fetching keywords: {response.status_code}")
+            # Only one page of the filtered list gets a row, so thousands of keywords stay responsive
+            groups = sorted({k.get("group", DEFAULT_KEYWORD_GROUP) for k in keywords})
+            col1, col2 = st.columns([1, 2])
+            with col1:
+                group = st.selectbox("Group", ["All groups"] + groups)
+            with col2:
+                search = st.text_input("Search keywords")
+            if group != "All groups":
+                keywords = [k for k in keywords if k.get("group", DEFAULT_KEYWORD_GROUP) == group]
+            if search.strip():
+                keywords = [k for k in keywords if search.strip().lower() in k["value"].lower()]
+
+            pages = max(1, -(-len(keywords) // PAGE_SIZE))
+            page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) if pages > 1 else 1
+            st.caption(f"{len(keywords)} keywords")
+            for keyword in keywords[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]:
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    st.write(keyword["value"])
+                with col2:
+                    if st.button("Remove", key=f"remove_{keyword['value']}"):
+                        try:
+                            delete(f"keywords/{quote(keyword['value'], safe='')}")
+                            st.success("Keyword removed successfully!")
+                            st.rerun()
+                        except ApiError as e:
+                            st.error(e.detail or "Failed to remove keyword")
+                        except Exception as e:
+                            st.error("Failed to remove keyword")
+                            logger.error(f"Error removing keyword: {str(e)}")
+    except ApiError as e:
+        st.error("Failed to fetch keywords")
+        logger.error(f"Error fetching keywords: {str(e)}")
     except requests.exceptions.ConnectionError as e:
         st.error("Unable to connect to backend service. Please try again later.")
         logger.error(f"Connection error fetching keywords: {str(e)}")
@@ -1,9 +1,9 @@
 import streamlit as st
 import requests
 from datetime import datetime, timedelta
-import pandas as pd
 import sys
 import os
+import time
 import logging
 from .clustered_results import clustered_results
 
@@ -13,7 +13,8 @@ logger = logging.getLogger(__name__)
 
 # Add root directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from frontend.config import get_api_url
+from frontend.api_client import ApiError, get_json, post, invalidate, stream_json
+from frontend.config import JOB_POLL_INTERVAL
 
 def search_results():
     st.subheader("Search Results")
@@ -25,72 +26,80 @@ def search_results():
     if st.button("Run Manual Search"):
         try:
             logger.info("Triggering manual search")
-            response = requests.post(get_api_url("run-search"))
-            if response.status_code == 200:
-                st.success("Manual search completed successfully!")
-                data = response.json()
-                logger.info(f"Manual search results: {data}")
+            job = post("run-search")["job"]
+            progress = st.progress(0.0, text="Starting search...")
+            # The search runs as a backend job; poll it instead of holding a request open
+            while job["status"] in ("queued", "running"):
+                time.sleep(JOB_POLL_INTERVAL)
+                job = get_json(f"run-search/{job['id']}", cached=False)
+                if job["total"]:
+                    progress.progress(
+                        job["completed"] / job["total"],
+                        text=f"Searched {job['completed']} of {job['total']} keywords"
+                    )
+            invalidate()
+            logger.info(f"Manual search job finished: {job}")
+            if job["status"] == "done":
+                failed = [r["keyword"] for r in job["results"] if r["status"] != "ok"]
+                if failed:
+                    st.warning(f"Manual search completed, but these keywords failed: {', '.join(failed)}")
+                else:
+                    unchanged = sum(1 for r in job["results"] if r.get("changed") is False)
+                    st.success(
+                        "Manual search completed successfully!"
+                        + (f" {unchanged} keywords returned the same results as their last run." if unchanged else "")
+                    )
             else:
-                st.error("Failed to run manual search")
-                logger.error(f"Manual search error: {response.status_code}, {response.text}")
+                st.error(f"Manual search failed: {job.get('error', 'unknown error')}")
+        except ApiError as e:
+            st.error("Failed to run manual search")
+            logger.error(f"Manual search error: {str(e)}")
         except Exception as e:
             st.error("Error running manual search")
             logger.error(f"Manual search exception: {str(e)}")
 
     # Fetch results
     try:
-        logger.info(f"Fetching search results for last {days} days")
-        response = requests.get(get_api_url(f"results?days={days}"))
+        keywords = [k["value"] for k in get_json("keywords")]
+        # With thousands of keywords, listing them all as filters is unusable and
+        # overflows the request line, so the default is no keyword filter at all
+        all_keywords = st.checkbox("All keywords", value=True)
+        selected_keywords = keywords if all_keywords else st.multiselect(
+            "Filter by keywords",
+            options=keywords
+        )
+        new_only = st.checkbox("Only show URLs not seen in earlier runs", value=False)
+        if keywords and not selected_keywords:
+            st.info("Select at least one keyword to see its results.")
+            return
 
-        if response.status_code == 200:
-            results = response.json()
-            logger.info(f"Received {len(results)} search entries")
-            logger.info(f"Search results structure: {results[:1] if results else 'No results'}")
+        # Show topic clusters visualization
+        clustered_results(days)
 
-            if not results:
-                st.info("No search results available for the selected period. Try running a manual search.")
-                return
+        logger.info(f"Streaming search results for last {days} days")
+        # Filter, dedupe and project on the server; render each result as its line arrives
+        st.subheader("Search Result Details")
+        count = 0
+        for row in stream_json("results/stream", {
+            "days": days,
+            "keyword": None if all_keywords else selected_keywords,
+            "fields": "keyword,timestamp,results.title,results.description,results.url",
+            "dedup": "true",
+            "new_only": str(new_only).lower(),
+            "per": "result"
+        }):
+            date = datetime.fromisoformat(row["timestamp"]).strftime("%Y-%m-%d")
+            with st.expander(f"{row['title']} ({row['keyword']} - {date})"):
+                st.write(row["description"])
+                st.markdown(f"[View Article]({row['url']})")
+            count += 1
+        logger.info(f"Rendered {count} streamed results")
 
-            # Show topic clusters visualization
-            clustered_results(results)
-
-            # Create a dataframe for better display
-            df_rows = []
-            for search in results:
-                logger.info(f"Processing results for keyword: {search['keyword']}")
-                for result in search["results"]:
-                    df_rows.append({
-                        "Keyword": search["keyword"],
-                        "Date": datetime.fromisoformat(search["timestamp"]).strftime("%Y-%m-%d"),
-                        "Title": result["title"],
-                        "Description": result["description"],
-                        "URL": result["url"]
-                    })
-
-            df = pd.DataFrame(df_rows)
-            logger.info(f"Created DataFrame with {len(df)} rows")
-
-            # Add filters
-            keywords = df["Keyword"].unique()
-            selected_keywords = st.multiselect(
-                "Filter by keywords",
-                options=keywords,
-                default=keywords
-            )
-
-            filtered_df = df[df["Keyword"].isin(selected_keywords)]
-            logger.info(f"Filtered to {len(filtered_df)} rows")
-
-            # Display results in an expandable format
-            st.subheader("Search Result Details")
-            for _, row in filtered_df.iterrows():
-                with st.expander(f"{row['Title']} ({row['Keyword']} - {row['Date']})"):
-                    st.write(row["Description"])
-                    st.markdown(f"[View Article]({row['URL']})")
-        else:
-            st.error("Failed to fetch search results")
-            logger.error(f"Error fetching results: {response.status_code}")
-            logger.error(f"Response content: {response.text}")
+        if not count:
+            st.info("No search results available for the selected period. Try running a manual search.")
+    except ApiError as e:
+        st.error("Failed to fetch search results")
+        logger.error(f"Error fetching results: {str(e)}")
     except requests.exceptions.ConnectionError as e:
         st.error("Unable to connect to backend service. Please try again later.")
         logger.error(f"Connection error fetching results: {str(e)}")
@@ -14,65 +14,77 @@ logger = logging.getLogger(__name__)
 
 # Add root directory to Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-from frontend.config import get_api_url
+from frontend.api_client import ApiError, get_json
 
 def trend_visualization():
     st.subheader("Search Trends")
 
     # Date range selector
-    days = st.slider("Show trends from last N days", 1, 30, 7)
+    days = st.slider("Show trends from last N days", 1, 365, 7)
 
     # Fetch data
     try:
         logger.info(f"Fetching trend data for last {days} days")
-        response = requests.get(get_api_url(f"results?days={days}"))
+        # Per keyword per day rollups maintained by the backend
+        rollups = get_json("trends", {"days": days})
+        logger.info(f"Received {len(rollups)} daily trend rows")
 
-        if response.status_code == 200:
-            results = response.json()
-            logger.info(f"Received {len(results)} search entries for trends")
+        if not rollups:
+            st.info("No trend data available for the selected period.")
+            return
 
-            if not results:
-                st.info("No trend data available for the selected period.")
-                return
+        # Word Cloud Visualization
+        st.subheader("Topic Word Cloud")
+        word_cloud_png = generate_word_cloud(days)
+        if word_cloud_png:
+            st.image(word_cloud_png, use_container_width=True)
 
-            # Word Cloud Visualization
-            st.subheader("Topic Word Cloud")
-            word_cloud_fig = generate_word_cloud(results)
-            if word_cloud_fig:
-                st.plotly_chart(word_cloud_fig, use_container_width=True)
+        # Process data for trend visualization
+        df = pd.DataFrame(rollups).rename(columns={
+            "keyword": "Keyword",
+            "date": "Date",
+            "searches": "Searches",
+            "new_urls": "New URLs",
+            "domains": "Domains"
+        })
+        df["Results"] = df["results"] / df["Searches"]
+        logger.info(f"Created trends DataFrame with {len(df)} rows")
 
-            # Process data for trend visualization
-            trend_data = []
-            for search in results:
-                logger.info(f"Processing trend data for keyword: {search['keyword']}")
-                trend_data.append({
-                    "Keyword": search["keyword"],
-                    "Date": datetime.fromisoformat(search["timestamp"]).strftime("%Y-%m-%d"),
-                    "Results": len(search["results"])
-                })
+        # Line chart of search results over time
+        st.subheader("Search Results Over Time")
+        fig = px.line(df, x="Date", y="Results", color="Keyword", 
+                     title="Number of Search Results by Keyword")
+        st.plotly_chart(fig, use_container_width=True)
 
-            df = pd.DataFrame(trend_data)
-            logger.info(f"Created trends DataFrame with {len(df)} rows")
+        # New URLs per day show how much of each search is fresh coverage
+        st.subheader("New URLs Over Time")
+        fig = px.bar(df, x="Date", y="New URLs", color="Keyword",
+                     title="URLs Not Seen Before by Keyword")
+        st.plotly_chart(fig, use_container_width=True)
 
-            # Line chart of search results over time
-            st.subheader("Search Results Over Time")
-            fig = px.line(df, x="Date", y="Results", color="Keyword", 
-                         title="Number of Search Results by Keyword")
-            st.plotly_chart(fig, use_container_width=True)
+        # Summary statistics, one row per keyword from the daily rollups
+        st.subheader("Summary Statistics")
+        summary_df = df.groupby("Keyword").agg(
+            total_results=("results", "sum"),
+            minimum=("Results", "min"),
+            maximum=("Results", "max"),
+            searches=("Searches", "sum"),
+            new_urls=("New URLs", "sum"),
+            domains=("Domains", "max")
+        )
+        summary_df.insert(0, "mean", summary_df.pop("total_results") / summary_df["searches"])
+        summary_df = summary_df.round(2)
 
-            # Summary statistics
-            st.subheader("Summary Statistics")
-            summary_df = df.groupby("Keyword")["Results"].agg([
-                "mean", "min", "max", "count"
-            ]).round(2)
-
-            summary_df.columns = ["Average Results", "Minimum", "Maximum", "Number of Searches"]
-            st.dataframe(summary_df)
-            logger.info("Successfully displayed trend visualizations")
-        else:
-            st.error("Failed to fetch trend data")
-            logger.error(f"Error fetching trend data: {response.status_code}")
-            logger.error(f"Response content: {response.text}")
+        # Rollups hold daily totals, so the extremes are of the per-day average, not of single searches
+        summary_df.columns = [
+            "Average Results", "Min Daily Average", "Max Daily Average", "Number of Searches", "New URLs",
+            "Peak Daily Domains"
+        ]
+        st.dataframe(summary_df)
+        logger.info("Successfully displayed trend visualizations")
+    except ApiError as e:
+        st.error("Failed to fetch trend data")
+        logger.error(f"Error fetching trend data: {str(e)}")
     except requests.exceptions.ConnectionError as e:
         st.error("Unable to connect to backend service. Please try again later.")
         logger.error(f"Connection error fetching trend data: {str(e)}")
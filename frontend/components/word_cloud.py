@@ -1,42 +1,21 @@
-import streamlit as st
-import pandas as pd
-from wordcloud import WordCloud
-import plotly.graph_objects as go
-from collections import Counter
 import logging
+import sys
+import os
 
 logger = logging.getLogger(__name__)
 
-def generate_word_cloud(search_results):
-    """Generate a word cloud from search results with sentiment coloring"""
+# Add root directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+from frontend.api_client import get_content
+
+def generate_word_cloud(days, keywords=None):
+    """
+    Fetch the word cloud PNG the backend renders from its stored term
+    frequencies. Returns the image bytes, or None when there is nothing
+    to show yet.
+    """
     try:
-        # Combine all descriptions into one text
-        all_text = " ".join([
-            result["description"] 
-            for search in search_results 
-            for result in search["results"]
-        ])
-        
-        # Generate word frequencies
-        wordcloud = WordCloud(
-            width=800, height=400,
-            background_color='white',
-            colormap='viridis'  # Using viridis colormap for now, will add sentiment colors later
-        ).generate(all_text)
-        
-        # Convert to image for Streamlit
-        fig = go.Figure()
-        fig.add_trace(
-            go.Image(z=wordcloud.to_array())
-        )
-        
-        fig.update_layout(
-            title="Search Results Word Cloud",
-            xaxis_visible=False,
-            yaxis_visible=False
-        )
-        
-        return fig
+        return get_content("wordcloud", {"days": days, "keyword": keywords})
     except Exception as e:
         logger.error(f"Error generating word cloud: {str(e)}")
         return None
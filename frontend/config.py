@@ -10,13 +10,20 @@ logger = logging.getLogger(__name__)
 # Backend API configuration
 BACKEND_URL = os.getenv("BACKEND_URL", "http://0.0.0.0:8002")
 logger.info(f"Backend URL configured as: {BACKEND_URL}")
+# Seconds a GET response is reused across reruns, tabs and sessions
+API_CACHE_TTL = int(os.getenv("API_CACHE_TTL", "60"))
+API_TIMEOUT = 30
+API_POOL_SIZE = 10
+API_STREAM_CACHE_SIZE = 16
+# Seconds between progress checks of a running search job
+JOB_POLL_INTERVAL = 1
 
 # Import from root config to ensure consistency
 try:
-    from config import MAX_KEYWORDS
+    from config import KEYWORD_QUOTA
 except ImportError:
-    logger.warning("Could not import MAX_KEYWORDS from root config, using default value")
-    MAX_KEYWORDS = 10
+    logger.warning("Could not import KEYWORD_QUOTA from root config, using default value")
+    KEYWORD_QUOTA = 1000
 
 def verify_backend_connection():
     """Verify that the backend is accessible"""